@@ -0,0 +1,201 @@
+"""
+预处理图片缓存
+
+背景图是完整尺寸的JPG，每次启动都要解码，绘制时再缩放到1024x768。
+这里把图片预先转换成显示分辨率的RGBA原始像素文件，文件名中带有源文件的内容哈希，
+之后启动时直接内存映射缓存文件交给纹理上传，跳过JPEG解码和重采样。
+源文件内容变化后哈希不同，旧缓存自动失效并被删除。
+
+缓存在第一次加载时自动生成，也可以提前生成:
+    python asset_cache.py            # 转换resources/下的所有图片
+    python asset_cache.py --force    # 忽略已有缓存重新生成
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+from PIL import Image
+
+from log_utils import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources")
+CACHE_DIR = os.path.join(RESOURCES_DIR, ".cache")
+
+# 可以缓存的源图片
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# resources/下各子目录图片的显示尺寸，没有列出的按原尺寸缓存
+DISPLAY_SIZES = {
+    "bedroom": (1024, 768),
+}
+
+# 缓存文件头: 标记、宽、高，后面紧跟宽*高*4字节的RGBA像素
+_HEADER = struct.Struct("<4sII")
+_MAGIC = b"RGBA"
+
+
+def content_hash(path):
+    """源文件内容的SHA-1"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_prefix(path, size):
+    """同一源文件、同一尺寸的缓存文件名前缀(不含内容哈希)"""
+    path = os.path.abspath(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    # 不同目录下的同名文件各自缓存
+    location = hashlib.sha1(path.encode("utf-8")).hexdigest()[:8]
+    size_tag = f"{size[0]}x{size[1]}" if size else "native"
+    return f"{stem}-{location}-{size_tag}-"
+
+
+def cache_path(path, size=None, digest=None):
+    """
+    源文件对应的缓存文件路径
+
+    参数:
+        path (str): 源图片路径
+        size (tuple): 显示尺寸(宽, 高)，None为原尺寸
+        digest (str): 已经算好的内容哈希
+
+    返回:
+        str: 缓存文件路径(不一定存在)
+    """
+    digest = digest or content_hash(path)
+    return os.path.join(CACHE_DIR, f"{_cache_prefix(path, size)}{digest[:16]}.rgba")
+
+
+def _decode(path, size=None):
+    """直接解码源图片并缩放到显示尺寸"""
+    with Image.open(path) as image:
+        image = image.convert("RGBA")
+    if size and image.size != tuple(size):
+        image = image.resize(tuple(size), Image.LANCZOS)
+    return image
+
+
+def build(path, size=None, digest=None):
+    """
+    生成缓存文件，并删除同一源文件的旧缓存
+
+    返回:
+        str: 缓存文件路径
+    """
+    digest = digest or content_hash(path)
+    target = cache_path(path, size, digest)
+    image = _decode(path, size)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # 先写临时文件再替换，并发生成或中途退出都不会留下不完整的缓存
+    temp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, *image.size))
+        f.write(image.tobytes())
+    os.replace(temp, target)
+
+    prefix = _cache_prefix(path, size)
+    for name in os.listdir(CACHE_DIR):
+        stale = os.path.join(CACHE_DIR, name)
+        if name.startswith(prefix) and name.endswith(".rgba") and stale != target:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return target
+
+
+def open_cached(cache_file):
+    """
+    内存映射缓存文件
+
+    返回:
+        PIL.Image.Image: 直接引用映射内存的RGBA图片
+    """
+    with open(cache_file, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, width, height = _HEADER.unpack_from(mapped)
+    if magic != _MAGIC or len(mapped) != _HEADER.size + width * height * 4:
+        mapped.close()
+        raise ValueError(f"缓存文件已损坏: {cache_file}")
+    pixels = memoryview(mapped)[_HEADER.size:]
+    return Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, 1)
+
+
+def load_image(path, size=None):
+    """
+    取得显示尺寸的RGBA图片: 缓存存在时映射缓存文件，否则先生成缓存
+
+    缓存目录不可写或缓存文件损坏时退回直接解码
+
+    参数:
+        path (str): 源图片路径
+        size (tuple): 显示尺寸(宽, 高)，None为原尺寸
+
+    返回:
+        PIL.Image.Image: RGBA图片
+    """
+    digest = content_hash(path)
+    target = cache_path(path, size, digest)
+    try:
+        if not os.path.exists(target):
+            build(path, size, digest)
+        return open_cached(target)
+    except (OSError, ValueError) as e:
+        logger.warning("图片缓存不可用，直接解码: %s: %s", path, e)
+        return _decode(path, size)
+
+
+def display_size(path):
+    """resources/下图片的显示尺寸，没有配置时为None(原尺寸)"""
+    relative = os.path.relpath(os.path.abspath(path), RESOURCES_DIR)
+    return DISPLAY_SIZES.get(os.path.dirname(relative))
+
+
+def prepare_all(force=False):
+    """
+    为resources/下的所有图片生成缓存
+
+    参数:
+        force (bool): 忽略已有缓存重新生成
+
+    返回:
+        int: 新生成的缓存数量
+    """
+    built = 0
+    for root, dirs, files in os.walk(RESOURCES_DIR):
+        # 跳过缓存目录本身
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != CACHE_DIR]
+        for name in sorted(files):
+            if not name.lower().endswith(SOURCE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            size = display_size(path)
+            digest = content_hash(path)
+            if force or not os.path.exists(cache_path(path, size, digest)):
+                target = build(path, size, digest)
+                logger.info("已生成缓存: %s -> %s",
+                            os.path.relpath(path, RESOURCES_DIR), os.path.basename(target))
+                built += 1
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把resources/下的图片转换为显示分辨率的RGBA缓存")
+    parser.add_argument("--force", action="store_true", help="忽略已有缓存重新生成")
+    args = parser.parse_args()
+    setup_logging()
+    built = prepare_all(force=args.force)
+    logger.info("完成，新生成 %d 个缓存文件", built)
+
+
+if __name__ == "__main__":
+    main()
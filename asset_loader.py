@@ -0,0 +1,258 @@
+"""
+异步纹理加载
+
+arcade.load_texture会在调用处同步完成文件读取、JPEG解码和纹理创建，
+卧室的两张背景图在GameManager初始化时加载，登录界面要等它们解码完才能出现。
+这里把图片解码放到线程池中进行，解码结果在主线程上按时间预算分批创建纹理并上传到GPU
+(OpenGL调用只能在主线程进行)。调用方立即拿到一个纹理句柄，纹理就绪之前照常使用颜色绘制。
+图片通过asset_cache读取，已有预处理缓存时直接映射缓存文件，不再解码和缩放。
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import arcade
+
+import asset_cache
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+
+# 每次上传最多占用的时间(秒)，至少上传一张
+DEFAULT_UPLOAD_BUDGET = 0.004
+
+
+class TextureHandle:
+    """异步加载中的纹理，就绪后texture才可用"""
+
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, path, size=None):
+        self.path = path
+        self.size = size
+        self.state = self.PENDING
+        self.texture = None
+        self.error = None
+        self._image = None
+        self._callbacks = []
+
+    @property
+    def ready(self):
+        return self.state == self.READY
+
+    @property
+    def failed(self):
+        return self.state == self.FAILED
+
+    def add_ready_callback(self, callback):
+        """
+        纹理就绪后(在主线程上)调用callback(handle)，已就绪时立即调用
+
+        加载失败时不会调用，调用方保持颜色绘制即可
+        """
+        if self.ready:
+            callback(self)
+        elif not self.failed:
+            self._callbacks.append(callback)
+
+    def _finish(self, texture=None, error=None):
+        """上传完成或失败时由加载器调用"""
+        self._image = None
+        if error is not None:
+            self.state = self.FAILED
+            self.error = error
+            self._callbacks = []
+            return
+        self.texture = texture
+        self.state = self.READY
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+class AssetLoader:
+    """线程池解码、主线程按预算上传的纹理加载器"""
+
+    def __init__(self, max_workers=2, upload_budget=DEFAULT_UPLOAD_BUDGET):
+        """
+        参数:
+            max_workers (int): 解码线程数
+            upload_budget (float): 每次update上传纹理最多占用的时间(秒)
+        """
+        self.upload_budget = upload_budget
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="asset-decode")
+        # (路径, 尺寸) -> 句柄，同一路径、同一尺寸只加载一次
+        self._handles = {}
+        # 解码完成、等待上传的句柄(线程中追加，主线程取出)
+        self._decoded = deque()
+        self._outstanding = 0
+        self._scheduled = False
+
+    def load(self, path, size=None):
+        """
+        开始异步加载一张图片
+
+        参数:
+            path (str): 图片路径
+            size (tuple): 显示尺寸(宽, 高)，默认使用asset_cache.DISPLAY_SIZES中的配置
+
+        返回:
+            TextureHandle: 纹理句柄，同一路径、同一尺寸返回同一个句柄
+        """
+        path = os.path.abspath(path)
+        size = tuple(size) if size else asset_cache.display_size(path)
+        handle = self._handles.get((path, size))
+        if handle is not None:
+            return handle
+
+        handle = TextureHandle(path, size)
+        self._handles[(path, size)] = handle
+        self._outstanding += 1
+        future = self._executor.submit(self._decode, path, size)
+        future.add_done_callback(lambda f: self._on_decoded(handle, f))
+        self._schedule()
+        return handle
+
+    @staticmethod
+    def _decode(path, size):
+        """在工作线程中读取图片(优先使用预处理缓存)"""
+        return asset_cache.load_image(path, size)
+
+    def _on_decoded(self, handle, future):
+        """工作线程中的完成回调，只记录结果，纹理留给主线程创建"""
+        try:
+            handle._image = future.result()
+        except Exception as e:
+            handle.error = e
+        self._decoded.append(handle)
+
+    @property
+    def pending(self):
+        """还没有就绪(或失败)的纹理数量"""
+        return self._outstanding
+
+    def update(self, budget=None):
+        """
+        在主线程上创建已解码的纹理并上传到GPU
+
+        参数:
+            budget (float): 本次最多占用的时间(秒)，默认使用upload_budget
+
+        返回:
+            int: 本次就绪的纹理数量
+        """
+        if budget is None:
+            budget = self.upload_budget
+        deadline = time.perf_counter() + budget
+        uploaded = 0
+        while self._decoded:
+            # 至少处理一张，避免预算太小时永远无法完成
+            if uploaded and time.perf_counter() >= deadline:
+                break
+            handle = self._decoded.popleft()
+            self._outstanding -= 1
+            if handle.error is not None:
+                logger.error("加载纹理失败: %s: %s", handle.path, handle.error)
+                handle._finish(error=handle.error)
+                continue
+            name = handle.path if handle.size is None else f"{handle.path}@{handle.size[0]}x{handle.size[1]}"
+            texture = arcade.Texture(name, image=handle._image)
+            self._upload(texture)
+            handle._finish(texture=texture)
+            uploaded += 1
+        return uploaded
+
+    @staticmethod
+    def _default_atlas():
+        window = arcade.get_window()
+        return getattr(window.ctx, "default_atlas", None) if window else None
+
+    @classmethod
+    def _upload(cls, texture):
+        """把纹理放进默认图集，避免第一次绘制时才上传"""
+        atlas = cls._default_atlas()
+        if atlas is None:
+            return
+        try:
+            atlas.add(texture)
+        except Exception:
+            # 图集放不下时交给第一次绘制处理
+            pass
+
+    def unload(self, path, size=None):
+        """
+        丢弃已就绪的纹理，之后再load同一路径会重新加载
+
+        参数:
+            path (str): 图片路径
+            size (tuple): 加载时使用的显示尺寸
+
+        返回:
+            bool: 是否丢弃(还在加载中的纹理不能丢弃)
+        """
+        path = os.path.abspath(path)
+        size = tuple(size) if size else asset_cache.display_size(path)
+        handle = self._handles.get((path, size))
+        if handle is None or handle.state == TextureHandle.PENDING:
+            return False
+        del self._handles[(path, size)]
+        atlas = self._default_atlas()
+        if handle.texture is not None and atlas is not None:
+            try:
+                atlas.remove(handle.texture)
+            except Exception:
+                pass
+        handle.texture = None
+        return True
+
+    def wait(self, timeout=None):
+        """
+        阻塞直到所有已请求的纹理就绪(用于性能测试等需要确定状态的场合)
+
+        参数:
+            timeout (float): 最长等待时间(秒)，None为一直等待
+
+        返回:
+            bool: 是否全部处理完
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self._outstanding:
+            if self._decoded:
+                self.update(budget=float("inf"))
+            elif deadline is not None and time.perf_counter() >= deadline:
+                return False
+            else:
+                time.sleep(0.001)
+        return True
+
+    def _schedule(self):
+        """有待处理的纹理时，每帧在主线程上调用一次update"""
+        if not self._scheduled:
+            self._scheduled = True
+            arcade.schedule(self._tick, 1 / 60)
+
+    def _tick(self, delta_time):
+        self.update()
+        if not self._outstanding:
+            arcade.unschedule(self._tick)
+            self._scheduled = False
+
+    def shutdown(self):
+        """停止解码线程"""
+        self._executor.shutdown(wait=False)
+
+
+# 全局共享的加载器
+_default_loader = None
+
+
+def get_asset_loader():
+    """返回全局共享的纹理加载器"""
+    global _default_loader
+    if _default_loader is None:
+        _default_loader = AssetLoader()
+    return _default_loader
@@ -1,6 +1,12 @@
 import arcade
-import random
 import math
+import random
+from pyglet import gl
+from shape_cache import ShapeCache, create_circle_filled
+from text_cache import draw_cached_text
+from particles import ParticleField
+from render_target import RenderTarget, window_samples
+import circle_batch
 
 class BedroomItem:
     """卧室物品基类，定义所有可交互物品的基本属性和方法"""
@@ -24,6 +30,27 @@ class BedroomItem:
         self.is_hovered = False  # 鼠标是否悬停在物品上
         self.is_active = False   # 物品是否被激活(例如被点击)
         self.message = ""        # 物品的交互消息
+        self._shape_cache = ShapeCache()  # 静态图元缓存
+        self.spatial_index = None        # 所属的空间索引(由SpatialIndex.insert设置)
+        self.redraw_scheduler = None     # 所属的重绘调度器(由RedrawScheduler.track设置)
+    
+    def geometry_key(self):
+        """
+        静态图元的缓存键
+        
+        返回:
+            tuple: 影响静态图元的属性，任何一项变化都会触发重建
+        """
+        return (self.x, self.y, self.width, self.height)
+    
+    def draw_static_shapes(self, build):
+        """
+        绘制缓存的静态图元
+        
+        参数:
+            build (callable): 构建函数，接收一个ShapeElementList并向其中添加图元
+        """
+        self._shape_cache.draw(self.geometry_key(), build)
     
     def draw(self):
         """绘制物品，需要在子类中实现"""
@@ -39,7 +66,7 @@ class BedroomItem:
             )
             
             # 在物品上方绘制名称标签
-            arcade.draw_text(
+            draw_cached_text(
                 self.name,
                 start_x=self.x,
                 start_y=self.y + self.height/2 + 15,
@@ -48,6 +75,25 @@ class BedroomItem:
                 anchor_x="center"
             )
     
+    def move_to(self, x, y):
+        """
+        移动物品，并同步更新所属的空间索引
+        
+        参数:
+            x (float): 新的中心X坐标
+            y (float): 新的中心Y坐标
+        """
+        self.x = x
+        self.y = y
+        if self.spatial_index is not None:
+            self.spatial_index.update(self)
+        self.mark_dirty()
+    
+    def mark_dirty(self):
+        """通知所属的重绘调度器画面需要重绘"""
+        if self.redraw_scheduler is not None:
+            self.redraw_scheduler.mark_dirty()
+    
     def is_clicked(self, x, y):
         """
         检测物品是否被点击
@@ -110,57 +156,65 @@ class Bed(BedroomItem):
             "床上放着几个毛绒玩具，都是儿时的好伙伴"
         ]
     
+    def geometry_key(self):
+        """床上的玩具随激活状态显示或隐藏，因此激活状态也是缓存键的一部分"""
+        return super().geometry_key() + (self.is_active,)
+    
     def draw(self):
         """绘制床"""
+        self.draw_static_shapes(self.build_static_shapes)
+        
+        # 绘制悬停效果
+        self.draw_hover_effect()
+    
+    def build_static_shapes(self, shapes):
+        """构建床的静态图元"""
         # 床架
-        arcade.draw_rectangle_filled(
+        shapes.append(arcade.create_rectangle_filled(
             self.x, self.y, self.width, self.height,
             arcade.color.BROWN
-        )
+        ))
         
         # 床垫
-        arcade.draw_rectangle_filled(
+        shapes.append(arcade.create_rectangle_filled(
             self.x, self.y + self.height * 0.1,
             self.width * 0.9, self.height * 0.6,
             arcade.color.WHITE
-        )
+        ))
         
         # 枕头
-        arcade.draw_rectangle_filled(
+        shapes.append(arcade.create_rectangle_filled(
             self.x - self.width * 0.25, self.y + self.height * 0.2,
             self.width * 0.3, self.height * 0.3,
             arcade.color.LIGHT_BLUE
-        )
+        ))
         
         # 被子
-        arcade.draw_rectangle_filled(
+        shapes.append(arcade.create_rectangle_filled(
             self.x + self.width * 0.05, self.y + self.height * 0.1,
             self.width * 0.6, self.height * 0.5,
             arcade.color.PINK
-        )
+        ))
         
-        # 绘制毛绒玩具
+        # 毛绒玩具
         if not self.is_active:  # 只在床没被激活时显示玩具
             # 小熊
-            arcade.draw_circle_filled(
+            shapes.append(create_circle_filled(
                 self.x - self.width * 0.1, 
                 self.y + self.height * 0.25,
                 15, arcade.color.BROWN
-            )
+            ))
             # 熊耳朵
-            arcade.draw_circle_filled(
+            shapes.append(create_circle_filled(
                 self.x - self.width * 0.1 - 8, 
                 self.y + self.height * 0.25 + 10,
                 5, arcade.color.BROWN
-            )
-            arcade.draw_circle_filled(
+            ))
+            shapes.append(create_circle_filled(
                 self.x - self.width * 0.1 + 8, 
                 self.y + self.height * 0.25 + 10,
                 5, arcade.color.BROWN
-            )
-        
-        # 绘制悬停效果
-        self.draw_hover_effect()
+            ))
     
     def on_click(self):
         """点击床时的处理"""
@@ -190,58 +244,66 @@ class Desk(BedroomItem):
             "书桌抽屉里好像塞着一些小秘密"
         ]
     
+    def geometry_key(self):
+        """台灯颜色随激活状态变化，因此激活状态也是缓存键的一部分"""
+        return super().geometry_key() + (self.is_active,)
+    
     def draw(self):
         """绘制书桌"""
+        self.draw_static_shapes(self.build_static_shapes)
+        
+        # 绘制悬停效果
+        self.draw_hover_effect()
+    
+    def build_static_shapes(self, shapes):
+        """构建书桌的静态图元"""
         # 桌面
-        arcade.draw_rectangle_filled(
+        shapes.append(arcade.create_rectangle_filled(
             self.x, self.y, self.width, self.height * 0.1,
             arcade.color.BROWN
-        )
+        ))
         
         # 桌腿
-        arcade.draw_rectangle_filled(
+        shapes.append(arcade.create_rectangle_filled(
             self.x - self.width * 0.4, self.y - self.height * 0.4,
             self.width * 0.1, self.height * 0.8,
             arcade.color.BROWN
-        )
-        arcade.draw_rectangle_filled(
+        ))
+        shapes.append(arcade.create_rectangle_filled(
             self.x + self.width * 0.4, self.y - self.height * 0.4,
             self.width * 0.1, self.height * 0.8,
             arcade.color.BROWN
-        )
+        ))
         
         # 桌上物品
         # 台灯
-        arcade.draw_rectangle_filled(
+        shapes.append(arcade.create_rectangle_filled(
             self.x - self.width * 0.3, self.y + self.height * 0.2,
             self.width * 0.1, self.height * 0.3,
             arcade.color.DARK_GRAY
-        )
-        arcade.draw_circle_filled(
+        ))
+        shapes.append(create_circle_filled(
             self.x - self.width * 0.3, self.y + self.height * 0.4,
             self.width * 0.08,
             arcade.color.YELLOW if self.is_active else arcade.color.LIGHT_GRAY
-        )
+        ))
         
         # 书本
         book_colors = [arcade.color.RED, arcade.color.GREEN, arcade.color.BLUE]
         for i in range(3):
-            arcade.draw_rectangle_filled(
+            shapes.append(arcade.create_rectangle_filled(
                 self.x + self.width * 0.2 - i * 10, 
                 self.y + self.height * 0.1 + i * 10,
                 self.width * 0.2, self.height * 0.05,
                 book_colors[i]
-            )
+            ))
         
         # 铅笔
-        arcade.draw_line(
+        shapes.append(arcade.create_line(
             self.x + self.width * 0.1, self.y + self.height * 0.05,
             self.x + self.width * 0.3, self.y + self.height * 0.05,
             arcade.color.YELLOW, 3
-        )
-        
-        # 绘制悬停效果
-        self.draw_hover_effect()
+        ))
     
     def on_click(self):
         """点击书桌时的处理"""
@@ -253,6 +315,15 @@ class Desk(BedroomItem):
 class Computer(BedroomItem):
     """电脑，可以用来玩游戏或者上网"""
     
+    # 桌面离屏目标在内容范围之外多留的像素，容纳压在边缘上的边框
+    DESKTOP_PADDING = 2
+    
+    # 任务栏: 中心在弹窗底边上方10像素，高30(下半截伸出弹窗)
+    TASKBAR_OFFSET = 10
+    TASKBAR_HEIGHT = 30
+    # 时钟文字右端在弹窗右边内侧的距离
+    CLOCK_OFFSET = 8
+    
     def __init__(self, x, y, width=100, height=80):
         """
         初始化电脑
@@ -292,6 +363,15 @@ class Computer(BedroomItem):
             {"name": "记事本", "x": 160, "y": 120, "color": arcade.color.WHITE}
         ]
         self.taskbar_programs = ["开始", "QQ", "我的电脑", "IE浏览器"]
+        self.clock_text = "16:30"  # 任务栏时钟
+        
+        # 桌面内容几乎不变: 渲染一次到离屏目标，图标、任务栏或时钟变化时才重新渲染
+        self._desktop_target = None
+        self._desktop_key = None
+        self.desktop_render_count = 0  # 重新渲染次数，便于调试
+        # 桌面内的可点击区域表，布局变化时重建
+        self._desktop_regions = None
+        self._desktop_layout_key = None
     
     def draw(self):
         """绘制电脑"""
@@ -329,7 +409,7 @@ class Computer(BedroomItem):
         )
         
         # 绘制鼠标
-        arcade.draw_circle_filled(
+        circle_batch.draw_circle_filled(
             self.x + self.width * 0.4, self.y - self.height * 0.4,
             self.width * 0.1,
             arcade.color.LIGHT_GRAY
@@ -338,16 +418,17 @@ class Computer(BedroomItem):
         # 如果电脑开着，画一些屏幕元素
         if self.is_active:
             if self.current_screen == 0:  # QQ界面
-                # 绘制QQ图标
-                arcade.draw_circle_filled(
-                    self.x, self.y + self.height * 0.1,
-                    10, arcade.color.WHITE
-                )
-                # 绘制企鹅身体
-                arcade.draw_circle_filled(
-                    self.x, self.y + self.height * 0.05,
-                    15, arcade.color.BLACK
-                )
+                with circle_batch.circle_layer():
+                    # 绘制QQ图标
+                    circle_batch.draw_circle_filled(
+                        self.x, self.y + self.height * 0.1,
+                        10, arcade.color.WHITE
+                    )
+                    # 绘制企鹅身体
+                    circle_batch.draw_circle_filled(
+                        self.x, self.y + self.height * 0.05,
+                        15, arcade.color.BLACK
+                    )
             elif self.current_screen == 1:  # 游戏界面
                 # 绘制游戏场景（简单的格子）
                 for i in range(3):
@@ -391,17 +472,106 @@ class Computer(BedroomItem):
         # 绘制悬停效果
         self.draw_hover_effect()
     
+    def desktop_layout_key(self):
+        """
+        桌面布局的缓存键
+        
+        返回:
+            tuple: 桌面位置尺寸、图标和任务栏程序，任何一项变化都会重建区域表并重新渲染
+        """
+        return (
+            self.desktop_pos, self.desktop_size,
+            tuple((icon["name"], icon["x"], icon["y"], tuple(icon["color"]))
+                  for icon in self.desktop_icons),
+            tuple(self.taskbar_programs),
+        )
+    
+    def desktop_content_bounds(self):
+        """
+        桌面内容实际覆盖的范围: 任务栏和开始按钮伸出弹窗底边，时钟右对齐在弹窗之内
+        
+        返回:
+            tuple: (left, bottom, right, top)，屏幕坐标
+        """
+        desktop_x, desktop_y = self.desktop_pos
+        desktop_width, desktop_height = self.desktop_size
+        left = desktop_x - desktop_width/2
+        right = desktop_x + desktop_width/2
+        bottom = desktop_y - desktop_height/2
+        top = desktop_y + desktop_height/2
+        taskbar_bottom = bottom + self.TASKBAR_OFFSET - self.TASKBAR_HEIGHT/2
+        return left, min(bottom, taskbar_bottom), right, top
+    
     def draw_desktop(self):
-        """绘制电脑桌面界面"""
+        """绘制电脑桌面界面: 内容变化时重新渲染到离屏目标，每帧只贴一次纹理"""
+        content_left, content_bottom, content_right, content_top = self.desktop_content_bounds()
+        pad = self.DESKTOP_PADDING
+        left = math.floor(content_left) - pad
+        bottom = math.floor(content_bottom) - pad
+        width = math.ceil(content_right) + pad - left
+        height = math.ceil(content_top) + pad - bottom
+        
+        target = self._desktop_target
+        if target is None or (target.width, target.height) != (width, height):
+            # 按实际帧缓冲分辨率渲染，高分屏上文字不模糊
+            window = arcade.get_window()
+            scale = window.get_framebuffer_size()[0] / max(1, window.width)
+            target = self._desktop_target = RenderTarget(width, height, scale=scale,
+                                                         samples=window_samples())
+            self._desktop_key = None
+        
+        key = (self.desktop_layout_key(), self.clock_text)
+        if key != self._desktop_key:
+            # 边框外的留白保持透明; 不透明的底色上每个采样点的颜色都是最终颜色，
+            # 解析后的纹理就是预乘透明度的(颜色和覆盖率都按采样点平均)
+            with target.activate(blend=RenderTarget.BLEND_ALPHA,
+                                 projection=(left, left + width, bottom, bottom + height)):
+                target.clear()
+                self.render_desktop()
+                self._fill_desktop_alpha()
+            self._desktop_key = key
+            self.desktop_render_count += 1
+        
+        target.draw(left, bottom, width, height, blend=RenderTarget.BLEND_PREMULTIPLIED)
+    
+    def _desktop_backgrounds(self):
+        """
+        桌面上不透明的底色: 弹窗背景和任务栏，其余内容都画在它们上面
+        
+        返回:
+            list: (center_x, center_y, width, height, color)
+        """
         desktop_x, desktop_y = self.desktop_pos
         desktop_width, desktop_height = self.desktop_size
+        return [
+            (desktop_x, desktop_y, desktop_width, desktop_height, arcade.color.LIGHT_BLUE),
+            (desktop_x, desktop_y - desktop_height/2 + self.TASKBAR_OFFSET,
+             desktop_width, self.TASKBAR_HEIGHT, arcade.color.LIGHT_GRAY),
+        ]
+    
+    def _fill_desktop_alpha(self):
+        """
+        把底色覆盖的采样点的透明度写回1
+        
+        透明目标里用普通混合画文字时，透明度通道也按src.a混合，
+        字形边缘会在不透明的底色上留下半透明的像素。用同样的图元只写透明度通道，
+        覆盖的采样点与底色完全相同。
+        """
+        gl.glColorMask(False, False, False, True)
+        try:
+            for center_x, center_y, width, height, _ in self._desktop_backgrounds():
+                arcade.draw_rectangle_filled(center_x, center_y, width, height, arcade.color.WHITE)
+        finally:
+            gl.glColorMask(True, True, True, True)
+    
+    def render_desktop(self):
+        """绘制桌面的全部内容(屏幕坐标)"""
+        desktop_x, desktop_y = self.desktop_pos
+        desktop_width, desktop_height = self.desktop_size
+        desktop_background, taskbar_background = self._desktop_backgrounds()
         
         # 绘制桌面背景
-        arcade.draw_rectangle_filled(
-            desktop_x, desktop_y,
-            desktop_width, desktop_height,
-            arcade.color.LIGHT_BLUE
-        )
+        arcade.draw_rectangle_filled(*desktop_background)
         
         # 绘制桌面边框
         arcade.draw_rectangle_outline(
@@ -418,7 +588,7 @@ class Computer(BedroomItem):
         )
         
         # 绘制窗口标题
-        arcade.draw_text(
+        draw_cached_text(
             "Windows 98 桌面",
             start_x=desktop_x - desktop_width/2 + 10,
             start_y=desktop_y + desktop_height/2 - 10,
@@ -433,7 +603,7 @@ class Computer(BedroomItem):
             15, 15,
             arcade.color.RED
         )
-        arcade.draw_text(
+        draw_cached_text(
             "X",
             start_x=desktop_x + desktop_width/2 - 10,
             start_y=desktop_y + desktop_height/2 - 10,
@@ -454,7 +624,7 @@ class Computer(BedroomItem):
             )
             
             # 绘制图标名称
-            arcade.draw_text(
+            draw_cached_text(
                 icon["name"],
                 start_x=desktop_x - desktop_width/2 + icon["x"],
                 start_y=desktop_y - desktop_height/2 + icon["y"] - 25,
@@ -467,11 +637,7 @@ class Computer(BedroomItem):
             )
         
         # 绘制任务栏
-        arcade.draw_rectangle_filled(
-            desktop_x, desktop_y - desktop_height/2 + 10,
-            desktop_width, 30,
-            arcade.color.LIGHT_GRAY
-        )
+        arcade.draw_rectangle_filled(*taskbar_background)
         
         # 绘制开始按钮
         arcade.draw_rectangle_filled(
@@ -479,7 +645,7 @@ class Computer(BedroomItem):
             50, 25,
             arcade.color.GREEN
         )
-        arcade.draw_text(
+        draw_cached_text(
             "开始",
             start_x=desktop_x - desktop_width/2 + 25,
             start_y=desktop_y - desktop_height/2 + 10,
@@ -496,7 +662,7 @@ class Computer(BedroomItem):
                 60, 20,
                 arcade.color.ALICE_BLUE
             )
-            arcade.draw_text(
+            draw_cached_text(
                 program,
                 start_x=desktop_x - desktop_width/2 + 25 + i * 70,
                 start_y=desktop_y - desktop_height/2 + 10,
@@ -507,13 +673,13 @@ class Computer(BedroomItem):
             )
         
         # 绘制时钟
-        time_str = "16:30"
-        arcade.draw_text(
-            time_str,
-            start_x=desktop_x + desktop_width/2 - 30,
-            start_y=desktop_y - desktop_height/2 + 10,
+        draw_cached_text(
+            self.clock_text,
+            start_x=desktop_x + desktop_width/2 - self.CLOCK_OFFSET,
+            start_y=desktop_y - desktop_height/2 + self.TASKBAR_OFFSET,
             color=arcade.color.BLACK,
             font_size=12,
+            anchor_x="right",
             anchor_y="center"
         )
     
@@ -547,62 +713,71 @@ class Computer(BedroomItem):
         
         return self.message
         
-    def is_desktop_close_clicked(self, x, y):
-        """检查是否点击了桌面窗口的关闭按钮"""
-        if not self.show_desktop:
-            return False
+    def desktop_regions(self):
+        """
+        桌面内的可点击区域表，布局不变时直接复用
         
+        返回:
+            list: (left, bottom, right, top, 类型, 名称)，按命中优先级排列，
+                类型为"close"、"icon"、"start"、"program"或"desktop"
+        """
+        key = self.desktop_layout_key()
+        if key != self._desktop_layout_key:
+            self._desktop_regions = self._build_desktop_regions()
+            self._desktop_layout_key = key
+        return self._desktop_regions
+    
+    def _build_desktop_regions(self):
+        """按当前布局计算可点击区域，都裁剪到桌面范围内"""
         desktop_x, desktop_y = self.desktop_pos
         desktop_width, desktop_height = self.desktop_size
-        
-        # 关闭按钮的位置
-        close_btn_x = desktop_x + desktop_width/2 - 10
-        close_btn_y = desktop_y + desktop_height/2 - 10
-        
-        # 判断点击位置是否在关闭按钮范围内
-        if (abs(x - close_btn_x) <= 10 and 
-            abs(y - close_btn_y) <= 10):
-            return True
-            
-        return False
-        
+        desktop_left = desktop_x - desktop_width/2
+        desktop_bottom = desktop_y - desktop_height/2
+        desktop_right = desktop_x + desktop_width/2
+        desktop_top = desktop_y + desktop_height/2
+        
+        def region(center_x, center_y, half_width, half_height, kind, name=None):
+            return (max(center_x - half_width, desktop_left),
+                    max(center_y - half_height, desktop_bottom),
+                    min(center_x + half_width, desktop_right),
+                    min(center_y + half_height, desktop_top),
+                    kind, name)
+        
+        # 关闭按钮
+        regions = [region(desktop_right - 10, desktop_top - 10, 10, 10, "close")]
+        
+        # 桌面图标
+        for icon in self.desktop_icons:
+            regions.append(region(desktop_left + icon["x"], desktop_bottom + icon["y"],
+                                  20, 20, "icon", icon["name"]))
+        
+        # 任务栏程序(第一个是开始按钮)
+        for i, program in enumerate(self.taskbar_programs):
+            kind = "start" if program == "开始" else "program"
+            regions.append(region(desktop_left + 25 + i * 70, desktop_bottom + 10,
+                                  30, 15, kind, program))
+        
+        # 其余的桌面空白处
+        regions.append((desktop_left, desktop_bottom, desktop_right, desktop_top, "desktop", None))
+        return regions
+    
     def handle_desktop_click(self, x, y):
         """处理桌面内点击"""
         if not self.show_desktop:
             return None
         
-        desktop_x, desktop_y = self.desktop_pos
-        desktop_width, desktop_height = self.desktop_size
-        
-        # 判断点击是否在桌面范围内
-        if (abs(x - desktop_x) <= desktop_width/2 and 
-            abs(y - desktop_y) <= desktop_height/2):
-            
-            # 检查是否点击了关闭按钮
-            if self.is_desktop_close_clicked(x, y):
+        for left, bottom, right, top, kind, name in self.desktop_regions():
+            if not (left <= x <= right and bottom <= y <= top):
+                continue
+            if kind == "close":
                 self.show_desktop = False
                 return "关闭了桌面窗口"
-                
-            # 检查是否点击了任何桌面图标
-            for icon in self.desktop_icons:
-                icon_x = desktop_x - desktop_width/2 + icon["x"]
-                icon_y = desktop_y - desktop_height/2 + icon["y"]
-                
-                if (abs(x - icon_x) <= 20 and 
-                    abs(y - icon_y) <= 20):
-                    return f"点击了'{icon['name']}'图标"
-            
-            # 检查是否点击了任务栏程序
-            if abs(y - (desktop_y - desktop_height/2 + 10)) <= 15:
-                for i, program in enumerate(self.taskbar_programs):
-                    program_x = desktop_x - desktop_width/2 + 25 + i * 70
-                    
-                    if abs(x - program_x) <= 30:
-                        if program == "开始":
-                            return "点击了开始菜单"
-                        else:
-                            return f"打开了{program}"
-            
+            if kind == "icon":
+                return f"点击了'{name}'图标"
+            if kind == "start":
+                return "点击了开始菜单"
+            if kind == "program":
+                return f"打开了{name}"
             return "点击了桌面空白处"
         
         return None
@@ -640,7 +815,7 @@ class HomeworkBook(BedroomItem):
         )
         
         # 绘制作业本封面标题
-        arcade.draw_text(
+        draw_cached_text(
             "暑假\n作业",
             start_x=self.x,
             start_y=self.y + 15,
@@ -679,7 +854,7 @@ class HomeworkBook(BedroomItem):
             )
             
             # 绘制进度文字
-            arcade.draw_text(
+            draw_cached_text(
                 f"完成: {self.progress}%",
                 start_x=self.x - self.width * 0.6,
                 start_y=self.y - self.height * 0.3 - 15,
@@ -689,7 +864,7 @@ class HomeworkBook(BedroomItem):
             )
             
             # 右侧页面绘制一些文字和练习题
-            arcade.draw_text(
+            draw_cached_text(
                 "练习题:\n1. 1+1=?\n2. 2+2=?\n3. ...",
                 start_x=self.x + self.width * 0.3,
                 start_y=self.y + self.height * 0.3,
@@ -760,29 +935,39 @@ class Window(BedroomItem):
             ]
         }
         
-        # 窗外的星星
-        self.stars = []
-        for _ in range(20):
-            self.stars.append({
-                'x': random.randint(int(self.x - self.width/2), int(self.x + self.width/2)),
-                'y': random.randint(int(self.y - self.height/2), int(self.y + self.height/2)),
-                'size': random.uniform(1, 3),
-                'twinkle_speed': random.uniform(1, 3),
-                'alpha': random.randint(100, 255)
-            })
-        
-        # 窗外的云朵
-        self.clouds = []
-        for _ in range(3):
-            self.clouds.append({
-                'x': random.randint(int(self.x - self.width/2), int(self.x + self.width/2)),
-                'y': random.randint(int(self.y - self.height/4), int(self.y + self.height/4)),
-                'size': random.uniform(20, 40),
-                'speed': random.uniform(0.2, 0.5) * random.choice([-1, 1]),
-            })
+        # 窗外的星星和云朵用粒子场批量更新、一次绘制
+        left = self.x - self.width/2
+        right = self.x + self.width/2
+        self.stars = ParticleField.twinkling_stars(
+            20, (left, self.y - self.height/2, right, self.y + self.height/2)
+        )
+        # 云朵在窗户中间一半的高度内漂移，越过左右边缘一个云朵大小后绕回
+        self.clouds = ParticleField.drifting_clouds(
+            3, (left, self.y - self.height/4, right, self.y + self.height/4)
+        )
         
         # 计时器
         self.total_time = 0
+        
+        # 当前的光照状态(time_of_day.TimeSample)，没有时按day_time显示
+        self.time_sample = None
+    
+    def set_time_of_day(self, sample):
+        """
+        设置光照状态，天空、窗框颜色和日月星云的透明度都随之渐变
+        
+        参数:
+            sample (TimeSample): 当前分钟的光照状态
+        """
+        self.time_sample = sample
+        self.day_time = "day" if sample.day_weight >= 0.5 else "night"
+        self.mark_dirty()
+    
+    def day_weight(self):
+        """白天景色的权重(0为夜晚，1为白天)"""
+        if self.time_sample is not None:
+            return self.time_sample.day_weight
+        return 1.0 if self.day_time == "day" else 0.0
     
     def update(self, delta_time):
         """
@@ -793,79 +978,75 @@ class Window(BedroomItem):
         """
         self.total_time += delta_time
         
-        # 更新星星闪烁
-        for star in self.stars:
-            # 根据时间和各自速度调整星星的alpha值
-            star['alpha'] = 128 + int(127 * math.sin(self.total_time * star['twinkle_speed']))
+        # 只更新当前看得见的动画: 夜晚星星闪烁，白天云朵漂移，黄昏和黎明两者都有
+        weight = self.day_weight()
+        if weight < 1:
+            self.stars.update(delta_time)
+        if weight > 0:
+            self.clouds.update(delta_time)
+        self.mark_dirty()
+    
+    def interpolate(self, alpha):
+        """
+        设置星星和云朵的渲染插值系数
         
-        # 更新云朵位置
-        for cloud in self.clouds:
-            cloud['x'] += cloud['speed']
-            # 如果云朵移出窗口，重新放到另一边
-            if cloud['x'] > self.x + self.width/2 + cloud['size']:
-                cloud['x'] = self.x - self.width/2 - cloud['size']
-            elif cloud['x'] < self.x - self.width/2 - cloud['size']:
-                cloud['x'] = self.x + self.width/2 + cloud['size']
+        参数:
+            alpha (float): 0为上一步的位置，1为当前位置
+        """
+        self.stars.interpolate(alpha)
+        self.clouds.interpolate(alpha)
+        self.mark_dirty()
     
     def draw(self):
         """绘制窗户"""
+        weight = self.day_weight()
+        if self.time_sample is not None:
+            frame_color = self.time_sample.window
+            sky_color = self.time_sample.sky
+        else:
+            frame_color = arcade.color.BROWN
+            sky_color = arcade.color.SKY_BLUE if self.day_time == "day" else arcade.color.DARK_BLUE
+        
+        # 窗外的天空，颜色随时间渐变
+        arcade.draw_rectangle_filled(
+            self.x, self.y, self.width - 10, self.height - 10,
+            sky_color
+        )
+        
+        # 夜晚的月亮和星星，黎明时逐渐淡出
+        if weight < 1:
+            circle_batch.draw_circle_filled(
+                self.x - 40, self.y + 40, 25,
+                arcade.color.YELLOW[:3] + (int(255 * (1 - weight)),)
+            )
+            self.stars.draw(opacity=1 - weight)
+        
+        # 白天的太阳和云朵，黄昏时逐渐淡出
+        if weight > 0:
+            circle_batch.draw_circle_filled(
+                self.x + 40, self.y + 40, 25,
+                arcade.color.YELLOW[:3] + (int(255 * weight),)
+            )
+            self.clouds.draw(opacity=weight)
+        
         # 绘制窗框
         arcade.draw_rectangle_outline(
             self.x, self.y, self.width, self.height,
-            arcade.color.BROWN, 8
+            frame_color, 8
         )
         
         # 绘制窗户的十字框
         arcade.draw_line(
             self.x - self.width/2, self.y,
             self.x + self.width/2, self.y,
-            arcade.color.BROWN, 5
+            frame_color, 5
         )
         arcade.draw_line(
             self.x, self.y - self.height/2,
             self.x, self.y + self.height/2,
-            arcade.color.BROWN, 5
+            frame_color, 5
         )
         
-        # 窗外的景色取决于时间
-        if self.day_time == "night":
-            # 夜晚
-            # 绘制窗外的夜空
-            arcade.draw_rectangle_filled(
-                self.x, self.y, self.width - 10, self.height - 10,
-                arcade.color.DARK_BLUE
-            )
-            
-            # 绘制月亮
-            arcade.draw_circle_filled(
-                self.x - 40, self.y + 40, 25,
-                arcade.color.YELLOW
-            )
-            
-            # 绘制星星
-            for star in self.stars:
-                arcade.draw_circle_filled(
-                    star['x'], star['y'], star['size'],
-                    (255, 255, 255, star['alpha'])
-                )
-        else:
-            # 白天
-            # 绘制窗外的蓝天
-            arcade.draw_rectangle_filled(
-                self.x, self.y, self.width - 10, self.height - 10,
-                arcade.color.SKY_BLUE
-            )
-            
-            # 绘制太阳
-            arcade.draw_circle_filled(
-                self.x + 40, self.y + 40, 25,
-                arcade.color.YELLOW
-            )
-            
-            # 绘制云朵
-            for cloud in self.clouds:
-                self.draw_cloud(cloud['x'], cloud['y'], cloud['size'])
-        
         # 如果窗户打开，绘制打开的窗户
         if self.is_open:
             # 打开的窗户（一半透明）
@@ -877,21 +1058,6 @@ class Window(BedroomItem):
         # 绘制悬停效果
         self.draw_hover_effect()
     
-    def draw_cloud(self, x, y, size):
-        """
-        绘制云朵
-        
-        参数:
-            x (float): 云朵中心的X坐标
-            y (float): 云朵中心的Y坐标
-            size (float): 云朵大小
-        """
-        arcade.draw_circle_filled(x, y, size, arcade.color.WHITE)
-        arcade.draw_circle_filled(x + size*0.6, y, size*0.7, arcade.color.WHITE)
-        arcade.draw_circle_filled(x - size*0.6, y, size*0.7, arcade.color.WHITE)
-        arcade.draw_circle_filled(x + size*0.3, y + size*0.3, size*0.7, arcade.color.WHITE)
-        arcade.draw_circle_filled(x - size*0.3, y + size*0.3, size*0.7, arcade.color.WHITE)
-    
     def on_click(self):
         """点击窗户时的处理"""
         self.is_open = not self.is_open
@@ -911,6 +1077,8 @@ class Window(BedroomItem):
             on_time_change (callable): 时间变化时的回调函数，接收当前时间状态("day"或"night")作为参数
         """
         old_time = self.day_time
+        # 手动切换后按day_time显示，直到下一次设置光照状态
+        self.time_sample = None
         if self.day_time == "night":
             self.day_time = "day"
             self.message = "天亮了，又是美好的一天"
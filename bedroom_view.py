@@ -7,6 +7,11 @@ import math
 # 只导入必要的常量
 from interactive_room_game import SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE
 from bedroom_items import Bed, Desk, Computer, HomeworkBook, Window
+from spatial_index import SpatialIndex
+from sim_clock import SimulationClock
+from log_utils import get_logger
+
+logger = get_logger(__name__)
 
 class BedroomView(arcade.View):
     """90后童年卧室视图，展示开场白并作为游戏的中转页面"""
@@ -45,7 +50,8 @@ class BedroomView(arcade.View):
         self.desk = Desk(SCREEN_WIDTH * 0.25, SCREEN_HEIGHT * 0.5)
         self.computer = Computer(SCREEN_WIDTH * 0.25, SCREEN_HEIGHT * 0.6)
         self.homework = HomeworkBook(SCREEN_WIDTH * 0.6, SCREEN_HEIGHT * 0.55)
-        self.window = Window(SCREEN_WIDTH * 0.75, SCREEN_HEIGHT * 0.6)
+        # 不能命名为self.window，否则会覆盖arcade.View所属的窗口
+        self.window_item = Window(SCREEN_WIDTH * 0.75, SCREEN_HEIGHT * 0.6)
         
         # 将所有物品加入列表，方便统一管理
         self.interactive_items = [
@@ -53,9 +59,14 @@ class BedroomView(arcade.View):
             self.desk, 
             self.computer,
             self.homework,
-            self.window
+            self.window_item
         ]
         
+        # 悬停和点击检测使用空间索引
+        self.spatial_index = SpatialIndex()
+        for item in self.interactive_items:
+            self.spatial_index.insert(item)
+        
         # 当前显示的消息
         self.current_message = ""
         self.message_timer = 0  # 消息显示计时器
@@ -73,26 +84,35 @@ class BedroomView(arcade.View):
         
         # 防止重复点击的标志
         self.is_transitioning = False
+        
+        # 固定步长模拟时钟，动画速度与帧率无关
+        self.clock = SimulationClock()
     
     def on_show_view(self):
         """显示视图时调用"""
         arcade.set_background_color(arcade.color.BEIGE)
         self.is_transitioning = False
+        self.clock.reset()
     
     def on_update(self, delta_time):
-        """更新动画"""
+        """按固定步长推进动画，窗外景色在两步之间插值"""
+        self.clock.advance(delta_time, self.fixed_update)
+        self.window_item.interpolate(self.clock.render_alpha)
+    
+    def fixed_update(self, delta_time):
+        """推进一步动画"""
         self.total_time += delta_time
         self.text_timer += delta_time
         
         # 更新欢迎阶段的文字淡入淡出效果
         if self.welcome_phase:
             if self.fade_in:
-                self.text_alpha += 2  # 淡入速度
+                self.text_alpha += 120 * delta_time  # 淡入速度(每秒)
                 if self.text_alpha >= 255:
                     self.text_alpha = 255
                     self.fade_in = False
             else:
-                self.text_alpha -= 2  # 淡出速度
+                self.text_alpha -= 120 * delta_time  # 淡出速度(每秒)
                 if self.text_alpha <= 0:
                     self.text_alpha = 0
                     self.fade_in = True
@@ -138,7 +158,7 @@ class BedroomView(arcade.View):
                 self.intro_text[self.current_line],
                 start_x=SCREEN_WIDTH // 2,
                 start_y=SCREEN_HEIGHT * 0.8,
-                color=(0, 0, 0, self.text_alpha),
+                color=(0, 0, 0, int(self.text_alpha)),
                 font_size=24,
                 anchor_x="center",
                 bold=True
@@ -186,38 +206,36 @@ class BedroomView(arcade.View):
     def direct_to_game(self):
         """创建并切换到游戏视图"""
         try:
-            print("正在准备切换到游戏视图...")
+            logger.info("正在准备切换到游戏视图")
             
             # 使用延迟导入，避免循环导入问题
             import importlib
             
             # 导入room_view模块
             room_view_module = importlib.import_module('room_view')
-            print("已动态导入RoomGameView模块")
+            logger.debug("已动态导入RoomGameView模块")
             
             # 创建新的游戏视图实例
             if self.use_enhanced_version:
-                print("创建增强版游戏视图")
+                logger.debug("创建增强版游戏视图")
                 game_view = room_view_module.RoomGameView(enhanced=True, username=self.username)
             else:
-                print("创建基础版游戏视图")
+                logger.debug("创建基础版游戏视图")
                 game_view = room_view_module.RoomGameView(enhanced=False, username=self.username)
             
-            print(f"游戏视图ID: {id(game_view)}")
-            print("游戏视图已创建，准备切换...")
+            logger.debug("游戏视图ID: %s", id(game_view))
+            logger.debug("游戏视图已创建，准备切换")
             
             # 获取当前窗口对象
             current_window = self.window
-            print(f"当前窗口ID: {id(current_window)}")
+            logger.debug("当前窗口ID: %s", id(current_window))
             
             # 切换到游戏视图，关闭防重复点击标记
             self.is_transitioning = False
             current_window.show_view(game_view)
-            print("已切换到游戏视图")
-        except Exception as e:
-            print(f"进入游戏时出错: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.info("已切换到游戏视图")
+        except Exception:
+            logger.exception("进入游戏时出错")
             self.is_transitioning = False
     
     def on_mouse_press(self, x, y, button, modifiers):
@@ -232,31 +250,27 @@ class BedroomView(arcade.View):
             return
         
         # 检查是否点击了物品
-        item_clicked = False
-        for item in self.interactive_items:
-            if item.is_clicked(x, y):
-                item_clicked = True
-                
-                # 根据点击的按钮类型处理
-                if button == arcade.MOUSE_BUTTON_LEFT:
-                    # 左键点击
-                    message = item.on_click()
+        item = self.spatial_index.first_at(x, y)
+        if item is not None:
+            # 根据点击的按钮类型处理
+            if button == arcade.MOUSE_BUTTON_LEFT:
+                # 左键点击
+                message = item.on_click()
+                self.current_message = message
+                self.message_timer = 0
+            elif button == arcade.MOUSE_BUTTON_RIGHT:
+                # 右键点击，特殊处理
+                if isinstance(item, Window):
+                    message = item.change_time()
+                    self.current_message = message
+                    self.message_timer = 0
+                elif isinstance(item, Computer):
+                    message = item.on_right_click()
                     self.current_message = message
                     self.message_timer = 0
-                elif button == arcade.MOUSE_BUTTON_RIGHT:
-                    # 右键点击，特殊处理
-                    if isinstance(item, Window):
-                        message = item.change_time()
-                        self.current_message = message
-                        self.message_timer = 0
-                    elif isinstance(item, Computer):
-                        message = item.on_right_click()
-                        self.current_message = message
-                        self.message_timer = 0
-                break
         
         # 如果没有点击任何物品且点击的是左键，进入游戏
-        if not item_clicked and button == arcade.MOUSE_BUTTON_LEFT:
+        if item is None and button == arcade.MOUSE_BUTTON_LEFT:
             self.is_transitioning = True
             # 使用新的方法切换到游戏
             self.direct_to_game()
@@ -264,11 +278,13 @@ class BedroomView(arcade.View):
     def on_mouse_motion(self, x, y, dx, dy):
         """鼠标移动事件处理"""
         # 检查鼠标是否悬停在物品上
-        self.hovered_item = None
-        for item in self.interactive_items:
-            if item.is_mouse_over(x, y):
-                self.hovered_item = item
-                break
+        hovered = self.spatial_index.first_at(x, y)
+        if hovered is not self.hovered_item:
+            if self.hovered_item is not None:
+                self.hovered_item.is_hovered = False
+            if hovered is not None:
+                hovered.is_hovered = True
+            self.hovered_item = hovered
     
     def on_mouse_release(self, x, y, button, modifiers):
         """鼠标释放事件处理"""
@@ -0,0 +1,565 @@
+"""
+离屏帧耗时基准测试
+
+在隐藏窗口中实例化各个场景，按脚本切换状态(开关灯、开电视、打开电脑桌面)，
+固定步长驱动N帧，输出JSON: 帧耗时百分位、每帧绘制调用次数(按函数和物体)、顶点数、
+文字绘制次数、预热之外的字形和峰值内存。
+每个场景默认在独立子进程中运行，互不影响内存统计和OpenGL上下文。
+
+用法:
+    python benchmark.py                       # 运行全部场景
+    python benchmark.py --scenes living_room_deferred,login_view --frames 600
+    python benchmark.py --output before.json  # 写入文件，方便前后对比
+    python benchmark.py --startup             # 各入口的导入耗时和首帧耗时
+    python benchmark.py --check-caches        # 缓存路径与直接绘制的画面比较
+
+默认通过LIBGL_ALWAYS_SOFTWARE使用Mesa软件渲染，保证不同机器上的结果可比；
+没有显示器的机器可以加--headless(需要EGL)，或者在xvfb-run下运行。
+"""
+import argparse
+import importlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+SCREEN_WIDTH = 1024
+SCREEN_HEIGHT = 768
+
+# 固定的更新步长，保证每次运行的状态序列一致
+FRAME_DT = 1 / 60
+
+
+# ---------------------------------------------------------------------------
+# 场景和状态脚本
+# ---------------------------------------------------------------------------
+
+def _host_window():
+    """承载View的隐藏窗口"""
+    import arcade
+    return arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, "benchmark", visible=False)
+
+
+def _living_room(deferred):
+    from living_room_scene import LivingRoom
+    window = _host_window()
+    view = LivingRoom()
+    view.use_deferred_lighting = deferred
+    window.show_view(view)
+    script = [
+        (0.2, "落地灯开", lambda: view.floor_lamp_switch.on_click()),
+        (0.4, "电视和背光开", lambda: (view.tv.on_click(), view.tv_backlight_switch.on_click())),
+        (0.6, "主灯关", lambda: view.main_light_switch.on_click()),
+        (0.8, "全部关闭", lambda: (view.floor_lamp_switch.on_click(),
+                                  view.tv_backlight_switch.on_click(),
+                                  view.tv.on_click())),
+    ]
+    return window, script
+
+
+def _game_manager(state):
+    from game_manager import GameManager
+    window = GameManager(SCREEN_WIDTH, SCREEN_HEIGHT, "benchmark")
+    window.set_state(state)
+    script = []
+    if state == window.STATE_BEDROOM:
+        script = [
+            (0.2, "跳过开场白", lambda: setattr(window, "welcome_phase", False)),
+            (0.4, "打开电脑桌面", lambda: window.computer.on_click()),
+            (0.7, "切换日夜", lambda: window.window.change_time()),
+        ]
+    elif state == window.STATE_GAME:
+        window.use_enhanced_version = True
+        script = [
+            (0.3, "电视开", lambda: window.tv.on_click()),
+            (0.5, "切换频道", lambda: window.tv.change_channel()),
+            (0.7, "收音机开", lambda: window.radio.on_click()),
+        ]
+    return window, script
+
+
+def _bedroom_view():
+    from bedroom_view import BedroomView
+    window = _host_window()
+    view = BedroomView()
+    window.show_view(view)
+    script = [
+        (0.2, "跳过开场白", lambda: setattr(view, "welcome_phase", False)),
+        (0.4, "打开电脑桌面", lambda: view.computer.on_click()),
+        (0.7, "切换日夜", lambda: view.window_item.change_time()),
+    ]
+    return window, script
+
+
+def _login_view():
+    from login_view import LoginView
+    window = _host_window()
+    window.show_view(LoginView())
+    return window, []
+
+
+def _room_view():
+    from room_view import RoomGameView
+    window = _host_window()
+    view = RoomGameView(enhanced=True)
+    window.show_view(view)
+    script = [
+        (0.3, "电视开", lambda: view.tv.on_click()),
+        (0.6, "切换频道", lambda: view.tv.change_channel()),
+    ]
+    return window, script
+
+
+def _enhanced_room():
+    from enhanced_game import EnhancedChildhoodRoom
+    window = _host_window()
+    view = EnhancedChildhoodRoom()
+    window.show_view(view)
+    script = [
+        (0.3, "电视开", lambda: view.tv.on_click()),
+        (0.6, "收音机开", lambda: view.radio.on_click()),
+    ]
+    return window, script
+
+
+# 场景名 -> 创建函数，返回(窗口, [(进度0~1, 说明, 动作)])
+SCENES = {
+    "living_room_deferred": lambda: _living_room(True),
+    "living_room_simple": lambda: _living_room(False),
+    "game_manager_login": lambda: _game_manager("login"),
+    "game_manager_bedroom": lambda: _game_manager("bedroom"),
+    "game_manager_game": lambda: _game_manager("game"),
+    "bedroom_view": _bedroom_view,
+    "login_view": _login_view,
+    "room_view": _room_view,
+    "enhanced_room": _enhanced_room,
+}
+
+
+# 启动测试的入口模块，每个模块都有main()并在其中调用arcade.run()
+ENTRY_POINTS = ["main", "game_manager", "living_room_scene", "enhanced_game"]
+
+
+# ---------------------------------------------------------------------------
+# 缓存一致性检查: 缓存路径画出的画面必须和直接绘制一致
+# ---------------------------------------------------------------------------
+
+def _check_computer_desktop():
+    """
+    离屏缓存的电脑桌面与直接绘制比较，范围包括伸出弹窗底边的任务栏
+
+    电脑放在卧室里的位置，弹窗的纵坐标不是整数，开始按钮等图元的边缘落在像素中间
+    """
+    from bedroom_items import Computer
+    from debug_tools import compare_renders
+    computer = Computer(SCREEN_WIDTH * 0.25, SCREEN_HEIGHT * 0.6)
+    computer.is_active = True
+    computer.show_desktop = True
+    left, bottom, right, top = computer.desktop_content_bounds()
+    margin = computer.DESKTOP_PADDING + 4
+    region = (left - margin, bottom - margin, right - left + margin * 2, top - bottom + margin * 2)
+    return compare_renders(computer.draw_desktop, computer.render_desktop, region)
+
+
+def _check_lightmap(use_light_buffer):
+    """全部灯光稳定地亮着时，烘焙的光照贴图与逐灯实时渲染比较"""
+    import arcade
+    from debug_tools import compare_renders
+    from living_room_scene import LivingRoom
+    window = arcade.get_window()
+    view = LivingRoom()
+    window.show_view(view)
+    view.quality.set_enabled(False)
+    view.use_light_buffer = use_light_buffer
+    # 主灯默认开着，再打开落地灯、电视和背光
+    view.floor_lamp_switch.on_click()
+    view.tv.on_click()
+    view.tv_backlight_switch.on_click()
+    # 跳过亮度渐变，闪烁固定为1，画面只由开关组合决定
+    for light in view.lights:
+        view.tweens.cancel((light, "brightness"))
+        light.brightness = getattr(light, "target_brightness", light.brightness)
+        light.light_effect.flicker_factor = 1.0
+    if not view.renderer.lights_settled():
+        raise RuntimeError("灯光没有稳定，无法比较光照贴图")
+
+    def render(use_lightmap_cache):
+        view.use_lightmap_cache = use_lightmap_cache
+        view.render_scene()
+
+    return compare_renders(lambda: render(True), lambda: render(False),
+                           (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+
+
+def _check_redraw_frame():
+    """脏标记帧缓存贴回的客厅画面与直接绘制比较(包括抗锯齿的边缘)"""
+    import arcade
+    from debug_tools import compare_renders
+    from living_room_scene import LivingRoom
+    window = arcade.get_window()
+    view = LivingRoom()
+    window.show_view(view)
+    view.quality.set_enabled(False)
+
+    def cached():
+        view.redraw.mark_dirty()
+        view.redraw.draw(view.render_scene)
+
+    return compare_renders(cached, view.render_scene, (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+
+
+# 检查名 -> 检查函数，返回debug_tools.compare_renders的结果
+CACHE_CHECKS = {
+    "redraw_frame": _check_redraw_frame,
+    "computer_desktop": _check_computer_desktop,
+    "lightmap": lambda: _check_lightmap(False),
+    "lightmap_light_buffer": lambda: _check_lightmap(True),
+}
+
+
+def check_caches():
+    """
+    在隐藏窗口中运行全部缓存一致性检查
+
+    返回:
+        list: 每项检查的比较结果，ok表示没有超出允许差值的像素
+    """
+    window = _host_window()
+    results = []
+    try:
+        for name, check in CACHE_CHECKS.items():
+            result = check()
+            results.append({"check": name, "ok": result["over_tolerance"] == 0, **result})
+    finally:
+        window.close()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 运行
+# ---------------------------------------------------------------------------
+
+def _dispatch_now(window, event_type, *args):
+    """
+    立即分发窗口事件(经过show_view压入的View处理函数)
+
+    在pyglet事件循环之外，window.dispatch_event只把事件放进队列，
+    要等下一次dispatch_events才执行，测量区间内实际什么也没做。
+    """
+    import pyglet
+    pyglet.event.EventDispatcher.dispatch_event(window, event_type, *args)
+
+
+def _percentiles(values):
+    """均值、p50/p95/p99和最大值"""
+    if not values:
+        return {}
+    if len(values) == 1:
+        cuts = [values[0]] * 99
+    else:
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "mean": statistics.fmean(values),
+        "p50": cuts[49],
+        "p95": cuts[94],
+        "p99": cuts[98],
+        "max": max(values),
+    }
+
+
+def run_scene(name, frames, warmup, use_redraw_cache=True):
+    """
+    在当前进程中运行一个场景
+
+    返回:
+        dict: 该场景的测试结果
+    """
+    from asset_loader import get_asset_loader
+    from draw_stats import get_draw_stats
+    from glyph_warmup import get_glyph_warmup
+    from texture_manager import get_texture_manager
+
+    window, script = SCENES[name]()
+    window.set_visible(False)
+
+    # 测量循环不经过pyglet时钟，先把后台加载的纹理全部上传，保证各帧画面一致
+    get_asset_loader().wait()
+
+    # 字形也在加载阶段一次预热完，测量中仍需临时光栅化的字记为未命中
+    glyphs = get_glyph_warmup()
+    glyphs.install()
+    glyphs.warm()
+
+    # 帧缓存会让静止画面几乎不花时间，需要时可以关闭以测量完整绘制
+    redraw = getattr(window, "redraw", None) or getattr(window.current_view, "redraw", None)
+    if redraw is not None and not use_redraw_cache:
+        redraw.set_enabled(False)
+
+    # 自动画质会随耗时换档，测量时固定为完整画质，各次结果才可比较
+    quality = getattr(window, "quality", None) or getattr(window.current_view, "quality", None)
+    if quality is not None:
+        quality.set_enabled(False)
+
+    # 把脚本进度换算成帧号(相对测量区间)
+    actions = sorted((warmup + int(progress * frames), label, action)
+                     for progress, label, action in script)
+
+    # 绘制统计由测量循环直接按帧驱动(场景的帧分析器此时是关闭的)
+    stats = get_draw_stats()
+    stats.set_enabled(True)
+
+    frame_times = []
+    draw_calls = []
+    vertices = []
+    text_draws = []
+    calls_by_function = {}
+    calls_by_owner = {}
+    try:
+        for index in range(warmup + frames):
+            while actions and actions[0][0] == index:
+                actions.pop(0)[2]()
+
+            window.switch_to()
+            window.dispatch_events()
+            stats.begin_frame()
+            start = time.perf_counter()
+            _dispatch_now(window, "on_update", FRAME_DT)
+            _dispatch_now(window, "on_draw")
+            # 等待GPU完成，让帧耗时包含实际渲染时间
+            window.ctx.finish()
+            elapsed = time.perf_counter() - start
+            frame = stats.end_frame()
+            window.flip()
+
+            if index >= warmup:
+                frame_times.append(elapsed * 1000)
+                draw_calls.append(frame.calls)
+                vertices.append(frame.vertices)
+                text_draws.append(frame.text_draws)
+                for label, count in frame.by_function.items():
+                    calls_by_function[label] = calls_by_function.get(label, 0) + count
+                for owner, count in frame.by_owner.items():
+                    calls_by_owner[owner] = calls_by_owner.get(owner, 0) + count
+    finally:
+        stats.set_enabled(False)
+
+    # 每个场景至少会画背景，全为0说明绘制没有落在统计区间内
+    if frames and not any(draw_calls):
+        window.close()
+        raise RuntimeError(f"场景{name}在{frames}帧中没有记录到任何绘制调用")
+
+    renderer = window.ctx.info.RENDERER
+    window.close()
+
+    return {
+        "scene": name,
+        "frames": frames,
+        "renderer": renderer,
+        "redraw_cache": use_redraw_cache,
+        "frame_ms": _percentiles(frame_times),
+        "draw_calls": {
+            **_percentiles(draw_calls),
+            "by_function": {
+                label: count / frames
+                for label, count in sorted(calls_by_function.items(), key=lambda item: -item[1])
+            },
+            "by_owner": {
+                owner: count / frames
+                for owner, count in sorted(calls_by_owner.items(), key=lambda item: -item[1])
+            },
+        },
+        "vertices": _percentiles(vertices),
+        "text_draws": _percentiles(text_draws),
+        # Linux上ru_maxrss以KB为单位
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "texture_resident_bytes": get_texture_manager().resident_bytes,
+        "quality_level": quality.level_index if quality is not None else None,
+        # 按字体列出预热之外的字(同一进程中多个场景时累计)
+        "glyph_misses": {
+            font: entry["missing"] for font, entry in glyphs.report().items() if entry["misses"]
+        },
+    }
+
+
+def measure_startup(module_name):
+    """
+    在当前(全新的)进程中测量一个入口的启动耗时
+
+    arcade.run被替换为"绘制一帧后返回"，从而测出从导入到第一帧画完的时间。
+
+    返回:
+        dict: 各阶段距进程内计时起点的秒数
+    """
+    start = time.perf_counter()
+    import arcade
+    arcade_import_s = time.perf_counter() - start
+
+    module = importlib.import_module(module_name)
+    import_s = time.perf_counter() - start
+
+    result = {}
+
+    def draw_first_frame():
+        window = arcade.get_window()
+        window.set_visible(False)
+        _dispatch_now(window, "on_draw")
+        window.ctx.finish()
+        result["first_frame_s"] = time.perf_counter() - start
+        window.close()
+
+    arcade.run = draw_first_frame
+    module.main()
+
+    return {
+        "entry_point": module_name + ".py",
+        "arcade_import_s": arcade_import_s,
+        "import_s": import_s,
+        "first_frame_s": result.get("first_frame_s"),
+    }
+
+
+def _run_startup(module_name, args):
+    """在子进程中测量入口的启动耗时，另外记录包含解释器启动在内的进程总耗时"""
+    command = [sys.executable, os.path.abspath(__file__), "--startup-child", module_name]
+    if args.headless:
+        command.append("--headless")
+    if args.hardware:
+        command.append("--hardware")
+    start = time.perf_counter()
+    proc = subprocess.run(command, capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    process_s = time.perf_counter() - start
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode == 0 and lines:
+        try:
+            return {**json.loads(lines[-1]), "process_s": process_s}
+        except ValueError:
+            pass
+    return {"entry_point": module_name + ".py",
+            "error": (proc.stderr.strip().splitlines() or ["未知错误"])[-1]}
+
+
+def _run_isolated(name, args):
+    """在子进程中运行一个场景，失败时记录错误而不中断整个测试"""
+    command = [sys.executable, os.path.abspath(__file__), "--in-process",
+               "--scenes", name, "--frames", str(args.frames), "--warmup", str(args.warmup)]
+    if args.no_redraw_cache:
+        command.append("--no-redraw-cache")
+    if args.headless:
+        command.append("--headless")
+    if args.hardware:
+        command.append("--hardware")
+    proc = subprocess.run(command, capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    # 场景本身可能打印日志，结果在最后一行
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode == 0 and lines:
+        try:
+            return json.loads(lines[-1])[0]
+        except (ValueError, IndexError):
+            pass
+    return {"scene": name, "error": (proc.stderr.strip().splitlines() or ["未知错误"])[-1]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="离屏帧耗时基准测试")
+    parser.add_argument("--scenes", default=",".join(SCENES),
+                        help="逗号分隔的场景名，可选: " + ", ".join(SCENES))
+    parser.add_argument("--frames", type=int, default=300, help="每个场景测量的帧数")
+    parser.add_argument("--warmup", type=int, default=30, help="测量前预热的帧数")
+    parser.add_argument("--output", help="结果写入的JSON文件，默认输出到标准输出")
+    parser.add_argument("--no-redraw-cache", action="store_true",
+                        help="关闭脏标记帧缓存，每帧都完整绘制")
+    parser.add_argument("--headless", action="store_true", help="使用pyglet的无窗口(EGL)模式")
+    parser.add_argument("--hardware", action="store_true", help="使用硬件OpenGL而不是Mesa软件渲染")
+    parser.add_argument("--in-process", action="store_true",
+                        help="在当前进程中依次运行(默认每个场景一个子进程)")
+    parser.add_argument("--startup", action="store_true",
+                        help="测量各入口的导入耗时和首帧耗时，而不是帧耗时")
+    parser.add_argument("--runs", type=int, default=3, help="启动测试每个入口重复的次数")
+    parser.add_argument("--check-caches", action="store_true",
+                        help="比较各缓存路径与直接绘制的画面，有差异时返回非0")
+    parser.add_argument("--startup-child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.startup_child:
+        if not args.hardware:
+            os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+        if args.headless:
+            # 必须在导入arcade之前设置
+            import pyglet
+            pyglet.options["headless"] = True
+        print(json.dumps(measure_startup(args.startup_child), ensure_ascii=False))
+        return
+
+    if args.check_caches:
+        if not args.hardware:
+            os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+        if args.headless:
+            import pyglet
+            pyglet.options["headless"] = True
+        results = check_caches()
+        _write_results(results, args.output)
+        if not all(result["ok"] for result in results):
+            sys.exit(1)
+        return
+
+    if args.startup:
+        # 第一次运行包含磁盘缓存未命中等冷启动开销，单独保留
+        results = []
+        for module_name in ENTRY_POINTS:
+            runs = [_run_startup(module_name, args) for _ in range(args.runs)]
+            # 没有画出第一帧的运行也不算成功
+            ok = [run for run in runs
+                  if "error" not in run and run.get("first_frame_s") is not None]
+            entry = {"entry_point": module_name + ".py", "runs": runs}
+            if ok:
+                entry["median"] = {
+                    key: statistics.median(run[key] for run in ok)
+                    for key in ("arcade_import_s", "import_s", "first_frame_s", "process_s")
+                    if all(run.get(key) is not None for run in ok)
+                }
+            results.append(entry)
+        _write_results(results, args.output)
+        # 某个入口一次都没有成功启动时没有可比较的数据
+        if not all("median" in entry for entry in results):
+            sys.exit(1)
+        return
+
+    names = [name.strip() for name in args.scenes.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENES]
+    if unknown:
+        parser.error(f"未知场景: {', '.join(unknown)}")
+
+    if args.in_process:
+        # 必须在导入arcade之前设置
+        if not args.hardware:
+            os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+        if args.headless:
+            import pyglet
+            pyglet.options["headless"] = True
+        results = [run_scene(name, args.frames, args.warmup, not args.no_redraw_cache)
+                   for name in names]
+    else:
+        results = [_run_isolated(name, args) for name in names]
+
+    _write_results(results, args.output)
+    # 出错的场景没有测到数据，不能当作成功
+    if any("error" in result for result in results):
+        sys.exit(1)
+
+
+def _write_results(results, path):
+    """结果写入文件，没有指定文件时以单行JSON输出到标准输出"""
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(results, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+批量圆形绘制
+
+圆是最常用的图元: 气球、云朵(每朵五个圆)、电视和电脑的按钮、灯泡和灯罩内的光晕。
+原来每个圆单独一次绘制调用，而且细分段数固定，1像素的圆和200像素的圆顶点一样多。
+这里把圆和椭圆提交进一个批次，用一次实例化绘制画完: 每个实例是一个扇形网格，
+顶点着色器按圆在屏幕上的半径(像素)决定实际使用的段数，多出的三角形退化为零面积；
+每次绘制只提交批次中最大的圆需要的段数，小圆组成的批次不会处理满64段的网格。
+同一批次内按提交顺序绘制，叠加顺序不变。
+
+提交时没有打开的图层则立即绘制(一次调用一个圆)；在 with circle_layer(): 中提交的圆
+留到图层结束时一起绘制，调用方保证图层内的圆与其间穿插的其他图元互不遮挡。
+"""
+import math
+from array import array
+from contextlib import contextmanager
+
+import arcade
+from arcade.gl import BufferDescription
+
+from draw_stats import get_draw_stats
+
+# 每个圆最多和最少的段数
+MAX_SEGMENTS = 64
+MIN_SEGMENTS = 6
+
+# 每段弧在屏幕上的目标长度(像素)，越小越圆
+SEGMENT_LENGTH = 4.0
+
+_VERTEX_SHADER = f"""
+#version 330
+
+// 当前投影: left, right, bottom, top
+uniform vec4 projection;
+// 每个投影单位对应的像素数
+uniform float pixel_scale;
+
+// 扇形网格顶点: -1为圆心，k为第k个边缘点
+in float in_index;
+// 每个实例: 圆心、x/y半径、颜色(0~1)
+in vec2 in_center;
+in vec2 in_radius;
+in vec4 in_color;
+
+out vec4 v_color;
+
+void main() {{
+    float radius_px = max(in_radius.x, in_radius.y) * pixel_scale;
+    float segments = clamp(ceil(6.2831853 * radius_px / {SEGMENT_LENGTH:.1f}),
+                           {MIN_SEGMENTS:.1f}, {MAX_SEGMENTS:.1f});
+    vec2 pos = in_center;
+    if (in_index >= 0.0) {{
+        // 超出段数的边缘点收缩到最后一个点，对应的三角形面积为零
+        float angle = 6.2831853 * min(in_index, segments) / segments;
+        pos += vec2(cos(angle), sin(angle)) * in_radius;
+    }}
+    vec2 ndc = (pos - projection.xz) / (projection.yw - projection.xz) * 2.0 - 1.0;
+    gl_Position = vec4(ndc, 0.0, 1.0);
+    v_color = in_color;
+}}
+"""
+
+_FRAGMENT_SHADER = """
+#version 330
+
+in vec4 v_color;
+
+out vec4 fragColor;
+
+void main() {
+    fragColor = v_color;
+}
+"""
+
+# 每个实例: x, y, x半径, y半径, r, g, b, a
+_INSTANCE_FORMAT = "2f 2f 4f"
+_FLOATS_PER_INSTANCE = 8
+
+
+class CircleBatch:
+    """用一次实例化绘制画出一批圆和椭圆"""
+
+    def __init__(self):
+        self._instances = array("f")
+        # 批次中最大的半径(投影单位)，决定这次绘制需要的段数
+        self._max_radius = 0.0
+        # 当前打开的图层层数，为0时提交的圆立即绘制
+        self._layers = 0
+        # GPU资源，首次绘制时创建
+        self._ctx = None
+        self._program = None
+        self._mesh = None
+        self._buffer = None
+        self._geometry = None
+        self._capacity = 0
+
+    def __len__(self):
+        return len(self._instances) // _FLOATS_PER_INSTANCE
+
+    def add_ellipse(self, center_x, center_y, width, height, color):
+        """
+        提交一个实心椭圆，参数与arcade.draw_ellipse_filled一致
+
+        参数:
+            center_x, center_y (float): 中心
+            width, height (float): 宽度和高度(直径)
+            color (tuple): RGB或RGBA颜色
+        """
+        alpha = color[3] if len(color) > 3 else 255
+        if alpha <= 0:
+            return
+        self._instances.extend((
+            center_x, center_y, width / 2, height / 2,
+            color[0] / 255, color[1] / 255, color[2] / 255, alpha / 255,
+        ))
+        self._max_radius = max(self._max_radius, abs(width) / 2, abs(height) / 2)
+        if self._layers == 0:
+            self.flush()
+
+    def add_circle(self, center_x, center_y, radius, color):
+        """提交一个实心圆，参数与arcade.draw_circle_filled一致"""
+        self.add_ellipse(center_x, center_y, radius * 2, radius * 2, color)
+
+    @contextmanager
+    def layer(self):
+        """图层内提交的圆在图层结束时一起绘制"""
+        # 先画完外层已经提交的圆，图层内外的顺序不变
+        self.flush()
+        self._layers += 1
+        try:
+            yield self
+        finally:
+            self._layers -= 1
+            self.flush()
+
+    def _ensure_gpu_resources(self, count):
+        """创建(或扩容)着色器、网格和实例缓冲"""
+        if self._ctx is None:
+            self._ctx = arcade.get_window().ctx
+            self._program = self._ctx.program(
+                vertex_shader=_VERTEX_SHADER, fragment_shader=_FRAGMENT_SHADER
+            )
+            # 扇形网格: 每段一个三角形(圆心, 第k点, 第k+1点)
+            mesh = array("f")
+            for k in range(MAX_SEGMENTS):
+                mesh.extend((-1.0, float(k), float(k + 1)))
+            self._mesh = self._ctx.buffer(data=mesh.tobytes())
+        if count > self._capacity:
+            self._capacity = max(count, self._capacity * 2, 64)
+            self._buffer = self._ctx.buffer(reserve=self._capacity * _FLOATS_PER_INSTANCE * 4)
+            self._geometry = self._ctx.geometry(
+                [
+                    BufferDescription(self._mesh, "1f", ["in_index"]),
+                    BufferDescription(self._buffer, _INSTANCE_FORMAT,
+                                      ["in_center", "in_radius", "in_color"], instanced=True),
+                ],
+                mode=self._ctx.TRIANGLES,
+            )
+
+    def flush(self):
+        """画出已提交的圆并清空批次"""
+        count = len(self)
+        if count == 0:
+            return
+        self._ensure_gpu_resources(count)
+        self._buffer.write(self._instances.tobytes())
+        del self._instances[:]
+        max_radius, self._max_radius = self._max_radius, 0.0
+
+        ctx = self._ctx
+        left, right, bottom, top = ctx.projection_2d
+        pixel_scale = ctx.viewport[2] / max(1e-6, right - left)
+        self._program["projection"] = left, right, bottom, top
+        self._program["pixel_scale"] = pixel_scale
+        ctx.enable(ctx.BLEND)
+        self._geometry.render(self._program, vertices=segments_for_radius(max_radius * pixel_scale) * 3,
+                              instances=count)
+        # 与其他圆形图元一样按每个圆一个四边形计
+        get_draw_stats().record("CircleBatch.flush", count * 4)
+
+
+def segments_for_radius(radius_px):
+    """半径为radius_px像素的圆使用的段数，与顶点着色器的计算一致"""
+    segments = math.ceil(2 * math.pi * radius_px / SEGMENT_LENGTH)
+    return min(MAX_SEGMENTS, max(MIN_SEGMENTS, segments))
+
+
+# 全局共享的圆形批次
+_default_batch = CircleBatch()
+
+
+def get_circle_batch():
+    """返回全局共享的圆形批次"""
+    return _default_batch
+
+
+def draw_circle_filled(center_x, center_y, radius, color):
+    """提交一个实心圆到共享批次，参数与arcade.draw_circle_filled一致"""
+    _default_batch.add_circle(center_x, center_y, radius, color)
+
+
+def draw_ellipse_filled(center_x, center_y, width, height, color):
+    """提交一个实心椭圆到共享批次，参数与arcade.draw_ellipse_filled一致"""
+    _default_batch.add_ellipse(center_x, center_y, width, height, color)
+
+
+def circle_layer():
+    """共享批次的图层，见CircleBatch.layer"""
+    return _default_batch.layer()
@@ -1,4 +1,14 @@
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import arcade
+from draw_stats import get_draw_stats
+from quality_governor import QUALITY_LEVELS
+from render_target import RenderTarget, window_samples
+from text_cache import draw_cached_text, get_text_cache
+from texture_manager import get_texture_manager
 
 def draw_coordinate_system(width, height, mouse_x=0, mouse_y=0, grid_spacing=50):
     """
@@ -14,7 +24,7 @@ def draw_coordinate_system(width, height, mouse_x=0, mouse_y=0, grid_spacing=50)
     # 绘制网格线
     for x in range(0, width + 1, grid_spacing):
         arcade.draw_line(x, 0, x, height, arcade.color.GRAY, 1)
-        arcade.draw_text(
+        draw_cached_text(
             str(x), 
             start_x=x, start_y=10, 
             color=arcade.color.RED, 
@@ -23,7 +33,7 @@ def draw_coordinate_system(width, height, mouse_x=0, mouse_y=0, grid_spacing=50)
     
     for y in range(0, height + 1, grid_spacing):
         arcade.draw_line(0, y, width, y, arcade.color.GRAY, 1)
-        arcade.draw_text(
+        draw_cached_text(
             str(y), 
             start_x=10, start_y=y, 
             color=arcade.color.RED, 
@@ -48,10 +58,326 @@ def draw_coordinate_system(width, height, mouse_x=0, mouse_y=0, grid_spacing=50)
     )
     
     # 显示鼠标坐标
-    arcade.draw_text(
+    draw_cached_text(
         text, 
         start_x=mouse_x + 10, 
         start_y=mouse_y + 10, 
         color=arcade.color.WHITE, 
         font_size=12
-    ) 
\ No newline at end of file
+    )
+
+
+# 60帧时每帧的时间预算(毫秒)
+FRAME_BUDGET_MS = 1000.0 / 60
+
+# 各阶段条形图的颜色，按阶段出现顺序循环使用
+PHASE_COLORS = [
+    arcade.color.ORANGE,
+    arcade.color.SKY_BLUE,
+    arcade.color.LIGHT_GREEN,
+    arcade.color.PINK,
+    arcade.color.YELLOW,
+    arcade.color.LAVENDER,
+    arcade.color.AQUA,
+    arcade.color.SALMON
+]
+
+
+class FrameProfiler:
+    """帧阶段耗时分析器，记录每帧各阶段耗时并绘制叠加层"""
+    
+    def __init__(self, history=240, refresh_interval=0.5):
+        """
+        参数:
+            history (int): 保留最近多少帧的数据
+            refresh_interval (float): 叠加层统计数字的刷新间隔(秒)
+        """
+        self.enabled = False
+        self.history = history
+        self.refresh_interval = refresh_interval
+        
+        # 每帧总耗时(毫秒)和各阶段耗时(毫秒)
+        self.frame_times = deque(maxlen=history)
+        self.phase_times = {}
+        
+        # 当前帧的状态
+        self._frame_start = None
+        self._current = {}
+        # 嵌套阶段栈: [名称, 开始时间, 子阶段耗时]
+        self._stack = []
+        
+        # 叠加层显示的统计快照，定期刷新，避免数字每帧跳动
+        self._snapshot = None
+        self._last_refresh = 0.0
+        
+        # 当前场景的画质调节器(由场景设置)，有时在叠加层显示档位
+        self.quality = None
+    
+    def toggle(self):
+        """开关分析器"""
+        self.set_enabled(not self.enabled)
+    
+    def set_enabled(self, enabled):
+        """
+        开启或关闭分析器，开启时文字绘制耗时计入"text"阶段，
+        同时统计每帧的绘制调用
+        """
+        self.enabled = enabled
+        self._frame_start = None
+        self._stack = []
+        get_text_cache().profiler = self if enabled else None
+        get_draw_stats().set_enabled(enabled)
+    
+    def begin_frame(self):
+        """开始一帧(通常在on_update开头调用)"""
+        if not self.enabled:
+            return
+        self._frame_start = time.perf_counter()
+        self._current = {}
+        self._stack = []
+        get_draw_stats().begin_frame()
+    
+    @contextmanager
+    def phase(self, name):
+        """
+        统计一个阶段的耗时，嵌套阶段的耗时不重复计入外层阶段
+        
+        参数:
+            name (str): 阶段名称
+        """
+        if not self.enabled or self._frame_start is None:
+            yield
+            return
+        
+        entry = [name, time.perf_counter(), 0.0]
+        self._stack.append(entry)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - entry[1]
+            self._current[name] = self._current.get(name, 0.0) + elapsed - entry[2]
+            if self._stack:
+                self._stack[-1][2] += elapsed
+    
+    def end_frame(self):
+        """结束一帧(通常在on_draw末尾、绘制叠加层之前调用)"""
+        if not self.enabled or self._frame_start is None:
+            return
+        now = time.perf_counter()
+        self.frame_times.append((now - self._frame_start) * 1000)
+        get_draw_stats().end_frame()
+        
+        # 没有出现在本帧的阶段记为0，保证各阶段的历史长度一致
+        for name in self._current:
+            if name not in self.phase_times:
+                self.phase_times[name] = deque(maxlen=self.history)
+        for name, times in self.phase_times.items():
+            times.append(self._current.get(name, 0.0) * 1000)
+        
+        self._frame_start = None
+        if now - self._last_refresh >= self.refresh_interval:
+            self._last_refresh = now
+            self._snapshot = self.summary()
+    
+    def percentile(self, p):
+        """
+        帧耗时的百分位数
+        
+        参数:
+            p (float): 百分位(0~100)
+        
+        返回:
+            float: 毫秒，没有数据时为0
+        """
+        return _percentile(sorted(self.frame_times), p)
+    
+    def summary(self):
+        """
+        当前的统计结果
+        
+        返回:
+            dict: frame为p50/p95/p99帧耗时，phases为各阶段平均耗时，单位都是毫秒；
+                draws为每帧平均绘制调用次数、顶点数和文字绘制次数
+        """
+        times = sorted(self.frame_times)
+        draws = get_draw_stats().history
+        count = max(1, len(draws))
+        return {
+            "frame": {
+                "p50": _percentile(times, 50),
+                "p95": _percentile(times, 95),
+                "p99": _percentile(times, 99),
+            },
+            "phases": {
+                name: sum(values) / len(values)
+                for name, values in self.phase_times.items() if values
+            },
+            "draws": {
+                "calls": sum(frame[0] for frame in draws) / count,
+                "vertices": sum(frame[1] for frame in draws) / count,
+                "text": sum(frame[2] for frame in draws) / count,
+            },
+        }
+    
+    def draw(self, width=None, height=None):
+        """
+        在屏幕右上角绘制分析叠加层
+        
+        参数:
+            width (int): 屏幕宽度，默认使用当前窗口宽度
+            height (int): 屏幕高度，默认使用当前窗口高度
+        """
+        if not self.enabled or self._snapshot is None:
+            return
+        if width is None or height is None:
+            width, height = arcade.get_window().get_size()
+        
+        phases = self._snapshot["phases"]
+        frame = self._snapshot["frame"]
+        draws = self._snapshot["draws"]
+        panel_width = 300
+        graph_height = 60
+        row_height = 16
+        header_height = 82 if self.quality is None else 98
+        panel_height = header_height + len(phases) * row_height + graph_height
+        left = width - panel_width - 10
+        top = height - 10
+        
+        # 半透明背景
+        arcade.draw_lrtb_rectangle_filled(
+            left, left + panel_width, top, top - panel_height,
+            (0, 0, 0, 180)
+        )
+        
+        # 帧耗时百分位
+        draw_cached_text(
+            f"帧耗时 p50 {frame['p50']:.1f}ms  p95 {frame['p95']:.1f}ms  p99 {frame['p99']:.1f}ms",
+            start_x=left + 8, start_y=top - 20,
+            color=arcade.color.WHITE, font_size=10
+        )
+        
+        # 驻留纹理占用的内存
+        textures = get_texture_manager()
+        draw_cached_text(
+            f"纹理 {textures.resident_bytes / 2**20:.1f}MB / {textures.budget_bytes / 2**20:.0f}MB",
+            start_x=left + 8, start_y=top - 36,
+            color=arcade.color.WHITE, font_size=10
+        )
+        
+        # 每帧平均绘制调用
+        draw_cached_text(
+            f"绘制 {draws['calls']:.0f}次  顶点 {draws['vertices']:.0f}  文字 {draws['text']:.0f}次",
+            start_x=left + 8, start_y=top - 52,
+            color=arcade.color.WHITE, font_size=10
+        )
+        
+        # 画质档位
+        if self.quality is not None:
+            mode = "自动" if self.quality.enabled else "固定"
+            draw_cached_text(
+                f"画质 {self.quality.level_index}/{len(QUALITY_LEVELS) - 1} "
+                f"{self.quality.level.name} ({mode})",
+                start_x=left + 8, start_y=top - 68,
+                color=arcade.color.WHITE, font_size=10
+            )
+        
+        # 各阶段平均耗时，条形长度以一帧的时间预算为满格
+        bar_left = left + 150
+        bar_max = panel_width - 160
+        y = top - header_height + 10
+        for i, (name, ms) in enumerate(phases.items()):
+            color = PHASE_COLORS[i % len(PHASE_COLORS)]
+            draw_cached_text(
+                f"{name} {ms:.2f}",
+                start_x=left + 8, start_y=y - 4,
+                color=color, font_size=9
+            )
+            bar = min(ms / FRAME_BUDGET_MS, 1.0) * bar_max
+            if bar >= 1:
+                arcade.draw_lrtb_rectangle_filled(
+                    bar_left, bar_left + bar, y + 5, y - 5, color
+                )
+            y -= row_height
+        
+        # 帧耗时曲线，红线为时间预算(超过两倍预算的帧截顶)
+        graph_bottom = top - panel_height + 8
+        graph_top = graph_bottom + graph_height - 16
+        scale = (graph_top - graph_bottom) / (FRAME_BUDGET_MS * 2)
+        budget_y = graph_bottom + FRAME_BUDGET_MS * scale
+        arcade.draw_line(left + 8, budget_y, left + panel_width - 8, budget_y,
+                         arcade.color.RED, 1)
+        
+        if len(self.frame_times) >= 2:
+            step = (panel_width - 16) / (self.history - 1)
+            points = [
+                (left + 8 + i * step, graph_bottom + min(ms, FRAME_BUDGET_MS * 2) * scale)
+                for i, ms in enumerate(self.frame_times)
+            ]
+            arcade.draw_line_strip(points, arcade.color.LIGHT_GREEN, 1)
+
+
+def _percentile(sorted_values, p):
+    """已排序数据的百分位数(最近秩法)"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _read_region(framebuffer, left, bottom, width, height, scale=1.0):
+    """读取帧缓冲中一块区域(屏幕坐标)的RGB像素，逐行排列"""
+    viewport = (int(left * scale), int(bottom * scale),
+                int(math.ceil(width * scale)), int(math.ceil(height * scale)))
+    return framebuffer.read(viewport=viewport, components=3)
+
+
+def compare_renders(render_a, render_b, region, background=(128, 128, 128), tolerance=8):
+    """
+    在同一背景上分别执行两个绘制函数，逐像素比较结果
+
+    用于验证缓存路径(离屏目标、烘焙贴图)与直接绘制的画面一致。
+    两次绘制都画进与窗口尺寸、采样数相同的RGBA8离屏画布，与RedrawScheduler的帧缓存一致，
+    比较结果不受窗口帧缓冲格式影响(无窗口模式下可能是RGB565，
+    有的驱动直接读多重采样的窗口帧缓冲只返回一个采样点)。
+
+    参数:
+        render_a, render_b (callable): 无参数的绘制函数
+        region (tuple): 比较的区域(left, bottom, width, height)，屏幕坐标
+        background (tuple): 两次绘制前清屏的颜色(不透明，透明度处理错误时才会显现)
+        tolerance (int): 单个通道允许的差值
+
+    返回:
+        dict: max_diff为最大通道差值，over_tolerance为超出允许差值的像素数，pixels为像素总数
+    """
+    window = arcade.get_window()
+    width, height = window.get_size()
+    scale = window.get_framebuffer_size()[0] / max(1, width)
+    canvas = RenderTarget(width, height, scale=scale, samples=window_samples(window))
+    images = []
+    for render in (render_a, render_b):
+        with canvas.activate():
+            canvas.clear(background)
+            render()
+        window.ctx.finish()
+        images.append(_read_region(canvas.fbo, *region, scale=scale))
+
+    a, b = images
+    max_diff = 0
+    over = 0
+    for i in range(0, len(a), 3):
+        diff = max(abs(a[i] - b[i]), abs(a[i + 1] - b[i + 1]), abs(a[i + 2] - b[i + 2]))
+        if diff > max_diff:
+            max_diff = diff
+        if diff > tolerance:
+            over += 1
+    return {"max_diff": max_diff, "over_tolerance": over, "pixels": len(a) // 3}
+
+
+# 全局共享的帧分析器
+_default_profiler = FrameProfiler()
+
+
+def get_frame_profiler():
+    """返回全局共享的帧分析器"""
+    return _default_profiler
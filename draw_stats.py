@@ -0,0 +1,212 @@
+"""
+绘制调用统计
+
+只看帧耗时无法判断合批是否真的减少了绘制调用。开启统计后，
+arcade的draw_*函数以及Text、ShapeElementList、Sprite、SpriteList的draw方法被临时包装，
+每次调用记录调用次数、提交的顶点数(按参数估算)和文字绘制次数，
+并记到当前正在draw()的InteractiveObject/BedroomItem名下(按类名汇总)。
+每帧的合计显示在性能分析叠加层中，基准测试也把它写进结果JSON。
+
+统计是可选的: 关闭时所有包装都被撤销，绘制路径上没有任何额外开销。
+"""
+from collections import deque
+
+import arcade
+
+# 不在任何物体draw()中的调用记到这个名下(场景背景、叠加层等)
+SCENE_OWNER = "scene"
+
+# 绘制文字的函数和方法
+_TEXT_LABELS = ("draw_text", "Text.draw")
+
+
+def _estimate_vertices(label, instance, args, kwargs):
+    """按参数估算一次调用提交的顶点数"""
+    if label == "Text.draw":
+        return 4 * len(getattr(instance, "text", "") or "")
+    if label == "draw_text":
+        text = args[0] if args else kwargs.get("text", "")
+        return 4 * len(str(text))
+    if label == "ShapeElementList.draw":
+        return sum(len(getattr(shape, "points", ()) or ()) for shape in instance)
+    if label == "SpriteList.draw":
+        return 4 * len(instance)
+    if label in ("draw_line", "draw_point"):
+        return 2 if label == "draw_line" else 1
+    # 以点列表为第一个参数的函数(多边形、折线、点集)
+    points = args[0] if args else kwargs.get("point_list")
+    if isinstance(points, (list, tuple)) and points and isinstance(points[0], (list, tuple)):
+        return len(points)
+    # 矩形、纹理、精灵、圆和椭圆(由几何着色器展开)按一个四边形计
+    return 4
+
+
+class FrameDrawStats:
+    """一帧的统计结果"""
+
+    def __init__(self):
+        self.calls = 0
+        self.vertices = 0
+        self.text_draws = 0
+        # 函数名 -> 调用次数
+        self.by_function = {}
+        # 物体类名 -> 调用次数
+        self.by_owner = {}
+
+    def record(self, label, owner, vertices):
+        self.calls += 1
+        self.vertices += vertices
+        if label in _TEXT_LABELS:
+            self.text_draws += 1
+        self.by_function[label] = self.by_function.get(label, 0) + 1
+        self.by_owner[owner] = self.by_owner.get(owner, 0) + 1
+
+
+class DrawStats:
+    """按帧统计绘制调用"""
+
+    def __init__(self, history=240):
+        """
+        参数:
+            history (int): 保留最近多少帧的合计
+        """
+        self.enabled = False
+        self.current = FrameDrawStats()
+        # 最近一帧完成的统计
+        self.last_frame = None
+        # 每帧的(调用次数, 顶点数, 文字绘制次数)
+        self.history = deque(maxlen=history)
+        # 正在draw()的物体栈(类名)
+        self._owners = []
+        # 正在执行的被包装绘制函数层数，只统计最外层
+        # (例如draw_circle_filled内部调用draw_ellipse_filled，只算一次)
+        self._depth = 0
+        self._patched = []
+
+    def set_enabled(self, enabled):
+        """开启时包装绘制函数，关闭时恢复原函数"""
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        if enabled:
+            self._install()
+        else:
+            self._uninstall()
+        self.current = FrameDrawStats()
+        self._owners = []
+        self._depth = 0
+
+    def begin_frame(self):
+        """开始一帧，清空当前帧的统计"""
+        if not self.enabled:
+            return
+        self.current = FrameDrawStats()
+        self._owners = []
+
+    def end_frame(self):
+        """
+        结束一帧，保存合计
+
+        返回:
+            FrameDrawStats: 这一帧的统计，未开启时为None
+        """
+        if not self.enabled:
+            return None
+        frame = self.current
+        self.last_frame = frame
+        self.history.append((frame.calls, frame.vertices, frame.text_draws))
+        self.current = FrameDrawStats()
+        return frame
+
+    def record(self, label, vertices):
+        """
+        记录一次不经过arcade绘制函数的绘制调用(自己的着色器、实例化绘制等)
+
+        参数:
+            label (str): 调用名称
+            vertices (int): 提交的顶点数
+        """
+        if not self.enabled or self._depth:
+            return
+        self.current.record(label, self._owners[-1] if self._owners else SCENE_OWNER, vertices)
+
+    def _wrap(self, owner, name, label):
+        original = getattr(owner, name)
+        stats = self
+        is_method = isinstance(owner, type)
+
+        def counted(*args, **kwargs):
+            if stats._depth == 0:
+                if is_method:
+                    instance, call_args = args[0], args[1:]
+                else:
+                    instance, call_args = None, args
+                stats.current.record(
+                    label,
+                    stats._owners[-1] if stats._owners else SCENE_OWNER,
+                    _estimate_vertices(label, instance, call_args, kwargs)
+                )
+            stats._depth += 1
+            try:
+                return original(*args, **kwargs)
+            finally:
+                stats._depth -= 1
+
+        setattr(owner, name, counted)
+        self._patched.append((owner, name, original))
+
+    def _wrap_owner(self, cls):
+        """包装物体类自己定义的draw()，调用期间把类名压入物体栈"""
+        original = cls.__dict__["draw"]
+        stats = self
+
+        def draw(obj, *args, **kwargs):
+            stats._owners.append(type(obj).__name__)
+            try:
+                return original(obj, *args, **kwargs)
+            finally:
+                stats._owners.pop()
+
+        setattr(cls, "draw", draw)
+        self._patched.append((cls, "draw", original))
+
+    def _install(self):
+        for name in dir(arcade):
+            if name.startswith("draw_") and callable(getattr(arcade, name)):
+                self._wrap(arcade, name, name)
+        # 缓存的文字、图元列表和精灵不经过draw_*函数，单独统计
+        for cls, label in ((arcade.Text, "Text.draw"),
+                           (arcade.ShapeElementList, "ShapeElementList.draw"),
+                           (arcade.Sprite, "Sprite.draw"),
+                           (arcade.SpriteList, "SpriteList.draw")):
+            if hasattr(cls, "draw"):
+                self._wrap(cls, "draw", label)
+
+        # 延迟导入，避免和物体模块循环导入
+        from interactive_room_game import InteractiveObject
+        from bedroom_items import BedroomItem
+        for cls in _all_subclasses(InteractiveObject) | _all_subclasses(BedroomItem):
+            if "draw" in cls.__dict__:
+                self._wrap_owner(cls)
+
+    def _uninstall(self):
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched = []
+
+
+def _all_subclasses(cls):
+    """类本身和它所有已定义的子类"""
+    result = {cls}
+    for subclass in cls.__subclasses__():
+        result |= _all_subclasses(subclass)
+    return result
+
+
+# 全局共享的绘制统计
+_default_stats = DrawStats()
+
+
+def get_draw_stats():
+    """返回全局共享的绘制统计"""
+    return _default_stats
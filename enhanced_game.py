@@ -2,12 +2,15 @@ import arcade
 import os
 from interactive_room_game import InteractiveObject, Television, RemoteControl, SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, RESOURCES_DIR
 from extensions import GameConsole, Radio, Bookshelf
+from log_utils import setup_logging
 
-class EnhancedChildhoodRoom(arcade.Window):
-    """增强版的童年房间游戏"""
-    def __init__(self, width, height, title):
-        super().__init__(width, height, title)
-        arcade.set_background_color(arcade.color.BEIGE)
+class EnhancedChildhoodRoom(arcade.View):
+    """增强版的童年房间场景视图"""
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        super().__init__()
+        
+        # 按Esc键返回的视图(通常是场景选择)
+        self.back_view = None
         
         # 创建资源目录
         os.makedirs(RESOURCES_DIR, exist_ok=True)
@@ -36,19 +39,31 @@ class EnhancedChildhoodRoom(arcade.Window):
             self.bookshelf: self._handle_bookshelf
         }
     
+    def on_show_view(self):
+        """显示视图时调用"""
+        arcade.set_background_color(arcade.color.BEIGE)
+        self.window.set_caption("90后童年互动房间 - 增强版")
+        for obj in self.interactive_objects:
+            obj.retain_texture()
+    
+    def on_hide_view(self):
+        """隐藏视图时调用，释放纹理引用"""
+        for obj in self.interactive_objects:
+            obj.release_texture()
+    
     def on_draw(self):
         """渲染游戏画面"""
         arcade.start_render()
         
         # 绘制背景墙壁
-        arcade.draw_rect_filled(
-            arcade.rect.XYWH(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, SCREEN_WIDTH, SCREEN_HEIGHT),
+        arcade.draw_rectangle_filled(
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, SCREEN_WIDTH, SCREEN_HEIGHT,
             color=arcade.color.LIGHT_BLUE
         )
         
         # 绘制地板
-        arcade.draw_rect_filled(
-            arcade.rect.XYWH(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4, SCREEN_WIDTH, SCREEN_HEIGHT // 2),
+        arcade.draw_rectangle_filled(
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4, SCREEN_WIDTH, SCREEN_HEIGHT // 2,
             color=arcade.color.LIGHT_BROWN
         )
         
@@ -86,6 +101,12 @@ class EnhancedChildhoodRoom(arcade.Window):
                 obj.on_click()
                 break
     
+    def on_key_press(self, key, modifiers):
+        """键盘按键事件处理"""
+        # 按Esc键返回场景选择
+        if key == arcade.key.ESCAPE and self.back_view is not None:
+            self.window.show_view(self.back_view)
+    
     def _handle_remote(self, x, y):
         """处理遥控器交互"""
         # 点击遥控器切换电视频道
@@ -143,10 +164,11 @@ class EnhancedChildhoodRoom(arcade.Window):
             self.bookshelf.selected_book = None
 
 def main():
-    """主函数 - 仅用于单独运行该文件时"""
-    print("请使用main.py启动游戏")
+    """主函数 - 创建窗口并显示增强版房间"""
+    setup_logging()
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    window.show_view(EnhancedChildhoodRoom())
+    arcade.run()
 
 if __name__ == "__main__":
-    # 不再直接创建窗口和运行游戏
-    print("请使用main.py启动游戏")
-    # main()  # 注释掉，避免直接运行 
\ No newline at end of file
+    main()
@@ -1,4 +1,5 @@
 import arcade
+import circle_batch
 from interactive_room_game import InteractiveObject
 
 def color_from_hex_string(hex_string):
@@ -24,23 +25,24 @@ class GameConsole(InteractiveObject):
     
     def draw(self):
         # 绘制游戏机主体
-        arcade.draw_rect_filled(
-            arcade.rect.XYWH(self.x, self.y, self.width, self.height),
+        arcade.draw_rectangle_filled(
+            self.x, self.y, self.width, self.height,
             color=self.color
         )
         
         # 绘制游戏机按钮
         button_colors = [arcade.color.RED, arcade.color.BLACK]
-        for i in range(2):
-            arcade.draw_circle_filled(
-                center_x=self.x - 50 + i*30, 
-                center_y=self.y - 20, 
-                radius=5, color=button_colors[i]
-            )
+        with circle_batch.circle_layer():
+            for i in range(2):
+                circle_batch.draw_circle_filled(
+                    center_x=self.x - 50 + i*30, 
+                    center_y=self.y - 20, 
+                    radius=5, color=button_colors[i]
+                )
         
         # 绘制卡带插槽
-        arcade.draw_rect_filled(
-            arcade.rect.XYWH(self.x, self.y + 10, self.width - 40, 20),
+        arcade.draw_rectangle_filled(
+            self.x, self.y + 10, self.width - 40, 20,
             color=arcade.color.BLACK
         )
         
@@ -68,8 +70,8 @@ class Radio(InteractiveObject):
     
     def draw(self):
         # 绘制收音机主体
-        arcade.draw_rect_filled(
-            arcade.rect.XYWH(self.x, self.y, self.width, self.height),
+        arcade.draw_rectangle_filled(
+            self.x, self.y, self.width, self.height,
             color=self.color
         )
         
@@ -78,20 +80,21 @@ class Radio(InteractiveObject):
         if self.is_active:
             display_color = arcade.color.YELLOW
         
-        arcade.draw_rect_filled(
-            arcade.rect.XYWH(self.x, self.y + 15, self.width - 30, 25),
+        arcade.draw_rectangle_filled(
+            self.x, self.y + 15, self.width - 30, 25,
             color=display_color
         )
         
         # 绘制控制旋钮
-        arcade.draw_circle_filled(
-            center_x=self.x - 30, center_y=self.y - 15, 
-            radius=10, color=arcade.color.SILVER
-        )
-        arcade.draw_circle_filled(
-            center_x=self.x + 30, center_y=self.y - 15, 
-            radius=10, color=arcade.color.SILVER
-        )
+        with circle_batch.circle_layer():
+            circle_batch.draw_circle_filled(
+                center_x=self.x - 30, center_y=self.y - 15, 
+                radius=10, color=arcade.color.SILVER
+            )
+            circle_batch.draw_circle_filled(
+                center_x=self.x + 30, center_y=self.y - 15, 
+                radius=10, color=arcade.color.SILVER
+            )
         
         # 如果收音机开启，显示频道信息
         if self.is_active:
@@ -125,33 +128,13 @@ class Bookshelf(InteractiveObject):
         self.selected_book = None
     
     def draw(self):
-        # 绘制书架主体
-        arcade.draw_rect_filled(
-            arcade.rect.XYWH(self.x, self.y, self.width, self.height),
-            color=self.color
-        )
-        
-        # 绘制书架层板
-        for i in range(3):
-            arcade.draw_rect_filled(
-                arcade.rect.XYWH(self.x, self.y - 50 + i*70, self.width, 5),
-                color=arcade.color.DARK_BROWN
-            )
+        # 书架主体、层板和书本是静态图元
+        self.draw_static_shapes(self.build_static_shapes)
         
-        # 绘制书本
+        # 书脊上的文字
         for i, book in enumerate(self.books):
             book_x = self.x - 60 + (i % 2) * 80
             book_y = self.y + 60 - (i // 2) * 70
-            book_color = color_from_hex_string(
-                ["#FF9999", "#99FF99", "#9999FF", "#FFFF99"][i]
-            )
-            
-            arcade.draw_rect_filled(
-                arcade.rect.XYWH(book_x, book_y, 40, 60),
-                color=book_color
-            )
-            
-            # 书脊上的文字
             arcade.draw_text(
                 text=book, start_x=book_x - 15, start_y=book_y - 5, 
                 color=arcade.color.BLACK, font_size=8, 
@@ -160,8 +143,8 @@ class Bookshelf(InteractiveObject):
         
         # 如果有选中的书，显示内容
         if self.selected_book is not None:
-            arcade.draw_rect_filled(
-                arcade.rect.XYWH(self.x + 200, self.y, 150, 200),
+            arcade.draw_rectangle_filled(
+                self.x + 200, self.y, 150, 200,
                 color=arcade.color.WHITE
             )
             arcade.draw_text(
@@ -171,6 +154,33 @@ class Bookshelf(InteractiveObject):
                 width=140, align="center"
             )
     
+    def build_static_shapes(self, shapes):
+        """构建书架的静态图元"""
+        # 书架主体
+        shapes.append(arcade.create_rectangle_filled(
+            self.x, self.y, self.width, self.height,
+            self.color
+        ))
+        
+        # 书架层板
+        for i in range(3):
+            shapes.append(arcade.create_rectangle_filled(
+                self.x, self.y - 50 + i*70, self.width, 5,
+                arcade.color.DARK_BROWN
+            ))
+        
+        # 书本
+        for i in range(len(self.books)):
+            book_x = self.x - 60 + (i % 2) * 80
+            book_y = self.y + 60 - (i // 2) * 70
+            book_color = color_from_hex_string(
+                ["#FF9999", "#99FF99", "#9999FF", "#FFFF99"][i]
+            )
+            shapes.append(arcade.create_rectangle_filled(
+                book_x, book_y, 40, 60,
+                book_color
+            ))
+    
     def select_book(self, index):
         """选择一本书"""
         if 0 <= index < len(self.books):
@@ -1,13 +1,22 @@
 import arcade
-import arcade.gui
-import random
 import math
 import os
 import datetime  # 添加datetime模块
-from interactive_room_game import Television, RemoteControl, SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE
-from bedroom_items import Bed, Desk, Computer, HomeworkBook, Window
-from extensions import GameConsole, Radio, Bookshelf
-from debug_tools import draw_coordinate_system  # 导入坐标轴绘制函数
+from interactive_room_game import SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE
+from debug_tools import draw_coordinate_system, get_frame_profiler  # 导入坐标轴绘制函数和帧分析器
+from text_cache import draw_cached_text
+from spatial_index import SpatialIndex
+from particles import ParticleField
+from redraw import RedrawScheduler
+from time_of_day import TimeOfDay
+from sim_clock import SimulationClock
+from tween import TweenScheduler, ease_in_out_sine
+from texture_manager import get_texture_manager
+import circle_batch
+from log_utils import get_logger, setup_logging
+from glyph_warmup import start_glyph_warmup
+
+logger = get_logger(__name__)
 
 # 90后经典的亮色调
 NINETIES_COLORS = [
@@ -23,6 +32,9 @@ NINETIES_COLORS = [
     (50, 205, 50)     # 石灰绿
 ]
 
+# 开场白每行淡入(或淡出)的时间(秒)
+INTRO_FADE_TIME = 2.1
+
 class GameManager(arcade.Window):
     """统一的游戏管理器，使用状态模式而不是视图切换"""
     
@@ -35,6 +47,9 @@ class GameManager(arcade.Window):
         super().__init__(width, height, title)
         arcade.set_background_color(arcade.color.BEIGE)
         
+        # 画面没有变化时复用上一帧
+        self.redraw = RedrawScheduler(self)
+        
         # 当前游戏状态
         self.current_state = self.STATE_LOGIN
         
@@ -44,18 +59,10 @@ class GameManager(arcade.Window):
         self.use_enhanced_version = False
         
         # 创建UI管理器（仅用于登录状态）
-        self.ui_manager = arcade.gui.UIManager()
         self.setup_login_ui()
         
         # 创建动画元素
-        self.stars = []
-        for _ in range(50):
-            self.stars.append({
-                'x': random.randint(0, SCREEN_WIDTH),
-                'y': random.randint(0, SCREEN_HEIGHT),
-                'size': random.uniform(1, 3),
-                'speed': random.uniform(0.5, 2)
-            })
+        self.stars = ParticleField.falling_stars(50, SCREEN_WIDTH, SCREEN_HEIGHT)
         
         # 卧室状态属性
         self.intro_text = [
@@ -76,17 +83,21 @@ class GameManager(arcade.Window):
         current_time = datetime.datetime.now()
         self.game_time = datetime.datetime(1996, 1, 1, current_time.hour, current_time.minute)
         self.time_speed = 1  # 时间流逝速度倍数
+        # 昼夜光照查找表，time_sample为当前分钟的光照状态
+        self.time_of_day = TimeOfDay()
+        self.time_sample = self.time_of_day.sample(self.game_time)
         self.time_buttons = []  # 存储时间控制按钮
         self.setup_time_controls()
         
-        # 卧室互动物品
+        # 卧室互动物品(第一次进入卧室状态时创建)
         self.bedroom_items = []
-        self.setup_bedroom_items()
+        self.bedroom_index = None
+        self.hovered_item = None
         
-        # 游戏状态属性
+        # 游戏状态属性(第一次进入游戏状态时创建)
         self.game_objects = []
         self.special_interactions = {}
-        self.setup_game_objects()
+        self.game_index = None
         
         # 共享属性
         self.total_time = 0.0
@@ -102,7 +113,15 @@ class GameManager(arcade.Window):
         self.mouse_x = 0
         self.mouse_y = 0
         
-        # 加载背景图片
+        # 帧阶段分析器(P键开关)
+        self.profiler = get_frame_profiler()
+        
+        # 固定步长模拟时钟，动画速度与帧率无关
+        self.clock = SimulationClock()
+        # 开场白淡入淡出、窗外景色等登记为动画，只推进正在进行的
+        self.tweens = TweenScheduler(on_change=self.redraw.mark_dirty)
+        
+        # 在后台加载背景图片，加载完成前使用颜色背景，登录界面不必等待解码
         try:
             # 创建resources目录（如果不存在）
             os.makedirs("resources/bedroom", exist_ok=True)
@@ -111,41 +130,47 @@ class GameManager(arcade.Window):
             bedroom_sun_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "bedroom", "bedroom-sun.jpg")
             bedroom_night_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "bedroom", "beedroom-night.jpg")
             
-            print(f"尝试加载白天背景图片: {bedroom_sun_path}")
-            print(f"尝试加载夜晚背景图片: {bedroom_night_path}")
+            logger.debug("尝试加载白天背景图片: %s", bedroom_sun_path)
+            logger.debug("尝试加载夜晚背景图片: %s", bedroom_night_path)
             
             # 检查文件是否存在
             if not os.path.exists(bedroom_sun_path):
-                print(f"错误: 白天背景图片不存在: {bedroom_sun_path}")
+                logger.error("白天背景图片不存在: %s", bedroom_sun_path)
             if not os.path.exists(bedroom_night_path):
-                print(f"错误: 夜晚背景图片不存在: {bedroom_night_path}")
+                logger.error("夜晚背景图片不存在: %s", bedroom_night_path)
             
-            # 加载卧室背景图片 - 使用绝对路径
-            self.bedroom_bg_day = arcade.load_texture(bedroom_sun_path)
-            self.bedroom_bg_night = arcade.load_texture(bedroom_night_path)
+            # 加载卧室背景图片 - 使用绝对路径，得到的是纹理句柄
+            # 离开卧室状态时释放引用，内存紧张时可以被淘汰，回到卧室时自动重新加载
+            textures = get_texture_manager()
+            self.bedroom_bg_day = textures.acquire(bedroom_sun_path, owner=self)
+            self.bedroom_bg_night = textures.acquire(bedroom_night_path, owner=self)
+            for handle in (self.bedroom_bg_day, self.bedroom_bg_night):
+                handle.add_ready_callback(lambda handle: self.redraw.mark_dirty())
             
             # 当前使用的背景
             self.current_bg = self.bedroom_bg_night  # 默认夜晚
             
             self.has_bedroom_bg = True
-            print("卧室背景图片加载成功")
-        except Exception as e:
+            logger.debug("卧室背景图片开始加载")
+        except Exception:
             self.has_bedroom_bg = False
-            print(f"加载背景图片出错: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("加载背景图片出错")
         
-        print("游戏管理器初始化完成")
+        logger.info("游戏管理器初始化完成")
     
     def setup_login_ui(self):
         """设置登录UI元素"""
+        # arcade.gui只有登录界面用到，用到时才导入
+        from arcade import gui
+        
+        self.ui_manager = gui.UIManager()
         self.ui_manager.enable()
         
         # 创建一个垂直布局容器
-        v_box = arcade.gui.UIBoxLayout()
+        v_box = gui.UIBoxLayout()
         
         # 添加标题标签
-        title_label = arcade.gui.UILabel(
+        title_label = gui.UILabel(
             text="90后童年互动房间",
             font_size=40,
             width=500,
@@ -154,10 +179,10 @@ class GameManager(arcade.Window):
         v_box.add(title_label.with_space_around(bottom=30))
         
         # 创建一个装饰性分隔线
-        line_box = arcade.gui.UIBoxLayout(vertical=False)
+        line_box = gui.UIBoxLayout(vertical=False)
         for i in range(10):
             color = NINETIES_COLORS[i]
-            line = arcade.gui.UILabel(
+            line = gui.UILabel(
                 text="●",
                 width=40,
                 font_size=24,
@@ -167,14 +192,14 @@ class GameManager(arcade.Window):
         v_box.add(line_box.with_space_around(bottom=30))
         
         # 创建用户名输入框
-        username_layout = arcade.gui.UIBoxLayout(vertical=False)
-        username_field = arcade.gui.UILabel(
+        username_layout = gui.UIBoxLayout(vertical=False)
+        username_field = gui.UILabel(
             text="用户名:",
             width=100,
             text_color=arcade.color.DARK_BLUE,
             font_size=18
         )
-        self.username_input = arcade.gui.UIInputText(
+        self.username_input = gui.UIInputText(
             text="玩家1",
             width=300,
             height=40,
@@ -186,14 +211,14 @@ class GameManager(arcade.Window):
         v_box.add(username_layout.with_space_around(bottom=20))
         
         # 创建密码输入框
-        password_layout = arcade.gui.UIBoxLayout(vertical=False)
-        password_field = arcade.gui.UILabel(
+        password_layout = gui.UIBoxLayout(vertical=False)
+        password_field = gui.UILabel(
             text="密码:",
             width=100,
             text_color=arcade.color.DARK_BLUE,
             font_size=18
         )
-        self.password_input = arcade.gui.UIInputText(
+        self.password_input = gui.UIInputText(
             text="",
             width=300,
             height=40,
@@ -206,7 +231,7 @@ class GameManager(arcade.Window):
         v_box.add(password_layout.with_space_around(bottom=30))
         
         # 登录按钮 - 更漂亮的样式
-        login_button = arcade.gui.UIFlatButton(
+        login_button = gui.UIFlatButton(
             text="登录",
             width=200,
             height=50,
@@ -221,7 +246,7 @@ class GameManager(arcade.Window):
         )
         
         # 设置版本选择切换按钮 - 更漂亮的样式
-        self.version_switch = arcade.gui.UIFlatButton(
+        self.version_switch = gui.UIFlatButton(
             text="切换到增强版",
             width=200,
             height=50,
@@ -257,11 +282,11 @@ class GameManager(arcade.Window):
             
             # 标记正在切换状态
             self.is_transitioning = True
-            print("登录按钮点击")
+            logger.debug("登录按钮点击")
             
             # 获取用户名
             self.username = self.username_input.text if self.username_input.text else "玩家"
-            print(f"用户名: {self.username}")
+            logger.info("用户名: %s", self.username)
             
             # 禁用UI管理器
             self.ui_manager.disable()
@@ -270,8 +295,8 @@ class GameManager(arcade.Window):
             self.intro_text[0] = f"亲爱的{self.username}，欢迎回到90后的童年"
             
             # 切换到卧室状态
-            print("切换到卧室状态")
-            self.current_state = self.STATE_BEDROOM
+            logger.info("切换到卧室状态")
+            self.set_state(self.STATE_BEDROOM)
             
             # 初始化时间并根据时间设置背景
             current_time = datetime.datetime.now()
@@ -282,7 +307,7 @@ class GameManager(arcade.Window):
             self.is_transitioning = False
         
         # 添加一个按钮容器，使按钮并排显示
-        button_row = arcade.gui.UIBoxLayout(vertical=False, space_between=20)
+        button_row = gui.UIBoxLayout(vertical=False, space_between=20)
         button_row.add(login_button)
         button_row.add(self.version_switch)
         
@@ -291,15 +316,77 @@ class GameManager(arcade.Window):
         
         # 将垂直框添加到管理器中
         self.ui_manager.add(
-            arcade.gui.UIAnchorWidget(
+            gui.UIAnchorWidget(
                 anchor_x="center_x",
                 anchor_y="center_y",
                 child=v_box
             )
         )
     
+    def set_state(self, state):
+        """
+        切换游戏状态，第一次进入卧室或游戏状态时才导入并创建对应的物品
+        
+        参数:
+            state (str): 目标状态
+        """
+        if state == self.STATE_BEDROOM and self.bedroom_index is None:
+            self.setup_bedroom_items()
+        elif state == self.STATE_GAME and self.game_index is None:
+            self.setup_game_objects()
+        
+        # 只有卧室状态用到背景图片
+        if self.has_bedroom_bg:
+            textures = get_texture_manager()
+            if state == self.STATE_BEDROOM:
+                textures.retain(self.bedroom_bg_day, owner=self)
+                textures.retain(self.bedroom_bg_night, owner=self)
+            else:
+                textures.release(self)
+        
+        # 卧室的动画只在卧室状态下运行
+        if state == self.STATE_BEDROOM:
+            self.tweens.animate("window", self.window.update)
+            if self.welcome_phase and not self.tweens.is_active((self, "text_alpha")):
+                self.fade_intro_line(self.fade_in)
+        else:
+            self.tweens.cancel("window")
+            self.tweens.cancel((self, "text_alpha"))
+        
+        self.current_state = state
+        self.redraw.mark_dirty()
+    
+    def fade_intro_line(self, fade_in=True):
+        """
+        开场白当前行淡入或淡出，淡入完成后接着淡出，淡出完成后换下一行淡入
+        
+        参数:
+            fade_in (bool): True为淡入，False为淡出
+        """
+        if not self.welcome_phase:
+            return
+        self.fade_in = fade_in
+        self.tweens.tween(
+            self, "text_alpha", 255 if fade_in else 0, INTRO_FADE_TIME,
+            easing=ease_in_out_sine, on_complete=self.on_intro_fade_complete
+        )
+    
+    def on_intro_fade_complete(self):
+        """开场白一次淡入或淡出完成"""
+        if not self.fade_in:
+            # 切换到下一行文字
+            self.current_line = (self.current_line + 1) % len(self.intro_text)
+        self.fade_intro_line(not self.fade_in)
+    
+    def skip_intro(self):
+        """跳过开场白"""
+        self.welcome_phase = False
+        self.tweens.cancel((self, "text_alpha"))
+    
     def setup_bedroom_items(self):
         """设置卧室中的互动物品"""
+        from bedroom_items import Bed, Desk, Computer, HomeworkBook, Window
+        
         self.bed = Bed(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3)
         self.desk = Desk(SCREEN_WIDTH * 0.25, SCREEN_HEIGHT * 0.5)
         self.computer = Computer(SCREEN_WIDTH * 0.25, SCREEN_HEIGHT * 0.6)
@@ -314,9 +401,22 @@ class GameManager(arcade.Window):
             self.homework,
             self.window
         ]
+        
+        # 悬停和点击检测使用空间索引
+        self.bedroom_index = SpatialIndex()
+        for item in self.bedroom_items:
+            self.bedroom_index.insert(item)
+            self.redraw.track(item)
+        self.hovered_item = None
+        
+        # 窗外景色跟随当前时间
+        self.window.set_time_of_day(self.time_sample)
     
     def setup_game_objects(self):
         """设置游戏中的交互对象"""
+        from interactive_room_game import Television, RemoteControl
+        from extensions import GameConsole, Radio, Bookshelf
+        
         # 基础对象
         self.tv = Television(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100)
         self.remote = RemoteControl(SCREEN_WIDTH // 2 + 200, SCREEN_HEIGHT // 2 - 100)
@@ -340,6 +440,12 @@ class GameManager(arcade.Window):
                 self.radio: self._handle_radio,
                 self.bookshelf: self._handle_bookshelf
             }
+        
+        # 点击检测使用空间索引
+        self.game_index = SpatialIndex()
+        for obj in self.game_objects:
+            self.game_index.insert(obj)
+            self.redraw.track(obj)
     
     def setup_time_controls(self):
         """设置时间控制按钮"""
@@ -359,56 +465,68 @@ class GameManager(arcade.Window):
         self.message_timer = 0
     
     def update_background_by_time(self):
-        """根据当前时间更新背景"""
+        """根据当前时间查光照表，进入新的一分钟时更新背景和窗外景色"""
+        sample = self.time_of_day.sample(self.game_time)
+        if sample is self.time_sample:
+            return
+        self.time_sample = sample
+        
         if hasattr(self, 'has_bedroom_bg') and self.has_bedroom_bg:
-            hour = self.game_time.hour
-            
-            # 6:00-19:00 显示白天背景
-            if 6 <= hour < 19:
+            # current_bg记录占主导的背景，实际绘制时两张背景按权重交叉淡入淡出
+            if sample.day_weight >= 0.5:
                 if self.current_bg != self.bedroom_bg_day:
                     self.current_bg = self.bedroom_bg_day
-                    print("背景自动切换为白天")
-            # 19:00-6:00 显示夜晚背景
+                    logger.info("背景自动切换为白天")
             else:
                 if self.current_bg != self.bedroom_bg_night:
                     self.current_bg = self.bedroom_bg_night
-                    print("背景自动切换为夜晚")
+                    logger.info("背景自动切换为夜晚")
+        
+        if self.bedroom_index is not None:
+            self.window.set_time_of_day(sample)
+        self.redraw.mark_dirty()
     
     def on_update(self, delta_time):
         """更新游戏状态"""
+        self.profiler.begin_frame()
+        with self.profiler.phase("update"):
+            # 按固定步长推进模拟，绘制位置在两步之间插值
+            self.clock.advance(delta_time, self.update_state)
+            self.interpolate(self.clock.render_alpha)
+    
+    def interpolate(self, alpha):
+        """
+        按渲染插值系数更新当前状态中运动物体的绘制位置
+        
+        参数:
+            alpha (float): 0为上一步的状态，1为当前状态
+        """
+        self.tweens.interpolate(alpha)
+        if self.current_state == self.STATE_LOGIN:
+            self.stars.interpolate(alpha)
+            self.redraw.mark_dirty()
+        elif self.current_state == self.STATE_BEDROOM and self.bedroom_index is not None:
+            self.window.interpolate(alpha)
+    
+    def update_state(self, delta_time):
+        """推进一步模拟: 按当前状态更新动画和计时器"""
         self.total_time += delta_time
         
+        # 推进活动的动画(开场白淡入淡出、窗外景色)
+        self.tweens.update(delta_time)
+        
         # 登录状态下的更新
         if self.current_state == self.STATE_LOGIN:
-            # 更新星星位置
-            for star in self.stars:
-                star['y'] -= star['speed']
-                if star['y'] < 0:
-                    star['y'] = SCREEN_HEIGHT
-                    star['x'] = random.randint(0, SCREEN_WIDTH)
+            # 更新星星位置(星星和气球一直在动，每帧都要重绘)
+            self.stars.update(delta_time)
+            self.redraw.mark_dirty()
         
         # 卧室状态下的更新
         elif self.current_state == self.STATE_BEDROOM:
-            # 更新欢迎阶段的文字淡入淡出效果
-            if self.welcome_phase:
-                if self.fade_in:
-                    self.text_alpha += 2  # 淡入速度
-                    if self.text_alpha >= 255:
-                        self.text_alpha = 255
-                        self.fade_in = False
-                else:
-                    self.text_alpha -= 2  # 淡出速度
-                    if self.text_alpha <= 0:
-                        self.text_alpha = 0
-                        self.fade_in = True
-                        # 切换到下一行文字
-                        self.current_line = (self.current_line + 1) % len(self.intro_text)
+            # 游戏时间按倍速流逝，光照每分钟变化一次
+            self.game_time += datetime.timedelta(seconds=delta_time * self.time_speed)
+            self.update_background_by_time()
             
-            # 更新物品状态
-            for item in self.bedroom_items:
-                # 如果是窗户，需要特殊处理来更新动画
-                if isinstance(item, Window):
-                    item.update(delta_time)
         
         # 游戏状态下的更新
         elif self.current_state == self.STATE_GAME:
@@ -420,26 +538,39 @@ class GameManager(arcade.Window):
             if self.message_timer >= self.message_duration:
                 self.message_timer = 0
                 self.current_message = ""
+                self.redraw.mark_dirty()
     
     def on_draw(self):
         """渲染游戏画面"""
+        self.redraw.draw(self.draw_scene)
+        
+        # 分析叠加层画在帧缓存之外，每帧刷新
+        self.profiler.end_frame()
+        self.profiler.draw()
+    
+    def draw_scene(self):
+        """绘制当前状态的完整画面"""
         arcade.start_render()
         
         # 登录状态下的绘制
         if self.current_state == self.STATE_LOGIN:
-            self.draw_login_screen()
+            with self.profiler.phase("draw_login"):
+                self.draw_login_screen()
         
         # 卧室状态下的绘制
         elif self.current_state == self.STATE_BEDROOM:
-            self.draw_bedroom_screen()
+            with self.profiler.phase("draw_bedroom"):
+                self.draw_bedroom_screen()
         
         # 游戏状态下的绘制
         elif self.current_state == self.STATE_GAME:
-            self.draw_game_screen()
+            with self.profiler.phase("draw_game"):
+                self.draw_game_screen()
         
         # 如果启用坐标系统，绘制坐标轴
         if self.show_coordinates:
-            draw_coordinate_system(SCREEN_WIDTH, SCREEN_HEIGHT, self.mouse_x, self.mouse_y)
+            with self.profiler.phase("coordinates"):
+                draw_coordinate_system(SCREEN_WIDTH, SCREEN_HEIGHT, self.mouse_x, self.mouse_y)
     
     def draw_login_screen(self):
         """绘制登录页面"""
@@ -454,11 +585,7 @@ class GameManager(arcade.Window):
         )
         
         # 绘制星星
-        for star in self.stars:
-            arcade.draw_circle_filled(
-                star['x'], star['y'], star['size'],
-                arcade.color.WHITE
-            )
+        self.stars.draw()
         
         # 绘制底部装饰
         # 绘制草地
@@ -467,23 +594,26 @@ class GameManager(arcade.Window):
             arcade.color.APPLE_GREEN
         )
         
-        # 绘制云朵
-        self.draw_cloud(100, SCREEN_HEIGHT - 100, 40)
-        self.draw_cloud(300, SCREEN_HEIGHT - 150, 50)
-        self.draw_cloud(600, SCREEN_HEIGHT - 120, 45)
-        self.draw_cloud(800, SCREEN_HEIGHT - 180, 55)
+        # 绘制云朵(所有云朵的圆一次画完)
+        with circle_batch.circle_layer():
+            self.draw_cloud(100, SCREEN_HEIGHT - 100, 40)
+            self.draw_cloud(300, SCREEN_HEIGHT - 150, 50)
+            self.draw_cloud(600, SCREEN_HEIGHT - 120, 45)
+            self.draw_cloud(800, SCREEN_HEIGHT - 180, 55)
         
-        # 绘制彩色气球
-        for i in range(10):
-            x = 50 + i * 100
-            y = SCREEN_HEIGHT - 50
-            self.draw_balloon(x, y, NINETIES_COLORS[i])
+        # 绘制彩色气球(气球之间互不遮挡，气球线先画，气球和反光在图层结束时一次画完)
+        with circle_batch.circle_layer():
+            for i in range(10):
+                x = 50 + i * 100
+                y = SCREEN_HEIGHT - 50
+                self.draw_balloon(x, y, NINETIES_COLORS[i])
         
         # 绘制UI元素
-        self.ui_manager.draw()
+        with self.profiler.phase("ui"):
+            self.ui_manager.draw()
         
         # 绘制底部提示文字
-        arcade.draw_text(
+        draw_cached_text(
             "登录以体验90后童年的回忆",
             start_x=SCREEN_WIDTH / 2,
             start_y=70,
@@ -504,44 +634,62 @@ class GameManager(arcade.Window):
         )
         
         # 气球本身
-        arcade.draw_circle_filled(
+        circle_batch.draw_circle_filled(
             x, y, 25, color
         )
         # 气球反光
-        arcade.draw_circle_filled(
+        circle_batch.draw_circle_filled(
             x - 8, y + 8, 5, (255, 255, 255, 120)
         )
     
     def draw_cloud(self, x, y, size):
         """绘制云朵"""
-        arcade.draw_circle_filled(x, y, size, arcade.color.WHITE)
-        arcade.draw_circle_filled(x + size*0.8, y, size*0.7, arcade.color.WHITE)
-        arcade.draw_circle_filled(x - size*0.8, y, size*0.7, arcade.color.WHITE)
-        arcade.draw_circle_filled(x + size*0.4, y + size*0.4, size*0.7, arcade.color.WHITE)
-        arcade.draw_circle_filled(x - size*0.4, y + size*0.4, size*0.7, arcade.color.WHITE)
+        circle_batch.draw_circle_filled(x, y, size, arcade.color.WHITE)
+        circle_batch.draw_circle_filled(x + size*0.8, y, size*0.7, arcade.color.WHITE)
+        circle_batch.draw_circle_filled(x - size*0.8, y, size*0.7, arcade.color.WHITE)
+        circle_batch.draw_circle_filled(x + size*0.4, y + size*0.4, size*0.7, arcade.color.WHITE)
+        circle_batch.draw_circle_filled(x - size*0.4, y + size*0.4, size*0.7, arcade.color.WHITE)
     
-    def draw_bedroom_screen(self):
-        """绘制卧室场景"""
-        # 如果有背景图片，使用背景图片
-        if hasattr(self, 'has_bedroom_bg') and self.has_bedroom_bg:
-            # 记录当前正在使用的背景
-            if self.current_bg == self.bedroom_bg_day:
-                bg_type = "白天背景"
-            else:
-                bg_type = "夜晚背景"
-            print(f"正在绘制卧室背景: {bg_type}")
-            
-            # 绘制背景图片
+    def draw_bedroom_background(self):
+        """
+        按白天权重交叉淡入淡出绘制白天和夜晚背景
+        
+        先画不透明的夜晚背景，再以权重为透明度叠加白天背景，混合由GPU完成
+        
+        返回:
+            bool: 是否画出了背景图片(需要的背景还没加载好时返回False)
+        """
+        if not (hasattr(self, 'has_bedroom_bg') and self.has_bedroom_bg):
+            return False
+        
+        weight = self.time_sample.day_weight
+        layers = []
+        if weight < 1:
+            layers.append((self.bedroom_bg_night, 255))
+        if weight > 0:
+            layers.append((self.bedroom_bg_day, 255 if weight >= 1 else int(weight * 255)))
+        if not all(background.ready for background, _ in layers):
+            return False
+        
+        for background, alpha in layers:
             arcade.draw_texture_rectangle(
                 center_x=SCREEN_WIDTH // 2,
                 center_y=SCREEN_HEIGHT // 2,
                 width=SCREEN_WIDTH,
                 height=SCREEN_HEIGHT,
-                texture=self.current_bg
+                texture=background.texture,
+                alpha=alpha
             )
-        else:
-            print("警告: 没有背景图片可用，使用颜色背景")
-            # 否则使用简单的颜色背景
+        return True
+    
+    def draw_bedroom_screen(self):
+        """绘制卧室场景"""
+        # 如果有背景图片，使用背景图片
+        if not self.draw_bedroom_background():
+            if not self.has_bedroom_bg or self.current_bg.failed:
+                # 每帧都会走到这里，由日志限流控制输出频率
+                logger.warning("没有背景图片可用，使用颜色背景")
+            # 否则(或背景还在加载时)使用简单的颜色背景
             # 绘制墙壁
             arcade.draw_lrtb_rectangle_filled(
                 0, SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_HEIGHT * 0.3,
@@ -554,17 +702,24 @@ class GameManager(arcade.Window):
                 arcade.color.LIGHT_BROWN
             )
         
+        # 叠加环境色调(黄昏偏暖、夜晚偏蓝)
+        ambient = self.time_sample.ambient
+        if ambient[3] > 0:
+            arcade.draw_lrtb_rectangle_filled(
+                0, SCREEN_WIDTH, SCREEN_HEIGHT, 0, ambient
+            )
+        
         # 绘制所有可交互物品
         for item in self.bedroom_items:
             item.draw()
         
         # 在欢迎阶段显示开场白文字
         if self.welcome_phase and self.current_line < len(self.intro_text):
-            arcade.draw_text(
+            draw_cached_text(
                 self.intro_text[self.current_line],
                 start_x=SCREEN_WIDTH // 2,
                 start_y=SCREEN_HEIGHT * 0.8,
-                color=(0, 0, 0, self.text_alpha),
+                color=(0, 0, 0, int(self.text_alpha)),
                 font_size=24,
                 anchor_x="center",
                 bold=True
@@ -582,7 +737,7 @@ class GameManager(arcade.Window):
             )
             
             # 绘制时间文本
-            arcade.draw_text(
+            draw_cached_text(
                 time_str,
                 start_x=SCREEN_WIDTH - 120,
                 start_y=SCREEN_HEIGHT - 25,
@@ -609,7 +764,7 @@ class GameManager(arcade.Window):
                 )
                 
                 # 绘制按钮文本
-                arcade.draw_text(
+                draw_cached_text(
                     "+1小时",
                     start_x=btn_x,
                     start_y=btn_y,
@@ -628,7 +783,7 @@ class GameManager(arcade.Window):
                 (0, 0, 0, 150)
             )
             
-            arcade.draw_text(
+            draw_cached_text(
                 self.current_message,
                 start_x=SCREEN_WIDTH // 2,
                 start_y=SCREEN_HEIGHT * 0.8,
@@ -646,7 +801,7 @@ class GameManager(arcade.Window):
         else:
             instruction = "点击物品与它们互动，右键点击窗户切换日夜，右键点击电脑关机\n双击暑假作业可以写作业，点击屏幕空白处进入游戏"
         
-        arcade.draw_text(
+        draw_cached_text(
             instruction,
             start_x=SCREEN_WIDTH // 2,
             start_y=30,
@@ -697,14 +852,14 @@ class GameManager(arcade.Window):
             ])
         
         for i, instruction in enumerate(instructions):
-            arcade.draw_text(
+            draw_cached_text(
                 text=instruction, 
                 start_x=20, start_y=SCREEN_HEIGHT - 30 - i*20, 
                 color=arcade.color.BLACK, font_size=12
             )
         
         # 显示用户名
-        arcade.draw_text(
+        draw_cached_text(
             text=f"玩家: {self.username}",
             start_x=SCREEN_WIDTH - 200,
             start_y=SCREEN_HEIGHT - 30,
@@ -721,7 +876,7 @@ class GameManager(arcade.Window):
                 (0, 0, 0, 150)
             )
             
-            arcade.draw_text(
+            draw_cached_text(
                 self.current_message,
                 start_x=SCREEN_WIDTH // 2,
                 start_y=SCREEN_HEIGHT * 0.8,
@@ -739,6 +894,9 @@ class GameManager(arcade.Window):
         if self.is_transitioning:
             return
         
+        # 点击可能改变任何物品或状态
+        self.redraw.mark_dirty()
+        
         # 登录状态下的点击处理
         if self.current_state == self.STATE_LOGIN:
             # 登录状态下点击由UI管理器处理
@@ -764,12 +922,12 @@ class GameManager(arcade.Window):
         """处理卧室场景的点击事件"""
         # 如果在欢迎阶段，点击任意处跳过
         if self.welcome_phase:
-            self.welcome_phase = False
+            self.skip_intro()
             return
         
         # 先检查是否点击了电脑桌面
         for item in self.bedroom_items:
-            if isinstance(item, Computer) and item.show_desktop and item.is_active:
+            if item is self.computer and item.show_desktop and item.is_active:
                 desktop_result = item.handle_desktop_click(x, y)
                 if desktop_result:
                     self.current_message = desktop_result
@@ -777,62 +935,58 @@ class GameManager(arcade.Window):
                     return
         
         # 检查是否点击了物品
-        item_clicked = False
-        for item in self.bedroom_items:
-            if item.is_clicked(x, y):
-                item_clicked = True
-                
-                # 根据点击的按钮类型处理
-                if button == arcade.MOUSE_BUTTON_LEFT:
-                    # 左键点击
-                    message = item.on_click()
+        item = self.bedroom_index.first_at(x, y)
+        if item is not None:
+            # 根据点击的按钮类型处理
+            if button == arcade.MOUSE_BUTTON_LEFT:
+                # 左键点击
+                message = item.on_click()
+                self.current_message = message
+                self.message_timer = 0
+            elif button == arcade.MOUSE_BUTTON_RIGHT:
+                # 右键点击，特殊处理
+                if item is self.window:
+                    # 将日夜变化回调传递给Window
+                    message = item.change_time(self.on_day_night_change)
+                    self.current_message = message
+                    self.message_timer = 0
+                elif item is self.computer:
+                    message = item.on_right_click()
                     self.current_message = message
                     self.message_timer = 0
-                elif button == arcade.MOUSE_BUTTON_RIGHT:
-                    # 右键点击，特殊处理
-                    if isinstance(item, Window):
-                        # 将日夜变化回调传递给Window
-                        message = item.change_time(self.on_day_night_change)
-                        self.current_message = message
-                        self.message_timer = 0
-                    elif isinstance(item, Computer):
-                        message = item.on_right_click()
-                        self.current_message = message
-                        self.message_timer = 0
-                break
         
         # 如果没有点击任何物品且点击的是左键，进入游戏
-        if not item_clicked and button == arcade.MOUSE_BUTTON_LEFT:
+        if item is None and button == arcade.MOUSE_BUTTON_LEFT:
             self.is_transitioning = True
-            print("从卧室进入游戏状态")
-            self.current_state = self.STATE_GAME
+            logger.info("从卧室进入游戏状态")
+            self.set_state(self.STATE_GAME)
             self.is_transitioning = False
     
     def handle_game_click(self, x, y, button):
         """处理游戏场景的点击事件"""
+        hits = self.game_index.query_point(x, y)
+        
         # 基础版直接处理点击
         if not self.use_enhanced_version:
             # 检查点击的是否为遥控器
-            if self.remote.is_clicked(x, y):
+            if self.remote in hits:
                 self.tv.change_channel()
             
             # 检查其他交互对象
-            for obj in [self.tv, self.remote]:
-                if obj.is_clicked(x, y):
+            for obj in hits:
+                if obj is self.tv or obj is self.remote:
                     obj.on_click()
             return
         
         # 增强版处理特殊交互
         for obj, handler in self.special_interactions.items():
-            if obj.is_clicked(x, y):
+            if obj in hits:
                 handler(x, y)
                 return
         
         # 处理普通交互对象
-        for obj in self.game_objects:
-            if obj.is_clicked(x, y):
-                obj.on_click()
-                break
+        if hits:
+            hits[0].on_click()
     
     def _handle_remote(self, x, y):
         """处理遥控器交互"""
@@ -895,28 +1049,41 @@ class GameManager(arcade.Window):
         # 存储当前鼠标位置用于坐标显示
         self.mouse_x = x
         self.mouse_y = y
+        if self.show_coordinates:
+            self.redraw.mark_dirty()
         
         # 只在卧室状态处理鼠标悬停
         if self.current_state == self.STATE_BEDROOM:
-            self.hovered_item = None
-            for item in self.bedroom_items:
-                if hasattr(item, 'is_mouse_over') and item.is_mouse_over(x, y):
-                    self.hovered_item = item
-                    break
+            hovered = self.bedroom_index.first_at(x, y)
+            if hovered is not self.hovered_item:
+                if self.hovered_item is not None:
+                    self.hovered_item.is_hovered = False
+                if hovered is not None:
+                    hovered.is_hovered = True
+                self.hovered_item = hovered
+                self.redraw.mark_dirty()
     
     def on_key_press(self, key, modifiers):
         """键盘按键事件处理"""
+        self.redraw.mark_dirty()
+        
         # 按C键切换坐标系统显示
         if key == arcade.key.C:
             self.show_coordinates = not self.show_coordinates
-            print(f"坐标系统显示: {'开启' if self.show_coordinates else '关闭'}")
+            logger.debug("坐标系统显示: %s", "开启" if self.show_coordinates else "关闭")
+        
+        # 按P键开关帧阶段分析叠加层
+        if key == arcade.key.P:
+            self.profiler.toggle()
         
         # 按空格键跳过欢迎阶段
         if key == arcade.key.SPACE and self.current_state == self.STATE_BEDROOM and self.welcome_phase:
-            self.welcome_phase = False
+            self.skip_intro()
     
     def on_mouse_double_click(self, x, y, button, modifiers):
         """鼠标双击事件处理"""
+        self.redraw.mark_dirty()
+        
         # 只在卧室状态处理双击
         if self.current_state == self.STATE_BEDROOM:
             # 检查是否双击了作业本
@@ -932,16 +1099,25 @@ class GameManager(arcade.Window):
         参数:
             time_state (str): 当前时间状态，"day"或"night"
         """
-        if hasattr(self, 'has_bedroom_bg') and self.has_bedroom_bg:
-            if time_state == "day":
-                self.current_bg = self.bedroom_bg_day
-                # 设置游戏时间为早上10点
-                current_date = self.game_time.date()
-                self.game_time = datetime.datetime.combine(current_date, datetime.time(10, 0))
-                print(f"背景切换为白天，时间设为: {self.game_time.strftime('%H:%M')}")
-            else:
-                self.current_bg = self.bedroom_bg_night
-                # 设置游戏时间为晚上21点
-                current_date = self.game_time.date()
-                self.game_time = datetime.datetime.combine(current_date, datetime.time(21, 0))
-                print(f"背景切换为夜晚，时间设为: {self.game_time.strftime('%H:%M')}") 
\ No newline at end of file
+        current_date = self.game_time.date()
+        if time_state == "day":
+            # 设置游戏时间为早上10点
+            self.game_time = datetime.datetime.combine(current_date, datetime.time(10, 0))
+            logger.info("背景切换为白天，时间设为: %s", self.game_time.strftime("%H:%M"))
+        else:
+            # 设置游戏时间为晚上21点
+            self.game_time = datetime.datetime.combine(current_date, datetime.time(21, 0))
+            logger.info("背景切换为夜晚，时间设为: %s", self.game_time.strftime("%H:%M"))
+        self.update_background_by_time()
+
+
+def main():
+    """主函数 - 创建游戏管理器窗口并运行游戏"""
+    setup_logging()
+    GameManager(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    # 字形在空闲时间片中预热，避免第一次显示新文字时卡顿
+    start_glyph_warmup()
+    arcade.run()
+
+if __name__ == "__main__":
+    main()
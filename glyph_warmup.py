@@ -0,0 +1,435 @@
+"""
+字形预热
+
+界面文字全是中文，每个新字第一次出现时(开场白、物品消息、标签、操作说明)
+pyglet都要在帧中途光栅化字形并上传到字体图集，造成明显的卡顿。
+这里在启动时用AST扫描各场景模块，收集所有可能显示的字符串常量(跳过文档字符串和日志消息)，
+以及draw_cached_text/draw_text/arcade.Text调用中出现的字号和粗细，
+然后在空闲时间片里按时间预算调用pyglet字体的get_glyphs，把这些字形提前放进图集。
+扫描结果按模块缓存在resources/.cache/下(以文件修改时间和大小为键)，启动时只需读缓存；
+缓存失效的模块也在空闲时间片里逐个重新扫描，不占用第一帧之前的时间。
+
+文字缓存每创建一个新文字对象都会通知预热器，其中还没有预热过的字记为运行时未命中，
+report()按字体列出预热字数和未命中的字，据此补充遗漏的字符串来源。
+"""
+import ast
+import atexit
+import json
+import os
+import time
+
+import arcade
+import pyglet
+
+from log_utils import get_logger
+from text_cache import DEFAULT_FONT_NAME, get_text_cache
+
+logger = get_logger(__name__)
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCAN_CACHE_PATH = os.path.join(SOURCE_DIR, "resources", ".cache", "glyph_scan.json")
+
+# 会显示文字的模块
+SOURCE_MODULES = (
+    "main.py", "login_view.py", "bedroom_view.py", "game_manager.py", "bedroom_items.py",
+    "interactive_room_game.py", "living_room_scene.py", "enhanced_game.py",
+    "extensions.py", "room_view.py", "debug_tools.py", "scene_registry.py",
+)
+
+# 绘制文字的函数和界面控件，以及字号所在的位置参数序号(None表示只能用关键字传入)
+_TEXT_CALLS = {
+    "draw_cached_text": 4, "draw_text": 4, "Text": 4,
+    "UILabel": None, "UIFlatButton": None, "UIInputText": None,
+}
+
+# 与arcade.draw_text一致的默认字号
+DEFAULT_FONT_SIZE = 12
+
+# 每次调用get_glyphs处理的字数
+CHUNK_SIZE = 16
+
+# 每个空闲时间片最多占用的时间(秒)，至少处理一批
+DEFAULT_SLICE_BUDGET = 0.003
+
+
+def _call_name(node):
+    func = node.func
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    if isinstance(func, ast.Name):
+        return func.id
+    return None
+
+
+def _constant(node, default=None):
+    return node.value if isinstance(node, ast.Constant) else default
+
+
+def _skipped_nodes(tree):
+    """不会显示的字符串: 文档字符串和日志调用里的消息"""
+    skipped = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(_constant(body[0].value), str):
+                skipped.add(id(body[0].value))
+        elif isinstance(node, ast.Call):
+            func = node.func
+            if (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)
+                    and func.value.id == "logger"):
+                skipped.update(id(child) for child in ast.walk(node))
+    return skipped
+
+
+def scan_source(source):
+    """
+    扫描一段源码
+
+    参数:
+        source (str): Python源码
+
+    返回:
+        tuple: (字符串常量集合, 字体集合)，字体为(字体名, 字号, 粗体, 斜体)
+    """
+    tree = ast.parse(source)
+    skipped = _skipped_nodes(tree)
+    strings = set()
+    fonts = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            if id(node) not in skipped:
+                strings.add(node.value)
+        elif isinstance(node, ast.Call) and _call_name(node) in _TEXT_CALLS:
+            keywords = {keyword.arg: keyword.value for keyword in node.keywords}
+            size_node = keywords.get("font_size")
+            index = _TEXT_CALLS[_call_name(node)]
+            if size_node is None and index is not None and len(node.args) > index:
+                size_node = node.args[index]
+            font_size = DEFAULT_FONT_SIZE if size_node is None else _constant(size_node)
+            if not isinstance(font_size, (int, float)):
+                continue
+            font_name = _constant(keywords.get("font_name"), DEFAULT_FONT_NAME)
+            bold = bool(_constant(keywords.get("bold"), False))
+            italic = bool(_constant(keywords.get("italic"), False))
+            fonts.add((font_name, font_size, bold, italic))
+    return strings, fonts
+
+
+def scan_modules(modules=SOURCE_MODULES, source_dir=SOURCE_DIR):
+    """
+    扫描多个模块
+
+    返回:
+        tuple: (字符串常量集合, 字体集合)
+    """
+    strings = set()
+    fonts = set()
+    for name in modules:
+        path = os.path.join(source_dir, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                module_strings, module_fonts = scan_source(f.read())
+        except (OSError, SyntaxError) as e:
+            logger.warning("扫描文字失败: %s: %s", name, e)
+            continue
+        strings |= module_strings
+        fonts |= module_fonts
+    return strings, fonts
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _font_from_json(font):
+    font_name, font_size, bold, italic = font
+    if isinstance(font_name, list):
+        font_name = tuple(font_name)
+    return font_name, font_size, bold, italic
+
+
+class ScanCache:
+    """按模块缓存的扫描结果，源文件的修改时间或大小变化后失效"""
+
+    def __init__(self, path=SCAN_CACHE_PATH, source_dir=SOURCE_DIR):
+        self.path = path
+        self.source_dir = source_dir
+        self._entries = None
+        self._changed = False
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, name):
+        """
+        返回模块的缓存结果
+
+        返回:
+            tuple: (字符串常量集合, 字体集合)，没有缓存或已失效时为None
+        """
+        entry = self._load().get(name)
+        try:
+            if entry is None or entry["key"] != _file_key(os.path.join(self.source_dir, name)):
+                return None
+        except OSError:
+            return None
+        return set(entry["strings"]), {_font_from_json(font) for font in entry["fonts"]}
+
+    def scan(self, name):
+        """
+        扫描一个模块并更新缓存
+
+        返回:
+            tuple: (字符串常量集合, 字体集合)，模块无法读取或解析时为两个空集合
+        """
+        path = os.path.join(self.source_dir, name)
+        try:
+            key = _file_key(path)
+            with open(path, encoding="utf-8") as f:
+                strings, fonts = scan_source(f.read())
+        except (OSError, SyntaxError) as e:
+            logger.warning("扫描文字失败: %s: %s", name, e)
+            return set(), set()
+        self._load()[name] = {"key": key, "strings": sorted(strings),
+                              "fonts": sorted(fonts, key=_font_order)}
+        self._changed = True
+        return strings, fonts
+
+    def save(self):
+        """有新的扫描结果时写回缓存文件"""
+        if not self._changed:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            self._changed = False
+        except OSError as e:
+            logger.warning("写入字形扫描缓存失败: %s", e)
+
+
+def glyph_set(strings):
+    """
+    需要预热的字符: ASCII可打印字符加上字符串中出现的其他可打印字符
+
+    返回:
+        str: 排好序的字符
+    """
+    chars = {chr(code) for code in range(32, 127)}
+    for text in strings:
+        chars.update(ch for ch in text if ch.isprintable())
+    return "".join(sorted(chars))
+
+
+def _font_order(font):
+    font_name, font_size, bold, italic = font
+    return font_size, bold, italic, str(font_name)
+
+
+def _font_label(font):
+    font_name, font_size, bold, italic = font
+    name = font_name if isinstance(font_name, str) else "/".join(font_name)
+    style = ("粗" if bold else "") + ("斜" if italic else "")
+    return f"{name} {font_size:g}{' ' + style if style else ''}"
+
+
+class GlyphWarmup:
+    """按字体预热字形并统计运行时未命中"""
+
+    def __init__(self, strings=None, fonts=None, slice_budget=DEFAULT_SLICE_BUDGET,
+                 scan_cache=None):
+        """
+        参数:
+            strings (iterable): 要预热的字符串，默认扫描SOURCE_MODULES
+            fonts (iterable): (字体名, 字号, 粗体, 斜体)，默认扫描SOURCE_MODULES
+            slice_budget (float): 每个空闲时间片的时间预算(秒)
+            scan_cache (ScanCache): 扫描结果缓存，默认使用resources/.cache/下的缓存文件
+        """
+        self.slice_budget = slice_budget
+        self._strings = set() if strings is None else set(strings)
+        self._fonts = set() if fonts is None else set(fonts)
+        # 还需要扫描的模块: 有缓存的直接取缓存，其余留到warm()里逐个扫描
+        self._pending_modules = []
+        self._scan_cache = None
+        if strings is None or fonts is None:
+            self._scan_cache = scan_cache or ScanCache()
+            for name in SOURCE_MODULES:
+                cached = self._scan_cache.get(name)
+                if cached is None:
+                    self._pending_modules.append(name)
+                else:
+                    self._add_scanned(*cached, strings is None, fonts is None)
+        self._scan_strings = strings is None
+        self._scan_fonts = fonts is None
+
+        self.glyphs = ""
+        self.fonts = []
+        # 字体 -> 已预热(或已在运行时出现过)的字符
+        self.warmed = {}
+        # 字体 -> 运行时才第一次出现的字符
+        self.misses = {}
+        # 持有字体对象，pyglet的字体缓存是弱引用，字体被回收后图集也会丢失
+        self._font_objects = {}
+        # 待处理位置: (字体序号, 字符偏移)
+        self._font_index = 0
+        self._offset = 0
+        self._scheduled = False
+        self.elapsed = 0.0
+        if not self._pending_modules:
+            self._finish_scan()
+
+    @property
+    def scanning(self):
+        """是否还有模块没有扫描(扫描完才开始预热)"""
+        return bool(self._pending_modules)
+
+    @property
+    def done(self):
+        return not self.scanning and self._font_index >= len(self.fonts)
+
+    def _add_scanned(self, strings, fonts, add_strings=True, add_fonts=True):
+        if add_strings:
+            self._strings |= strings
+        if add_fonts:
+            self._fonts |= fonts
+
+    def _scan_next(self):
+        """扫描下一个缓存失效的模块，全部扫描完后确定要预热的字和字体"""
+        name = self._pending_modules.pop(0)
+        self._add_scanned(*self._scan_cache.scan(name), self._scan_strings, self._scan_fonts)
+        if not self._pending_modules:
+            self._scan_cache.save()
+            self._finish_scan()
+
+    def _finish_scan(self):
+        self.glyphs = glyph_set(self._strings)
+        # 字号小的先预热，界面正文多为小字
+        self.fonts = sorted(self._fonts, key=_font_order)
+        for font in self.fonts:
+            self.warmed.setdefault(font, set())
+
+    def install(self):
+        """让文字缓存在创建新文字对象时通知预热器"""
+        get_text_cache().on_miss = self.record_text
+
+    def start(self):
+        """在空闲时间片中逐步预热(每帧一次，直到完成)"""
+        self.install()
+        if not self._scheduled and not self.done:
+            self._scheduled = True
+            arcade.schedule(self._tick, 1 / 60)
+
+    def _tick(self, delta_time):
+        self.warm(self.slice_budget)
+        if self.done:
+            arcade.unschedule(self._tick)
+            self._scheduled = False
+            logger.info("字形预热完成: %d种字体，每种%d个字，用时%.2f秒",
+                        len(self.fonts), len(self.glyphs), self.elapsed)
+
+    def _load_font(self, font):
+        font_object = self._font_objects.get(font)
+        if font_object is None:
+            font_name, font_size, bold, italic = font
+            font_object = pyglet.font.load(font_name, font_size, bold=bold, italic=italic)
+            self._font_objects[font] = font_object
+        return font_object
+
+    def warm(self, budget=None):
+        """
+        预热一部分字形
+
+        参数:
+            budget (float): 时间预算(秒)，None表示一次全部完成(加载阶段使用)
+
+        返回:
+            bool: 是否已全部完成
+        """
+        start = time.perf_counter()
+        processed = False
+        while not self.done:
+            if processed and budget is not None and time.perf_counter() - start >= budget:
+                break
+            processed = True
+            if self.scanning:
+                # 一个模块解析一次，大模块会略超出时间片预算
+                self._scan_next()
+                continue
+            font = self.fonts[self._font_index]
+            chunk = self.glyphs[self._offset:self._offset + CHUNK_SIZE]
+            self._load_font(font).get_glyphs(chunk)
+            self.warmed[font].update(chunk)
+            self._offset += CHUNK_SIZE
+            if self._offset >= len(self.glyphs):
+                self._font_index += 1
+                self._offset = 0
+        self.elapsed += time.perf_counter() - start
+        return self.done
+
+    def record_text(self, text, font_name, font_size, bold, italic):
+        """文字缓存创建新文字对象时调用，记录还没有预热过的字"""
+        font = (font_name, font_size, bool(bold), bool(italic))
+        warmed = self.warmed.setdefault(font, set())
+        new = {ch for ch in text if ch.isprintable() and ch not in warmed}
+        if not new:
+            return
+        self.misses.setdefault(font, set()).update(new)
+        warmed.update(new)
+        logger.debug("字形未命中 %s: %s", _font_label(font), "".join(sorted(new)))
+
+    def report(self):
+        """
+        每种字体的预热覆盖情况
+
+        返回:
+            dict: 字体描述 -> {"warmed": 预热的字数, "misses": 运行时未命中的字数, "missing": 未命中的字}
+        """
+        result = {}
+        for font in sorted(set(self.warmed) | set(self.misses), key=_font_order):
+            missing = self.misses.get(font, set())
+            result[_font_label(font)] = {
+                "warmed": len(self.warmed.get(font, ())) - len(missing),
+                "misses": len(missing),
+                "missing": "".join(sorted(missing)),
+            }
+        return result
+
+    def log_report(self):
+        """把有运行时未命中的字体写进日志"""
+        for font, entry in self.report().items():
+            if entry["misses"]:
+                logger.info("字形覆盖 %s: 预热%d个字，运行时未命中%d个: %s",
+                            font, entry["warmed"], entry["misses"], entry["missing"])
+
+
+# 全局共享的字形预热器，首次使用时读取扫描缓存
+_default_warmup = None
+# 退出时的覆盖报告只注册一次
+_report_registered = False
+
+
+def get_glyph_warmup():
+    """返回全局共享的字形预热器"""
+    global _default_warmup
+    if _default_warmup is None:
+        _default_warmup = GlyphWarmup()
+    return _default_warmup
+
+
+def start_glyph_warmup():
+    """在空闲时间片中扫描源码(缓存失效时)并预热字形(窗口创建之后调用)"""
+    global _report_registered
+    warmup = get_glyph_warmup()
+    warmup.start()
+    if not _report_registered:
+        # 退出时(在日志停止之前)输出覆盖报告
+        atexit.register(warmup.log_report)
+        _report_registered = True
+    return warmup
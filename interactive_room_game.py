@@ -1,5 +1,9 @@
 import arcade
 import os
+from shape_cache import ShapeCache, create_circle_filled
+from redraw import RedrawScheduler
+from texture_manager import get_texture_manager
+import circle_batch
 
 # 常量定义
 SCREEN_WIDTH = 1024
@@ -20,18 +24,37 @@ class InteractiveObject:
         self.color = color or arcade.color.BLUE
         self.is_active = False
         
+        # 静态图元缓存
+        self._shape_cache = ShapeCache()
+        
+        # 所属的空间索引(由SpatialIndex.insert设置)
+        self.spatial_index = None
+        
+        # 所属的重绘调度器(由RedrawScheduler.track设置)
+        self.redraw_scheduler = None
+        
+        # 纹理在后台加载，加载完成前使用颜色绘制
         if texture_path and os.path.exists(texture_path):
-            self.texture = arcade.load_texture(texture_path)
+            self.texture = get_texture_manager().acquire(texture_path, owner=self)
+            self.texture.add_ready_callback(lambda handle: self.mark_dirty())
+    
+    def geometry_key(self):
+        """静态图元的缓存键，位置、尺寸或颜色变化时缓存失效"""
+        return (self.x, self.y, self.width, self.height, self.color)
+    
+    def draw_static_shapes(self, build):
+        """绘制缓存的静态图元，build负责向ShapeElementList中添加图元"""
+        self._shape_cache.draw(self.geometry_key(), build)
     
     def draw(self):
         """绘制对象"""
-        if self.texture:
+        if self.texture and self.texture.ready:
             arcade.draw_texture_rectangle(
                 center_x=self.x,
                 center_y=self.y,
                 width=self.width,
                 height=self.height,
-                texture=self.texture
+                texture=self.texture.texture
             )
         else:
             # 如果没有纹理，使用颜色绘制
@@ -40,6 +63,29 @@ class InteractiveObject:
                 color=self.color
             )
     
+    def move_to(self, x, y):
+        """移动对象，并同步更新所属的空间索引"""
+        self.x = x
+        self.y = y
+        if self.spatial_index is not None:
+            self.spatial_index.update(self)
+        self.mark_dirty()
+    
+    def retain_texture(self):
+        """重新持有纹理引用(所在场景显示时调用)"""
+        if self.texture is not None:
+            get_texture_manager().retain(self.texture, owner=self)
+    
+    def release_texture(self):
+        """释放纹理引用(所在场景隐藏时调用)，纹理可以被淘汰，下次绘制时自动重新加载"""
+        if self.texture is not None:
+            get_texture_manager().release(self, self.texture)
+    
+    def mark_dirty(self):
+        """通知所属的重绘调度器画面需要重绘"""
+        if self.redraw_scheduler is not None:
+            self.redraw_scheduler.mark_dirty()
+    
     def is_clicked(self, x, y):
         """检查是否被点击"""
         return (self.x - self.width/2 <= x <= self.x + self.width/2 and
@@ -48,6 +94,7 @@ class InteractiveObject:
     def on_click(self):
         """点击事件处理"""
         self.is_active = not self.is_active
+        self.mark_dirty()
         return self.is_active
 
 class Television(InteractiveObject):
@@ -74,7 +121,7 @@ class Television(InteractiveObject):
         
         # 绘制开关按钮
         button_color = arcade.color.RED if self.is_active else arcade.color.GRAY
-        arcade.draw_circle_filled(
+        circle_batch.draw_circle_filled(
             center_x=self.x + self.width/2 - 15, 
             center_y=self.y - self.height/2 + 15, 
             radius=10, color=button_color
@@ -93,6 +140,7 @@ class Television(InteractiveObject):
         """切换频道"""
         if self.is_active:
             self.channel = (self.channel + 1) % len(self.channels)
+            self.mark_dirty()
 
 class RemoteControl(InteractiveObject):
     """遥控器类"""
@@ -100,26 +148,31 @@ class RemoteControl(InteractiveObject):
         super().__init__(x, y, 50, 100, color=arcade.color.GRAY)
     
     def draw(self):
-        # 绘制遥控器主体
-        arcade.draw_rectangle_filled(
+        # 遥控器没有动态部分，整体使用缓存图元
+        self.draw_static_shapes(self.build_static_shapes)
+    
+    def build_static_shapes(self, shapes):
+        """构建遥控器的静态图元"""
+        # 遥控器主体
+        shapes.append(arcade.create_rectangle_filled(
             self.x, self.y, self.width, self.height, 
-            color=self.color
-        )
+            self.color
+        ))
         
-        # 绘制遥控器按钮
+        # 遥控器按钮
         button_colors = [arcade.color.RED, arcade.color.GREEN, arcade.color.BLUE]
         for i in range(3):
-            arcade.draw_circle_filled(
-                center_x=self.x, 
-                center_y=self.y + 30 - i*25, 
-                radius=10, color=button_colors[i]
-            )
+            shapes.append(create_circle_filled(
+                self.x, self.y + 30 - i*25, 10, button_colors[i]
+            ))
 
-class ChildhoodRoom(arcade.Window):
-    """主游戏窗口"""
-    def __init__(self, width, height, title):
-        super().__init__(width, height, title)
-        arcade.set_background_color(arcade.color.BEIGE)
+class ChildhoodRoom(arcade.View):
+    """童年房间场景视图"""
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        super().__init__()
+        
+        # 按Esc键返回的视图(通常是场景选择)
+        self.back_view = None
         
         # 创建资源目录
         os.makedirs(RESOURCES_DIR, exist_ok=True)
@@ -133,9 +186,31 @@ class ChildhoodRoom(arcade.Window):
         
         self.interactive_objects.append(self.tv)
         self.interactive_objects.append(self.remote)
+        
+        # 画面没有变化时复用上一帧
+        self.redraw = RedrawScheduler(self.window)
+        for obj in self.interactive_objects:
+            self.redraw.track(obj)
+    
+    def on_show_view(self):
+        """显示视图时调用"""
+        arcade.set_background_color(arcade.color.BEIGE)
+        self.window.set_caption(SCREEN_TITLE)
+        for obj in self.interactive_objects:
+            obj.retain_texture()
+        self.redraw.mark_dirty()
+    
+    def on_hide_view(self):
+        """隐藏视图时调用，释放纹理引用"""
+        for obj in self.interactive_objects:
+            obj.release_texture()
     
     def on_draw(self):
         """渲染游戏画面"""
+        self.redraw.draw(self.draw_scene)
+    
+    def draw_scene(self):
+        """绘制完整场景"""
         arcade.start_render()
         
         # 绘制背景和墙壁
@@ -170,6 +245,12 @@ class ChildhoodRoom(arcade.Window):
         for obj in self.interactive_objects:
             if obj.is_clicked(x, y):
                 obj.on_click()
+    
+    def on_key_press(self, key, modifiers):
+        """键盘按键事件处理"""
+        # 按Esc键返回场景选择
+        if key == arcade.key.ESCAPE and self.back_view is not None:
+            self.window.show_view(self.back_view)
 
 def main():
     """主函数 - 仅用于单独运行该文件时"""
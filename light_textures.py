@@ -0,0 +1,76 @@
+"""
+预烘焙的径向渐变光照纹理
+
+按(半径档位, 颜色)生成一次平滑衰减的径向渐变纹理并缓存，
+光效只需要用一个着色的精灵绘制，不必每帧画多层圆来模拟衰减。
+"""
+import math
+
+import arcade
+from PIL import Image
+
+# 半径按档位取整，避免每个略有不同的半径都生成一张纹理
+RADIUS_BUCKET = 16
+
+_texture_cache = {}
+
+
+def bucket_radius(radius):
+    """把半径向上取整到所在档位"""
+    return max(RADIUS_BUCKET, int(math.ceil(radius / RADIUS_BUCKET)) * RADIUS_BUCKET)
+
+
+def _falloff(distance):
+    """
+    径向衰减曲线
+
+    参数:
+        distance (float): 到中心的距离与半径之比，0为中心，1为边缘
+
+    返回:
+        float: 0~1之间的亮度
+    """
+    if distance >= 1.0:
+        return 0.0
+    return (1.0 - distance * distance) ** 2
+
+
+def _make_radial_texture(radius, color):
+    """生成指定半径和颜色的径向渐变纹理"""
+    size = radius * 2
+
+    # radial_gradient生成256x256的灰度图，像素值为到中心的距离(边缘约为255)
+    gradient = Image.radial_gradient("L")
+    alpha = gradient.point(lambda v: int(255 * _falloff(v / 255.0)))
+    alpha = alpha.resize((size, size), Image.BILINEAR)
+
+    image = Image.new("RGBA", (size, size), tuple(color[:3]) + (0,))
+    image.putalpha(alpha)
+
+    name = f"light-{radius}-{color[0]}-{color[1]}-{color[2]}"
+    return arcade.Texture(name, image=image)
+
+
+def get_light_texture(radius, color=arcade.color.WHITE):
+    """
+    获取径向渐变光照纹理
+
+    参数:
+        radius (float): 光照半径
+        color (tuple): 纹理颜色，白色纹理可以在绘制时再着色
+
+    返回:
+        arcade.Texture: 边长为档位半径两倍的纹理
+    """
+    bucket = bucket_radius(radius)
+    key = (bucket, tuple(color[:3]))
+    texture = _texture_cache.get(key)
+    if texture is None:
+        texture = _make_radial_texture(bucket, color)
+        _texture_cache[key] = texture
+    return texture
+
+
+def clear_cache():
+    """清空纹理缓存"""
+    _texture_cache.clear()
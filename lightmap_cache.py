@@ -0,0 +1,133 @@
+"""
+按灯光开关组合缓存的光照贴图
+
+客厅里的灯由几个开关控制，房间本身是静态的，灯光稳定后的画面只有有限几种组合。
+每种组合第一次稳定时把场景基础+阴影烘焙成一张不透明贴图，把所有光晕烘焙成光晕层，
+键是灯光的开/关位掩码；之后灯光稳定时直接绘制这些贴图，
+只有亮度渐变或闪烁时才逐灯实时渲染。投射阴影的物体移动后全部烘焙失效。
+
+透明度混合的光晕不能存成一张预乘透明度贴图: arcade的blend_func只设置前两个混合因子，
+透明度通道也按SRC_ALPHA混合，结果是透明度的平方，合成后光晕发白。
+这里只用两因子的混合，把光晕层拆成两张:
+    颜色: 从黑色开始按普通透明度混合逐层画，得到所有光晕叠在黑色上的颜色C
+    透过率: 从白色开始每画一层乘以(1 - 透明度)，得到下方画面仍然可见的比例T
+合成时先把画面乘以T，再加上C，与逐层直接画在画面上的结果相同。
+加法模式(光照缓冲)的光晕本来就只是相加，存一张累积贴图即可。
+"""
+from collections import OrderedDict
+
+from render_target import RenderTarget, window_samples
+
+
+class Lightmap:
+    """一种灯光组合的烘焙结果"""
+
+    def __init__(self, base, glow, transmittance=None):
+        # 场景基础和阴影(不透明)
+        self.base = base
+        # 光晕颜色；加法模式下是光照累积
+        self.glow = glow
+        # 光晕层下方画面的透过率，加法模式为None
+        self.transmittance = transmittance
+
+    def draw_base(self):
+        self.base.draw(blend=RenderTarget.BLEND_REPLACE)
+
+    def draw_glow(self):
+        """把光晕层合成到当前画面上"""
+        if self.transmittance is not None:
+            self.transmittance.draw(blend=RenderTarget.BLEND_MULTIPLY)
+        self.glow.draw(blend=RenderTarget.BLEND_ADD)
+
+
+class LightmapCache:
+    """按灯光位掩码缓存烘焙贴图，超出数量时淘汰最久未用的"""
+
+    def __init__(self, width, height, max_entries=8):
+        """
+        参数:
+            width (int): 贴图宽度(屏幕坐标)
+            height (int): 贴图高度(屏幕坐标)
+            max_entries (int): 最多缓存多少种组合(每种两到三张全屏贴图)
+        """
+        self.width = width
+        self.height = height
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._layout_key = None
+        # 统计: 烘焙次数、命中次数和因物体移动失效的次数
+        self.bakes = 0
+        self.hits = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """丢弃所有烘焙结果"""
+        self._entries.clear()
+
+    def check_layout(self, layout_key):
+        """
+        投射阴影的物体布局变化时丢弃所有烘焙结果
+
+        参数:
+            layout_key: 物体位置尺寸组成的可比较值
+        """
+        if layout_key != self._layout_key:
+            if self._layout_key is not None and self._entries:
+                self.invalidations += 1
+            self._layout_key = layout_key
+            self._entries.clear()
+
+    def get(self, key, render_base, render_glow, additive=False, glow_scale=1.0):
+        """
+        取得一种灯光组合的烘焙结果，没有时立即烘焙
+
+        参数:
+            key: 灯光位掩码(以及其他影响画面的开关)
+            render_base (callable): 绘制场景基础和阴影
+            render_glow (callable): 绘制所有光晕，参数是绘制光晕时使用的混合函数，
+                光晕内的所有图元都必须按当前混合函数绘制
+            additive (bool): 光晕按加法累积(与光照缓冲模式一致)，否则按透明度混合
+            glow_scale (float): 加法模式下光晕贴图的分辨率缩放，与光照缓冲一致
+
+        返回:
+            Lightmap: 烘焙结果
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        # 与窗口相同的多重采样，阴影和灯具的边缘与直接绘制一致
+        samples = window_samples()
+        base = RenderTarget(self.width, self.height, samples=samples)
+        with base.activate():
+            base.clear()
+            render_base()
+
+        if additive:
+            # 光照缓冲本身没有多重采样
+            glow = RenderTarget(self.width, self.height, scale=glow_scale)
+            with glow.activate(blend=RenderTarget.BLEND_ADDITIVE):
+                glow.clear()
+                render_glow(glow.blend_function(RenderTarget.BLEND_ADDITIVE))
+            transmittance = None
+        else:
+            glow = RenderTarget(self.width, self.height, samples=samples)
+            with glow.activate(blend=RenderTarget.BLEND_ALPHA):
+                glow.clear((0, 0, 0, 255))
+                render_glow(glow.blend_function(RenderTarget.BLEND_ALPHA))
+            transmittance = RenderTarget(self.width, self.height, samples=samples)
+            with transmittance.activate(blend=RenderTarget.BLEND_TRANSMIT):
+                transmittance.clear((255, 255, 255, 255))
+                render_glow(transmittance.blend_function(RenderTarget.BLEND_TRANSMIT))
+
+        entry = Lightmap(base, glow, transmittance)
+        self._entries[key] = entry
+        self.bakes += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
@@ -2,7 +2,22 @@ import arcade
 import os
 import math
 import random
+import time
 from interactive_room_game import InteractiveObject, Television, RemoteControl
+from shape_cache import create_circle_filled
+import circle_batch
+from text_cache import draw_cached_text
+from render_target import RenderTarget
+from lightmap_cache import LightmapCache
+from quality_governor import QualityGovernor, QUALITY_LEVELS
+from log_utils import setup_logging
+from glyph_warmup import start_glyph_warmup
+from light_textures import get_light_texture
+from spatial_index import SpatialIndex
+from redraw import RedrawScheduler
+from debug_tools import get_frame_profiler
+from sim_clock import SimulationClock
+from tween import TweenScheduler, ease_out_cubic, linear
 
 # 常量定义
 SCREEN_WIDTH = 1024
@@ -21,37 +36,81 @@ class LightEffect:
         self.intensity = intensity
         self.color = color
         self.flicker_count = 0
+        # 当前的闪烁系数，由update_flicker()更新，绘制时只读取
+        self.flicker_factor = 1.0
+        # 使用预烘焙的径向渐变纹理，首次绘制时创建精灵
+        self.sprite = None
+        self.sprite_radius = None
+    
+    def _ensure_sprite(self):
+        """半径变化或首次绘制时重建光晕精灵"""
+        if self.sprite is None or self.sprite_radius != self.radius:
+            texture = get_light_texture(self.radius)
+            self.sprite = arcade.Sprite(texture=texture, scale=self.radius * 2 / texture.width)
+            self.sprite_radius = self.radius
         
-    def draw(self, alpha=1.0, flicker=False):
-        """绘制光照效果"""
-        if flicker and random.random() > 0.95:
+    def update_flicker(self):
+        """
+        随机更新闪烁系数
+        
+        返回:
+            bool: 闪烁系数是否发生变化
+        """
+        previous = self.flicker_factor
+        if random.random() > 0.95:
             # 随机闪烁效果
-            alpha *= random.uniform(0.85, 1.0)
-            
-        # 绘制多层渐变光晕，使用更低的透明度和更少的图层
-        for i in range(3):  # 进一步减少图层数量
-            radius = self.radius * (1 - i/3)
-            alpha_i = alpha * (1 - i/3) * self.intensity * 0.35  # 进一步降低整体透明度
-            
-            # 将alpha值裁剪到合理范围内
-            alpha_i = min(max(alpha_i, 0), 1)
-            
-            light_color = list(self.color)
-            light_color[3] = int(255 * alpha_i)
-            
-            arcade.draw_circle_filled(
-                self.x, self.y, radius, light_color
-            )
+            self.flicker_factor = random.uniform(0.85, 1.0)
+        else:
+            self.flicker_factor = 1.0
+        return self.flicker_factor != previous
+    
+    def draw(self, alpha=1.0, blend_function=None):
+        """绘制光照效果"""
+        alpha *= self.flicker_factor
+        
+        # 整体透明度，接近原先三层叠加光晕中心的亮度
+        alpha = min(max(alpha * self.intensity * 0.7, 0), 1)
+        if alpha <= 0:
+            return
+        
+        self._ensure_sprite()
+        self.sprite.center_x = self.x
+        self.sprite.center_y = self.y
+        self.sprite.color = tuple(self.color[:3])
+        self.sprite.alpha = int(255 * alpha)
+        self.sprite.draw(blend_function=blend_function)
 
 class Shadow:
     """阴影类"""
+    # 亮度量化档位，每个档位缓存一份图元
+    BRIGHTNESS_LEVELS = 8
+    
     def __init__(self, obj, light_source):
         self.obj = obj
         self.light_source = light_source
         self.shadow_color = (0, 0, 0, 60)  # 更透明的阴影
+        
+        # 缓存的阴影几何，物体或光源的位置尺寸变化时失效
+        self._geometry_key = None
+        self.shadow_points = None
+        self.secondary_shadow_points = None
+        self.shadow_intensity = 0.0
+        # 按(亮度档位, 是否含次级阴影)缓存的图元
+        self._shape_lists = {}
     
-    def draw(self):
-        """绘制阴影"""
+    def geometry_key(self):
+        """阴影几何的缓存键"""
+        obj = self.obj
+        light = self.light_source
+        return (obj.x, obj.y, obj.width, obj.height,
+                light.x, light.y, light.width, light.height)
+    
+    def _update_geometry(self):
+        """重新计算阴影多边形"""
+        self.shadow_points = None
+        self.secondary_shadow_points = None
+        self._shape_lists.clear()
+        
         # 计算物体到光源的方向
         dx = self.obj.x - self.light_source.x
         dy = self.obj.y - self.light_source.y
@@ -67,10 +126,7 @@ class Shadow:
         
         # 阴影长度和强度 - 近光源阴影短，远光源阴影长
         shadow_length = min(distance * 0.3, 120)  # 使阴影长度与距离关联
-        shadow_intensity = min(1.0, 150 / distance) * 0.4  # 降低阴影强度
-        
-        # 计算阴影点
-        shadow_points = []
+        self.shadow_intensity = min(1.0, 150 / distance) * 0.4  # 降低阴影强度
         
         # 物体底部中心点
         bottom_x = self.obj.x
@@ -84,10 +140,6 @@ class Shadow:
         shadow_dir_x = dx
         shadow_dir_y = min(dy, 0.1)  # 限制垂直投影，使阴影主要在水平方向延伸
         
-        # 添加物体底部边缘点
-        shadow_points.append((left_x, bottom_y))
-        shadow_points.append((right_x, bottom_y))
-        
         # 添加阴影投射点 - 使用平滑过渡
         offset_x = shadow_dir_x * shadow_length
         offset_y = shadow_dir_y * shadow_length
@@ -97,28 +149,66 @@ class Shadow:
         shadow_right = right_x + offset_x + (shadow_width_factor - 1) * self.obj.width/2
         shadow_left = left_x + offset_x - (shadow_width_factor - 1) * self.obj.width/2
         
-        shadow_points.append((shadow_right, bottom_y + offset_y))
-        shadow_points.append((shadow_left, bottom_y + offset_y))
-        
-        # 绘制阴影多边形 - 边缘平滑
-        shadow_color = (0, 0, 0, int(60 * shadow_intensity))  # 降低阴影透明度
-        arcade.draw_polygon_filled(shadow_points, shadow_color)
+        self.shadow_points = [
+            (left_x, bottom_y),
+            (right_x, bottom_y),
+            (shadow_right, bottom_y + offset_y),
+            (shadow_left, bottom_y + offset_y),
+        ]
         
-        # 绘制次级阴影 - 更淡更模糊的边缘效果
-        if shadow_intensity > 0.2:
-            secondary_shadow_points = []
+        # 次级阴影 - 更淡更模糊的边缘效果
+        if self.shadow_intensity > 0.2:
             secondary_offset_x = offset_x * 1.2
             secondary_offset_y = offset_y * 1.2
             secondary_shadow_right = shadow_right + (shadow_right - right_x) * 0.3
             secondary_shadow_left = shadow_left + (shadow_left - left_x) * 0.3
             
-            secondary_shadow_points.append((shadow_right, bottom_y + offset_y))
-            secondary_shadow_points.append((shadow_left, bottom_y + offset_y))
-            secondary_shadow_points.append((secondary_shadow_left, bottom_y + secondary_offset_y))
-            secondary_shadow_points.append((secondary_shadow_right, bottom_y + secondary_offset_y))
-            
-            secondary_shadow_color = (0, 0, 0, int(30 * shadow_intensity))
-            arcade.draw_polygon_filled(secondary_shadow_points, secondary_shadow_color)
+            self.secondary_shadow_points = [
+                (shadow_right, bottom_y + offset_y),
+                (shadow_left, bottom_y + offset_y),
+                (secondary_shadow_left, bottom_y + secondary_offset_y),
+                (secondary_shadow_right, bottom_y + secondary_offset_y),
+            ]
+    
+    def _build_shapes(self, level, secondary=True):
+        """构建某个亮度档位的阴影图元"""
+        scale = level / self.BRIGHTNESS_LEVELS
+        shapes = arcade.ShapeElementList()
+        
+        # 阴影多边形 - 边缘平滑
+        shadow_color = (0, 0, 0, int(60 * self.shadow_intensity * scale))  # 降低阴影透明度
+        shapes.append(arcade.create_polygon(self.shadow_points, shadow_color))
+        
+        if secondary and self.secondary_shadow_points is not None:
+            secondary_shadow_color = (0, 0, 0, int(30 * self.shadow_intensity * scale))
+            shapes.append(arcade.create_polygon(self.secondary_shadow_points, secondary_shadow_color))
+        return shapes
+    
+    def draw(self, brightness=1.0, secondary=True):
+        """
+        绘制阴影
+        
+        参数:
+            brightness (float): 光源当前亮度，阴影深浅随之缩放
+            secondary (bool): 是否绘制次级阴影
+        """
+        key = self.geometry_key()
+        if key != self._geometry_key:
+            self._update_geometry()
+            self._geometry_key = key
+        
+        if self.shadow_points is None:
+            return
+        
+        level = int(round(min(max(brightness, 0.0), 1.0) * self.BRIGHTNESS_LEVELS))
+        if level <= 0:
+            return
+        
+        shapes = self._shape_lists.get((level, secondary))
+        if shapes is None:
+            shapes = self._build_shapes(level, secondary)
+            self._shape_lists[(level, secondary)] = shapes
+        shapes.draw()
 
 class CeilingLamp(InteractiveObject):
     """吊灯类"""
@@ -131,54 +221,102 @@ class CeilingLamp(InteractiveObject):
         self.light_effect = LightEffect(x, y, radius=size*1.2, color=self.light_color+(50,))
         self.brightness = 0.0
         self.target_brightness = 0.0
-        self.transition_speed = 0.05
+        # 从全灭到全亮的渐变时间(秒)
+        self.transition_time = 1.2
         
-    def update(self):
-        """更新灯光状态"""
-        if self.is_active:
-            self.target_brightness = 1.0
+        # 所属的补间调度器(由TweenScheduler.track设置)，没有时亮度直接跳变
+        self.tween_scheduler = None
+        # 画质档位(由LightingRenderer.set_quality设置)
+        self.quality = QUALITY_LEVELS[0]
+    
+    def set_active(self, active):
+        """开关吊灯，亮度渐变到目标，亮着时随机闪烁"""
+        self.is_active = active
+        self.target_brightness = 1.0 if active else 0.0
+        if self.tween_scheduler is None:
+            self.brightness = self.target_brightness
         else:
-            self.target_brightness = 0.0
-            
-        # 平滑过渡灯光亮度
-        if abs(self.brightness - self.target_brightness) > 0.01:
-            self.brightness += (self.target_brightness - self.brightness) * self.transition_speed
-        
+            self.tween_scheduler.tween(
+                self, "brightness", self.target_brightness,
+                self.transition_time * abs(self.target_brightness - self.brightness),
+                easing=ease_out_cubic
+            )
+            if active:
+                self.tween_scheduler.animate((self, "flicker"), self.update_flicker)
+        self.mark_dirty()
+    
+    def update_flicker(self, delta_time):
+        """闪烁动画的一步，关灯后结束"""
+        if not self.is_active:
+            self.light_effect.flicker_factor = 1.0
+            return False
+        if not self.quality.flicker:
+            # 画质降档时停止闪烁，动画保留以便升档后恢复
+            if self.light_effect.flicker_factor != 1.0:
+                self.light_effect.flicker_factor = 1.0
+                self.mark_dirty()
+            return
+        if self.light_effect.update_flicker():
+            self.mark_dirty()
+    
+    def is_settled(self):
+        """亮度到达目标且没有在闪烁时，画面可以使用烘焙的光照贴图"""
+        return (self.brightness == self.target_brightness
+                and self.light_effect.flicker_factor == 1.0)
+    
+    def on_click(self):
+        """点击事件处理"""
+        self.set_active(not self.is_active)
+        return self.is_active
+    
     def draw(self, render_light=True):
         """绘制吊灯"""
-        # 绘制灯具
+        # 绘制灯具（灯罩和灯绳为静态图元）
+        self.draw_static_shapes(self.build_static_shapes)
+        
+        # 灯光开启时绘制发光部分
+        if self.brightness > 0:
+            # 灯泡和灯罩内的亮光一次画完
+            with circle_batch.circle_layer():
+                # 灯泡发光部分
+                bulb_color = list(self.light_color) + [int(255 * self.brightness)]
+                circle_batch.draw_circle_filled(
+                    self.x, self.y, self.size/3, 
+                    bulb_color
+                )
+                
+                # 绘制灯罩内的亮光
+                if self.quality.glow_layers:
+                    inner_glow_color = list(self.light_color) + [int(120 * self.brightness)]
+                    circle_batch.draw_circle_filled(
+                        self.x, self.y, self.size/2 - 5, 
+                        inner_glow_color
+                    )
+            
+            # 绘制光照效果（可选）
+            if render_light:
+                self.draw_light_effect()
+    
+    def draw_light_effect(self, blend_function=None):
+        """只绘制光照效果，不绘制灯具"""
+        if self.brightness > 0:
+            self.light_effect.draw(alpha=self.brightness * 0.7,
+                                   blend_function=blend_function)  # 降低亮度
+    
+    def build_static_shapes(self, shapes):
+        """构建吊灯的静态图元"""
         # 灯罩
-        arcade.draw_circle_filled(
+        shapes.append(create_circle_filled(
             self.x, self.y, self.size/2, 
             arcade.color.LIGHT_GRAY
-        )
+        ))
         
         # 灯绳
-        arcade.draw_line(
+        shapes.append(arcade.create_line(
             self.x, self.y + self.size/2,
             self.x, SCREEN_HEIGHT,
             arcade.color.BLACK, 3
-        )
-        
-        # 灯光开启时绘制发光部分
-        if self.brightness > 0:
-            # 灯泡发光部分
-            bulb_color = list(self.light_color) + [int(255 * self.brightness)]
-            arcade.draw_circle_filled(
-                self.x, self.y, self.size/3, 
-                bulb_color
-            )
-            
-            # 绘制灯罩内的亮光
-            inner_glow_color = list(self.light_color) + [int(120 * self.brightness)]
-            arcade.draw_circle_filled(
-                self.x, self.y, self.size/2 - 5, 
-                inner_glow_color
-            )
-            
-            # 绘制光照效果（可选）
-            if render_light:
-                self.light_effect.draw(alpha=self.brightness * 0.7, flicker=True)  # 降低亮度
+        ))
 
 class FloorLamp(InteractiveObject):
     """落地灯类"""
@@ -190,58 +328,90 @@ class FloorLamp(InteractiveObject):
         self.light_effect = LightEffect(x, y + height/2, radius=height*0.4, color=self.light_color+(50,))
         self.brightness = 0.0
         self.target_brightness = 0.0
-        self.transition_speed = 0.05
+        # 从全灭到全亮的渐变时间(秒)
+        self.transition_time = 1.2
         
-    def update(self):
-        """更新灯光状态"""
-        if self.is_active:
-            self.target_brightness = 1.0
+        # 所属的补间调度器(由TweenScheduler.track设置)，没有时亮度直接跳变
+        self.tween_scheduler = None
+        # 画质档位(由LightingRenderer.set_quality设置)
+        self.quality = QUALITY_LEVELS[0]
+    
+    def set_active(self, active):
+        """开关落地灯，亮度渐变到目标"""
+        self.is_active = active
+        self.target_brightness = 1.0 if active else 0.0
+        if self.tween_scheduler is None:
+            self.brightness = self.target_brightness
         else:
-            self.target_brightness = 0.0
-            
-        # 平滑过渡灯光亮度
-        if abs(self.brightness - self.target_brightness) > 0.01:
-            self.brightness += (self.target_brightness - self.brightness) * self.transition_speed
-        
+            self.tween_scheduler.tween(
+                self, "brightness", self.target_brightness,
+                self.transition_time * abs(self.target_brightness - self.brightness),
+                easing=ease_out_cubic
+            )
+        self.mark_dirty()
+    
+    def is_settled(self):
+        """亮度到达目标时，画面可以使用烘焙的光照贴图"""
+        return self.brightness == self.target_brightness
+    
+    def on_click(self):
+        """点击事件处理"""
+        self.set_active(not self.is_active)
+        return self.is_active
+    
     def draw(self, render_light=True):
         """绘制落地灯"""
-        # 绘制灯座
-        arcade.draw_rectangle_filled(
-            self.x, self.y - self.height/2 + 15, 60, 30, 
-            color=arcade.color.DARK_BROWN
-        )
-        
-        # 绘制灯杆
-        arcade.draw_rectangle_filled(
-            self.x, self.y - self.height/4, 10, self.height/2, 
-            color=arcade.color.DARK_BROWN
-        )
-        
-        # 绘制灯罩
-        arcade.draw_ellipse_filled(
-            self.x, self.y + self.height/4, 60, 80, 
-            color=arcade.color.BEIGE
-        )
+        # 绘制灯座、灯杆和灯罩（静态图元）
+        self.draw_static_shapes(self.build_static_shapes)
         
         # 灯光开启时绘制发光部分
         if self.brightness > 0:
-            # 灯泡发光部分
-            bulb_color = list(self.light_color) + [int(255 * self.brightness)]
-            arcade.draw_ellipse_filled(
-                self.x, self.y + self.height/4, 40, 60, 
-                bulb_color
-            )
-            
-            # 绘制灯罩内的亮光
-            inner_glow_color = list(self.light_color) + [int(120 * self.brightness)]
-            arcade.draw_ellipse_filled(
-                self.x, self.y + self.height/4, 55, 75, 
-                inner_glow_color
-            )
+            # 灯泡和灯罩内的亮光一次画完
+            with circle_batch.circle_layer():
+                # 灯泡发光部分
+                bulb_color = list(self.light_color) + [int(255 * self.brightness)]
+                circle_batch.draw_ellipse_filled(
+                    self.x, self.y + self.height/4, 40, 60, 
+                    bulb_color
+                )
+                
+                # 绘制灯罩内的亮光
+                if self.quality.glow_layers:
+                    inner_glow_color = list(self.light_color) + [int(120 * self.brightness)]
+                    circle_batch.draw_ellipse_filled(
+                        self.x, self.y + self.height/4, 55, 75, 
+                        inner_glow_color
+                    )
             
             # 绘制光照效果（可选）
             if render_light:
-                self.light_effect.draw(alpha=self.brightness * 0.7, flicker=False)  # 降低亮度
+                self.draw_light_effect()
+    
+    def draw_light_effect(self, blend_function=None):
+        """只绘制光照效果，不绘制灯具"""
+        if self.brightness > 0:
+            self.light_effect.draw(alpha=self.brightness * 0.7,
+                                   blend_function=blend_function)  # 降低亮度
+    
+    def build_static_shapes(self, shapes):
+        """构建落地灯的静态图元"""
+        # 灯座
+        shapes.append(arcade.create_rectangle_filled(
+            self.x, self.y - self.height/2 + 15, 60, 30, 
+            arcade.color.DARK_BROWN
+        ))
+        
+        # 灯杆
+        shapes.append(arcade.create_rectangle_filled(
+            self.x, self.y - self.height/4, 10, self.height/2, 
+            arcade.color.DARK_BROWN
+        ))
+        
+        # 灯罩
+        shapes.append(arcade.create_ellipse_filled(
+            self.x, self.y + self.height/4, 60, 80, 
+            arcade.color.BEIGE
+        ))
 
 class TVBacklight(InteractiveObject):
     """电视背光类"""
@@ -259,36 +429,51 @@ class TVBacklight(InteractiveObject):
             arcade.color.AQUA
         ]
         self.current_color_idx = 0
-        self.color_transition = 0.0
+        # 相邻两种颜色之间的渐变时间(秒)
+        self.color_time = 1.7
         # 继续减小电视背光范围
         self.light_effect = LightEffect(tv.x, tv.y, radius=tv.width*0.3, color=self.colors[0]+(30,))
         self.brightness = 0.0
         self.is_active = False
+        # 光效颜色一直在变化，不能烘焙进光照贴图，总是实时绘制
+        self.animated_glow = True
         
-    def update(self):
-        """更新电视背光效果"""
-        # 只有电视开启时才显示背光
-        if self.tv.is_active and self.is_active:
-            # 颜色渐变过渡
-            self.color_transition += 0.01
-            if self.color_transition >= 1.0:
-                self.color_transition = 0.0
-                self.current_color_idx = (self.current_color_idx + 1) % len(self.colors)
-                
-            self.brightness = 1.0
-        else:
-            self.brightness = 0.0
-            
-        # 更新光照效果颜色
-        current_color = self.colors[self.current_color_idx]
+        # 所属的补间调度器(由TweenScheduler.track设置)，没有时颜色不变化
+        self.tween_scheduler = None
+    
+    def set_active(self, active):
+        """开关背光"""
+        self.is_active = active
+        self.refresh()
+    
+    def refresh(self):
+        """背光或电视开关变化后调用: 两者都开着时循环换色，否则熄灭并停止换色"""
+        lit = self.tv.is_active and self.is_active
+        self.brightness = 1.0 if lit else 0.0
+        if self.tween_scheduler is not None:
+            key = (self.light_effect, "color")
+            if lit and not self.tween_scheduler.is_active(key):
+                self._fade_to_next_color()
+            elif not lit:
+                self.tween_scheduler.cancel(key)
+        self.mark_dirty()
+    
+    def _fade_to_next_color(self):
+        """渐变到下一种颜色，完成后继续"""
         next_color = self.colors[(self.current_color_idx + 1) % len(self.colors)]
-        
-        # 颜色插值
-        r = int(current_color[0] * (1 - self.color_transition) + next_color[0] * self.color_transition)
-        g = int(current_color[1] * (1 - self.color_transition) + next_color[1] * self.color_transition)
-        b = int(current_color[2] * (1 - self.color_transition) + next_color[2] * self.color_transition)
-        
-        self.light_effect.color = (r, g, b, 30)
+        self.tween_scheduler.tween(
+            self.light_effect, "color", next_color + (30,), self.color_time,
+            easing=linear, on_complete=self._on_color_reached
+        )
+    
+    def _on_color_reached(self):
+        self.current_color_idx = (self.current_color_idx + 1) % len(self.colors)
+        if self.tv.is_active and self.is_active:
+            self._fade_to_next_color()
+    
+    def is_settled(self):
+        """亮度直接跳变，没有渐变过程"""
+        return True
         
     def draw(self, render_light=True):
         """绘制电视背光"""
@@ -297,11 +482,17 @@ class TVBacklight(InteractiveObject):
             
         # 绘制电视背光效果
         if render_light:
-            self.light_effect.draw(alpha=self.brightness * 0.5)  # 降低亮度
+            self.draw_light_effect()
+    
+    def draw_light_effect(self, blend_function=None):
+        """只绘制光照效果"""
+        if self.brightness > 0:
+            self.light_effect.draw(alpha=self.brightness * 0.5,
+                                   blend_function=blend_function)  # 降低亮度
     
     def on_click(self):
         """点击事件处理"""
-        self.is_active = not self.is_active
+        self.set_active(not self.is_active)
         return self.is_active
 
 class LightSwitch(InteractiveObject):
@@ -333,8 +524,9 @@ class LightSwitch(InteractiveObject):
         
         # 控制关联的灯光
         for light in self.lights:
-            light.is_active = self.is_active
+            light.set_active(self.is_active)
             
+        self.mark_dirty()
         return self.is_active
 
 class LightingRenderer:
@@ -343,6 +535,12 @@ class LightingRenderer:
         self.light_sources = []
         self.objects = []
         self.shadows = []
+        # 离屏光照缓冲，首次使用时创建
+        self.light_buffer = None
+        # 按灯光开关组合缓存的光照贴图，首次使用时创建
+        self.lightmaps = None
+        # 当前画质档位
+        self.quality = QUALITY_LEVELS[0]
         
     def add_light(self, light):
         """添加光源"""
@@ -359,6 +557,19 @@ class LightingRenderer:
                 shadow = Shadow(obj, light)
                 self.shadows.append(shadow)
     
+    def set_quality(self, quality):
+        """
+        切换画质档位
+        
+        参数:
+            quality (QualityLevel): 新的画质档位
+        """
+        self.quality = quality
+        for light in self.light_sources:
+            light.quality = quality
+        if self.light_buffer is not None:
+            self.light_buffer.set_scale(quality.light_buffer_scale)
+    
     def render_scene_base(self, env_brightness):
         """渲染场景基础部分"""
         # 计算房间基础颜色
@@ -402,11 +613,14 @@ class LightingRenderer:
     
     def render_shadows(self):
         """渲染阴影"""
+        if not self.quality.shadows:
+            return
         for shadow in self.shadows:
             light = shadow.light_source
             # 只渲染亮着的灯的阴影
-            if getattr(light, "brightness", 0) > 0.3:
-                shadow.draw()
+            brightness = getattr(light, "brightness", 0)
+            if brightness > 0.3:
+                shadow.draw(brightness, secondary=self.quality.secondary_shadows)
     
     def render_objects(self):
         """渲染场景物体"""
@@ -415,11 +629,20 @@ class LightingRenderer:
         for obj in non_lights:
             obj.draw()
     
-    def render_lights(self, render_effects=True):
-        """渲染光源"""
+    def render_lights(self, render_effects=True, lights=None):
+        """
+        渲染光源
+        
+        参数:
+            lights (list): 要画灯具的灯光，默认为全部灯光
+        """
+        if lights is None:
+            lights = self.light_sources
         # 渲染光源物体，但不渲染光效
-        for light in self.light_sources:
-            light.draw(render_light=False)  # 先只渲染灯具，不渲染光效
+        # 灯具之间互不遮挡，灯泡和灯罩内的光晕在图层结束时一次画完
+        with circle_batch.circle_layer():
+            for light in lights:
+                light.draw(render_light=False)  # 先只渲染灯具，不渲染光效
     
     def render_light_effects(self):
         """渲染光效"""
@@ -427,6 +650,122 @@ class LightingRenderer:
         for light in self.light_sources:
             if isinstance(light, (CeilingLamp, FloorLamp, TVBacklight)) and getattr(light, "brightness", 0) > 0:
                 light.draw(render_light=True)  # 只渲染光效
+    
+    def render_light_buffer(self, lights=None, baked=None):
+        """
+        光照累积渲染：先把所有光效以加法混合画进离屏光照缓冲，
+        再一次性叠加到场景上，重叠的光晕会正确地相加
+        
+        参数:
+            lights (list): 画进缓冲的灯光，默认为全部灯光
+            baked (RenderTarget): 已烘焙的光照累积，先拷进缓冲再叠加其余灯光，
+                缓冲中的饱和截断与全部实时绘制时相同
+        """
+        if self.light_buffer is None:
+            self.light_buffer = RenderTarget(SCREEN_WIDTH, SCREEN_HEIGHT,
+                                             scale=self.quality.light_buffer_scale)
+        if lights is None:
+            lights = self.light_sources
+        
+        additive = self.light_buffer.blend_function(RenderTarget.BLEND_ADDITIVE)
+        with self.light_buffer.activate(blend=RenderTarget.BLEND_ADDITIVE):
+            self.light_buffer.clear()
+            if baked is not None:
+                baked.draw(blend=RenderTarget.BLEND_ADD)
+            for light in lights:
+                if isinstance(light, (CeilingLamp, FloorLamp, TVBacklight)):
+                    light.draw_light_effect(blend_function=additive)
+        
+        # 合成光照缓冲
+        self.light_buffer.draw(blend=RenderTarget.BLEND_ADD)
+    
+    def lights_settled(self):
+        """所有灯光的亮度和闪烁是否都已稳定"""
+        return all(light.is_settled() for light in self.light_sources)
+    
+    def light_mask(self):
+        """灯光开/关位掩码，稳定时画面只由它决定"""
+        mask = 0
+        for i, light in enumerate(self.light_sources):
+            if getattr(light, "brightness", 0) > 0:
+                mask |= 1 << i
+        return mask
+    
+    def layout_key(self):
+        """投射阴影的物体和灯光的位置尺寸，变化时烘焙结果失效"""
+        return tuple(shadow.geometry_key() for shadow in self.shadows)
+    
+    def live_fixture_lights(self, use_light_buffer=False):
+        """
+        使用光照贴图时仍要实时画灯具的灯光
+        
+        透明度混合模式下可烘焙灯光的灯具也画进了光晕层(见get_lightmap)，
+        光照缓冲模式的光晕层只有光效，灯具全部实时绘制。
+        """
+        if use_light_buffer:
+            return self.light_sources
+        _, live_lights = self._split_baked_lights()
+        return live_lights
+    
+    def _split_baked_lights(self):
+        """
+        按绘制顺序拆分灯光: 第一个光效在变化的灯光之前的可以烘焙，
+        之后的在合成光照贴图后实时绘制，叠加顺序与实时渲染一致
+        """
+        for i, light in enumerate(self.light_sources):
+            if getattr(light, "animated_glow", False):
+                return self.light_sources[:i], self.light_sources[i:]
+        return self.light_sources, []
+    
+    def get_lightmap(self, env_brightness, use_light_buffer=False):
+        """
+        取得当前灯光组合的光照贴图，没有时烘焙(只应在lights_settled()时调用)
+        
+        参数:
+            env_brightness (float): 环境亮度
+            use_light_buffer (bool): 光效按光照缓冲的加法混合烘焙
+        
+        返回:
+            Lightmap: 场景基础+阴影和光效两层
+        """
+        if self.lightmaps is None:
+            self.lightmaps = LightmapCache(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.lightmaps.check_layout(self.layout_key())
+        baked_lights, _ = self._split_baked_lights()
+        
+        def render_base():
+            self.render_scene_base(env_brightness)
+            self.render_shadows()
+        
+        def render_glow(blend_function):
+            if not use_light_buffer:
+                # 光效之前先画一遍灯具(render_lights)，之后每盏灯重绘灯具再画光效，
+                # 与render_light_effects一致。灯具第一遍也要在光晕层里:
+                # 多重采样解析后再合成，边缘像素会按覆盖率被同一个灯具遮挡两次
+                self.render_lights(render_effects=False, lights=baked_lights)
+            for light in baked_lights:
+                if getattr(light, "brightness", 0) <= 0:
+                    continue
+                if not use_light_buffer:
+                    light.draw(render_light=False)
+                light.draw_light_effect(blend_function=blend_function)
+        
+        return self.lightmaps.get(
+            (self.light_mask(), use_light_buffer, self.quality), render_base, render_glow,
+            additive=use_light_buffer, glow_scale=self.quality.light_buffer_scale
+        )
+    
+    def render_baked_light_effects(self, lightmap, use_light_buffer=False):
+        """合成烘焙的光效层，再实时绘制光效在变化的灯光"""
+        _, live_lights = self._split_baked_lights()
+        if use_light_buffer:
+            # 烘焙的累积和变化的灯光一起在光照缓冲里相加，再叠加到场景上
+            self.render_light_buffer(live_lights, baked=lightmap.glow)
+            return
+        lightmap.draw_glow()
+        for light in live_lights:
+            if getattr(light, "brightness", 0) > 0:
+                light.draw(render_light=True)
                 
     def calculate_environment_brightness(self):
         """计算环境亮度"""
@@ -444,37 +783,43 @@ class Sofa(InteractiveObject):
         
     def draw(self):
         """绘制沙发"""
-        # 绘制沙发主体
-        arcade.draw_rectangle_filled(
-            self.x, self.y, self.width, self.height, 
-            color=self.color
-        )
-        
-        # 绘制沙发靠背
-        arcade.draw_rectangle_filled(
-            self.x, self.y + self.height/2 - 20, self.width, 40,
-            color=arcade.color.DARK_BROWN
-        )
-        
-        # 绘制沙发垫子
-        for i in range(3):
-            offset = (i - 1) * 90
-            arcade.draw_rectangle_filled(
-                self.x + offset, self.y - 20, 80, self.height - 40,
-                color=arcade.color.BEIGE
-            )
+        # 沙发主体、靠背和垫子都是静态图元
+        self.draw_static_shapes(self.build_static_shapes)
             
         # 如果有人坐在沙发上
         if self.is_occupied:
-            arcade.draw_text(
+            draw_cached_text(
                 "有人坐在这里",
                 self.x - 70, self.y - 10,
                 arcade.color.BLACK, 14
             )
     
+    def build_static_shapes(self, shapes):
+        """构建沙发的静态图元"""
+        # 沙发主体
+        shapes.append(arcade.create_rectangle_filled(
+            self.x, self.y, self.width, self.height, 
+            self.color
+        ))
+        
+        # 沙发靠背
+        shapes.append(arcade.create_rectangle_filled(
+            self.x, self.y + self.height/2 - 20, self.width, 40,
+            arcade.color.DARK_BROWN
+        ))
+        
+        # 沙发垫子
+        for i in range(3):
+            offset = (i - 1) * 90
+            shapes.append(arcade.create_rectangle_filled(
+                self.x + offset, self.y - 20, 80, self.height - 40,
+                arcade.color.BEIGE
+            ))
+    
     def on_click(self):
         """点击事件处理"""
         self.is_occupied = not self.is_occupied
+        self.mark_dirty()
         return self.is_occupied
 
 class CoffeeTable(InteractiveObject):
@@ -485,38 +830,45 @@ class CoffeeTable(InteractiveObject):
         
     def draw(self):
         """绘制茶几"""
-        # 绘制茶几桌面
-        arcade.draw_rectangle_filled(
-            self.x, self.y, self.width, self.height/3, 
-            color=self.color
-        )
-        
-        # 绘制茶几腿
-        for i in range(4):
-            x_offset = self.width/2 - 20 if i in [0, 2] else -self.width/2 + 20
-            y_offset = self.height/3 - 10 if i in [0, 1] else -self.height/3 + 10
-            
-            arcade.draw_rectangle_filled(
-                self.x + x_offset, self.y + y_offset, 10, self.height*2/3,
-                color=arcade.color.DARK_BROWN
-            )
+        # 桌面和桌腿是静态图元
+        self.draw_static_shapes(self.build_static_shapes)
             
         # 绘制茶几上的物品
         if self.is_active:
-            arcade.draw_circle_filled(
+            circle_batch.draw_circle_filled(
                 self.x, self.y + 30, 20, arcade.color.ORANGE
             )
-            arcade.draw_text(
+            draw_cached_text(
                 "茶杯",
                 self.x - 20, self.y + 40,
                 arcade.color.BLACK, 12
             )
+    
+    def build_static_shapes(self, shapes):
+        """构建茶几的静态图元"""
+        # 茶几桌面
+        shapes.append(arcade.create_rectangle_filled(
+            self.x, self.y, self.width, self.height/3, 
+            self.color
+        ))
+        
+        # 茶几腿
+        for i in range(4):
+            x_offset = self.width/2 - 20 if i in [0, 2] else -self.width/2 + 20
+            y_offset = self.height/3 - 10 if i in [0, 1] else -self.height/3 + 10
+            
+            shapes.append(arcade.create_rectangle_filled(
+                self.x + x_offset, self.y + y_offset, 10, self.height*2/3,
+                arcade.color.DARK_BROWN
+            ))
 
-class LivingRoom(arcade.Window):
-    """客厅场景类"""
-    def __init__(self, width, height, title):
-        super().__init__(width, height, title)
-        arcade.set_background_color(arcade.color.WHITE)
+class LivingRoom(arcade.View):
+    """客厅场景视图"""
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        super().__init__()
+        
+        # 按Esc键返回的视图(通常是场景选择)
+        self.back_view = None
         
         # 创建资源目录
         os.makedirs(RESOURCES_DIR, exist_ok=True)
@@ -581,24 +933,103 @@ class LivingRoom(arcade.Window):
         for obj in self.interactive_objects:
             self.renderer.add_object(obj)
         
-        # 设置更新间隔
-        self.set_update_rate(1/60)
+        # 点击检测使用空间索引
+        self.spatial_index = SpatialIndex()
+        for obj in self.interactive_objects:
+            self.spatial_index.insert(obj)
+        
+        # 画面没有变化时复用上一帧
+        self.redraw = RedrawScheduler(self.window)
+        for obj in self.interactive_objects:
+            self.redraw.track(obj)
+        
+        # 灯光渐变和背光换色登记为补间动画，只推进正在变化的
+        self.tweens = TweenScheduler(on_change=self.redraw.mark_dirty)
+        for light in self.lights:
+            self.tweens.track(light)
         
         # 默认开启主灯
         self.main_light_switch.is_active = True
-        self.ceiling_lamp.is_active = True
+        self.ceiling_lamp.set_active(True)
+        
+        # 帧阶段分析器(P键开关)
+        self.profiler = get_frame_profiler()
+        
+        # 固定步长模拟时钟，动画速度与帧率无关
+        self.clock = SimulationClock()
+        
+        # 重绘耗时超出预算时自动降低画质(G键开关)
+        self.quality = QualityGovernor(on_change=self.on_quality_change)
         
         # 渲染模式
         self.use_deferred_lighting = True
+        # 分层渲染下是否使用离屏光照缓冲累积光效
+        self.use_light_buffer = False
+        # 灯光稳定时是否直接绘制烘焙的光照贴图
+        self.use_lightmap_cache = True
+    
+    def on_show_view(self):
+        """显示视图时调用"""
+        arcade.set_background_color(arcade.color.WHITE)
+        self.window.set_caption(SCREEN_TITLE)
+        # 设置更新间隔
+        self.window.set_update_rate(1/60)
+        self.clock.reset()
+        for obj in self.interactive_objects:
+            obj.retain_texture()
+        self.profiler.quality = self.quality
+        self.redraw.mark_dirty()
+    
+    def on_hide_view(self):
+        """隐藏视图时调用，释放纹理引用"""
+        for obj in self.interactive_objects:
+            obj.release_texture()
+        if self.profiler.quality is self.quality:
+            self.profiler.quality = None
+    
+    def on_quality_change(self, quality):
+        """画质换档后应用到渲染器并重绘"""
+        self.renderer.set_quality(quality)
+        self.redraw.mark_dirty()
     
     def on_update(self, delta_time):
         """更新场景状态"""
-        # 更新所有灯光
-        for light in self.lights:
-            light.update()
+        self.profiler.begin_frame()
+        with self.profiler.phase("update"):
+            # 按固定步长推进活动的补间动画，绘制用的亮度在两步之间插值
+            self.clock.advance(delta_time, self.tweens.update)
+            self.tweens.interpolate(self.clock.render_alpha)
     
     def on_draw(self):
         """渲染游戏画面"""
+        self.redraw.draw(self.draw_scene)
+        
+        # 分析叠加层画在帧缓存之外，每帧刷新
+        self.profiler.end_frame()
+        self.profiler.draw()
+    
+    def _lightmap_bakes(self):
+        lightmaps = self.renderer.lightmaps
+        return lightmaps.bakes if lightmaps is not None else 0
+    
+    def draw_scene(self):
+        """
+        绘制完整场景，耗时交给画质调节器
+        
+        绘制调用只是把命令提交给驱动，计时结束前等GPU执行完，记录的才是整帧的耗时。
+        重新烘焙光照贴图是开关灯后的一次性开销，这样的帧不计入样本，
+        否则开关一次灯就可能让调节器降档。
+        """
+        bakes = self._lightmap_bakes()
+        start = time.perf_counter()
+        self.render_scene()
+        self.window.ctx.finish()
+        frame_ms = (time.perf_counter() - start) * 1000
+        if self._lightmap_bakes() == bakes:
+            self.quality.record(frame_ms)
+    
+    def render_scene(self):
+        """绘制完整场景"""
         arcade.start_render()
         
         # 计算环境亮度
@@ -606,117 +1037,161 @@ class LivingRoom(arcade.Window):
         
         if self.use_deferred_lighting:
             # 分层渲染 - 更真实的光照效果
-            # 1. 渲染场景基础
-            self.renderer.render_scene_base(env_brightness)
-            
-            # 2. 先渲染阴影
-            self.renderer.render_shadows()
+            # 灯光稳定时场景基础、阴影和光效来自烘焙的光照贴图
+            lightmap = None
+            if self.use_lightmap_cache and self.renderer.lights_settled():
+                with self.profiler.phase("render_lightmap"):
+                    lightmap = self.renderer.get_lightmap(env_brightness, self.use_light_buffer)
+                    lightmap.draw_base()
+            else:
+                # 1. 渲染场景基础
+                with self.profiler.phase("render_scene_base"):
+                    self.renderer.render_scene_base(env_brightness)
+                
+                # 2. 先渲染阴影
+                with self.profiler.phase("render_shadows"):
+                    self.renderer.render_shadows()
             
             # 3. 渲染物体
-            self.renderer.render_objects()
+            with self.profiler.phase("render_objects"):
+                self.renderer.render_objects()
             
             # 4. 渲染光源（不含光效）
-            self.renderer.render_lights(render_effects=False)
+            with self.profiler.phase("render_lights"):
+                lights = None
+                if lightmap is not None:
+                    lights = self.renderer.live_fixture_lights(self.use_light_buffer)
+                self.renderer.render_lights(render_effects=False, lights=lights)
             
             # 5. 单独渲染光效
-            self.renderer.render_light_effects()
+            with self.profiler.phase("render_light_effects"):
+                if lightmap is not None:
+                    self.renderer.render_baked_light_effects(lightmap, self.use_light_buffer)
+                elif self.use_light_buffer:
+                    self.renderer.render_light_buffer()
+                else:
+                    self.renderer.render_light_effects()
         else:
             # 简单渲染 - 旧的渲染方式
-            # 房间基础颜色
-            bg_color = (
-                int(60 + 180 * env_brightness),  # 提高基础亮度
-                int(60 + 180 * env_brightness),
-                int(70 + 160 * env_brightness)
-            )
-            
-            # 绘制背景墙壁
-            arcade.draw_rectangle_filled(
-                SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, SCREEN_WIDTH, SCREEN_HEIGHT,
-                color=bg_color
-            )
-            
-            # 绘制地板
-            floor_color = (
-                int(60 + 100 * env_brightness),  # 提高基础亮度
-                int(40 + 60 * env_brightness),
-                int(20 + 40 * env_brightness)
-            )
-            arcade.draw_rectangle_filled(
-                SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4, SCREEN_WIDTH, SCREEN_HEIGHT // 2,
-                color=floor_color
-            )
-            
-            # 绘制窗户
-            window_color = (
-                int(120 + 100 * env_brightness),  # 提高基础亮度
-                int(170 + 80 * env_brightness),
-                int(220 + 30 * env_brightness)
-            )
-            arcade.draw_rectangle_filled(
-                SCREEN_WIDTH - 200, SCREEN_HEIGHT - 150, 200, 150,
-                color=window_color
-            )
-            arcade.draw_rectangle_outline(
-                SCREEN_WIDTH - 200, SCREEN_HEIGHT - 150, 200, 150,
-                color=arcade.color.BLACK, border_width=5
-            )
-            
-            # 绘制电视背光
-            self.tv_backlight.draw()
-            
-            # 绘制不发光的对象
-            non_lights = [obj for obj in self.interactive_objects if obj not in self.lights]
-            for obj in non_lights:
-                obj.draw()
-                
-            # 绘制灯光效果
-            for light in self.lights:
-                if isinstance(light, (CeilingLamp, FloorLamp)):
-                    light.draw()
+            with self.profiler.phase("render_simple"):
+                self.render_simple(env_brightness)
         
         # 绘制使用说明
         text_color = arcade.color.WHITE if env_brightness < 0.5 else arcade.color.BLACK
-        arcade.draw_text(
-            text="点击物体与之交互:\n- 电视右下角按钮开/关机\n- 点击遥控器切换频道\n- 点击沙发坐下/起身\n- 点击茶几放置/移除物品\n- 墙上三个开关控制不同灯光 (R键切换渲染模式)",
+        draw_cached_text(
+            text="点击物体与之交互:\n- 电视右下角按钮开/关机\n- 点击遥控器切换频道\n- 点击沙发坐下/起身\n- 点击茶几放置/移除物品\n- 墙上三个开关控制不同灯光 (R键切换渲染模式, L键切换光照缓冲, B键切换光照贴图缓存, G键自动画质, P键显示性能分析)",
             start_x=20, start_y=SCREEN_HEIGHT - 120, 
             color=text_color, font_size=14
         )
     
+    def render_simple(self, env_brightness):
+        """简单渲染 - 旧的渲染方式，不使用分层光照"""
+        # 房间基础颜色
+        bg_color = (
+            int(60 + 180 * env_brightness),  # 提高基础亮度
+            int(60 + 180 * env_brightness),
+            int(70 + 160 * env_brightness)
+        )
+        
+        # 绘制背景墙壁
+        arcade.draw_rectangle_filled(
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, SCREEN_WIDTH, SCREEN_HEIGHT,
+            color=bg_color
+        )
+        
+        # 绘制地板
+        floor_color = (
+            int(60 + 100 * env_brightness),  # 提高基础亮度
+            int(40 + 60 * env_brightness),
+            int(20 + 40 * env_brightness)
+        )
+        arcade.draw_rectangle_filled(
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4, SCREEN_WIDTH, SCREEN_HEIGHT // 2,
+            color=floor_color
+        )
+        
+        # 绘制窗户
+        window_color = (
+            int(120 + 100 * env_brightness),  # 提高基础亮度
+            int(170 + 80 * env_brightness),
+            int(220 + 30 * env_brightness)
+        )
+        arcade.draw_rectangle_filled(
+            SCREEN_WIDTH - 200, SCREEN_HEIGHT - 150, 200, 150,
+            color=window_color
+        )
+        arcade.draw_rectangle_outline(
+            SCREEN_WIDTH - 200, SCREEN_HEIGHT - 150, 200, 150,
+            color=arcade.color.BLACK, border_width=5
+        )
+        
+        # 绘制电视背光
+        self.tv_backlight.draw()
+        
+        # 绘制不发光的对象
+        non_lights = [obj for obj in self.interactive_objects if obj not in self.lights]
+        for obj in non_lights:
+            obj.draw()
+            
+        # 绘制灯光效果
+        for light in self.lights:
+            if isinstance(light, (CeilingLamp, FloorLamp)):
+                light.draw()
+    
     def on_key_press(self, key, modifiers):
         """键盘按键事件处理"""
         if key == arcade.key.R:
             # 按R键切换渲染模式
             self.use_deferred_lighting = not self.use_deferred_lighting
+        elif key == arcade.key.L:
+            # 按L键切换光照缓冲(仅分层渲染模式下生效)
+            self.use_light_buffer = not self.use_light_buffer
+        elif key == arcade.key.B:
+            # 按B键切换光照贴图缓存(仅分层渲染模式下生效)
+            self.use_lightmap_cache = not self.use_lightmap_cache
+        elif key == arcade.key.G:
+            # 按G键开关自动画质调节，关闭时恢复完整画质
+            self.quality.set_enabled(not self.quality.enabled)
+        elif key == arcade.key.P:
+            # 按P键开关帧阶段分析叠加层
+            self.profiler.toggle()
+        elif key == arcade.key.ESCAPE and self.back_view is not None:
+            # 按Esc键返回场景选择
+            self.window.show_view(self.back_view)
+            return
+        self.redraw.mark_dirty()
     
     def on_mouse_press(self, x, y, button, modifiers):
         """鼠标点击事件处理"""
+        hits = self.spatial_index.query_point(x, y)
+        if not hits:
+            return
+        
         # 检查点击的是否为遥控器
-        if self.remote.is_clicked(x, y):
+        if self.remote in hits:
             self.tv.change_channel()
             return
         
         # 检查点击的是否为灯光开关
-        if self.main_light_switch.is_clicked(x, y):
-            self.main_light_switch.on_click()
-            return
-            
-        if self.floor_lamp_switch.is_clicked(x, y):
-            self.floor_lamp_switch.on_click()
-            return
-            
-        if self.tv_backlight_switch.is_clicked(x, y):
-            self.tv_backlight_switch.on_click()
-            return
+        for light_switch in (self.main_light_switch, self.floor_lamp_switch, self.tv_backlight_switch):
+            if light_switch in hits:
+                light_switch.on_click()
+                return
         
         # 检查其他交互对象
-        for obj in self.interactive_objects:
-            if obj.is_clicked(x, y):
-                obj.on_click()
-                break
+        hits[0].on_click()
+        
+        # 电视开关会影响背光
+        if hits[0] is self.tv:
+            self.tv_backlight.refresh()
 
 def main():
-    """主函数 - 创建客厅窗口并运行游戏"""
-    game = LivingRoom(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    """主函数 - 创建窗口并显示客厅场景"""
+    setup_logging()
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    window.show_view(LivingRoom())
+    # 字形在空闲时间片中预热，避免第一次显示新文字时卡顿
+    start_glyph_warmup()
     arcade.run()
 
 if __name__ == "__main__":
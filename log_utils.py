@@ -0,0 +1,128 @@
+"""
+日志
+
+各模块原来直接print: 卧室没有背景图片时每帧打印一次警告，按键、登录流程也同步写stdout。
+stdout是管道或被journald接管时，同步写入会让帧卡住。这里统一使用标准库logging:
+
+    - 每个模块用get_logger(__name__)取得自己的记录器
+    - 调用线程只把记录放进队列(QueueHandler)，由后台线程(QueueListener)写出
+    - 同一调用位置(文件+行号)每个时间窗口内最多输出burst条，多出的丢弃并在下一条中注明条数
+    - 级别由环境变量GAME_LOG_LEVEL控制(默认INFO)。帧路径上的消息用DEBUG级别并以%参数传值，
+      级别关闭时logger.debug()在创建记录之前就返回，不格式化任何字符串
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+# 所有游戏模块记录器的公共前缀，配置只作用于这棵记录器树
+ROOT_LOGGER_NAME = "game"
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener = None
+_handler = None
+_lock = threading.Lock()
+
+
+def get_logger(name):
+    """
+    取得模块的记录器
+
+    参数:
+        name (str): 通常是__name__
+
+    返回:
+        logging.Logger: ROOT_LOGGER_NAME下的子记录器
+    """
+    if name == "__main__":
+        name = os.path.splitext(os.path.basename(sys.argv[0] or "main"))[0]
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+class RateLimitFilter(logging.Filter):
+    """按调用位置限制输出频率"""
+
+    def __init__(self, interval=1.0, burst=5):
+        """
+        参数:
+            interval (float): 时间窗口(秒)
+            burst (int): 每个调用位置在一个窗口内最多输出的条数
+        """
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        # (文件, 行号) -> [窗口开始时间, 窗口内已输出条数, 被丢弃条数]
+        self._sites = {}
+
+    def filter(self, record):
+        now = time.monotonic()
+        key = (record.pathname, record.lineno)
+        site = self._sites.get(key)
+        if site is None or now - site[0] >= self.interval:
+            suppressed = site[2] if site is not None else 0
+            self._sites[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.msg} (此前{self.interval:g}秒内另有{suppressed}条相同位置的日志被抑制)"
+            return True
+        if site[1] < self.burst:
+            site[1] += 1
+            return True
+        site[2] += 1
+        return False
+
+
+def setup_logging(level=None, stream=None, interval=1.0, burst=5):
+    """
+    配置日志输出(重复调用时不会重复配置)
+
+    参数:
+        level (str|int): 日志级别，默认取环境变量GAME_LOG_LEVEL，没有时为INFO
+        stream: 输出流，默认stderr
+        interval (float): 限流的时间窗口(秒)
+        burst (int): 每个调用位置在一个窗口内最多输出的条数
+    """
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+        if level is None:
+            level = os.environ.get("GAME_LOG_LEVEL", "INFO")
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+            if not isinstance(level, int):
+                level = logging.INFO
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(logging.Formatter(LOG_FORMAT, datefmt="%H:%M:%S"))
+
+        # 记录只在调用线程里入队，写出由后台线程完成
+        records = queue.SimpleQueue()
+        handler = logging.handlers.QueueHandler(records)
+        handler.addFilter(RateLimitFilter(interval, burst))
+
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        root.setLevel(level)
+        root.addHandler(handler)
+        root.propagate = False
+        _handler = handler
+
+        _listener = logging.handlers.QueueListener(records, output)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """写出队列中剩余的日志并停止后台线程"""
+    global _listener, _handler
+    with _lock:
+        if _listener is None:
+            return
+        logging.getLogger(ROOT_LOGGER_NAME).removeHandler(_handler)
+        _listener.stop()
+        _listener = None
+        _handler = None
@@ -8,6 +8,12 @@ import math
 # 只导入必要的常量
 from interactive_room_game import SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE
 from bedroom_view import BedroomView
+from particles import ParticleField
+from sim_clock import SimulationClock
+import circle_batch
+from log_utils import get_logger
+
+logger = get_logger(__name__)
 
 # 定义一个随机颜色生成函数，替代arcade.color.random_color()
 def random_color():
@@ -42,14 +48,10 @@ class LoginView(arcade.View):
         arcade.set_background_color(arcade.color.LIGHT_BLUE)
         
         # 创建一些动画元素
-        self.stars = []
-        for _ in range(50):
-            self.stars.append({
-                'x': random.randint(0, SCREEN_WIDTH),
-                'y': random.randint(0, SCREEN_HEIGHT),
-                'size': random.uniform(1, 3),
-                'speed': random.uniform(0.5, 2)
-            })
+        self.stars = ParticleField.falling_stars(50, SCREEN_WIDTH, SCREEN_HEIGHT)
+        
+        # 固定步长模拟时钟，动画速度与帧率无关
+        self.clock = SimulationClock()
         
         # 创建动画计时器
         self.total_time = 0.0
@@ -176,44 +178,42 @@ class LoginView(arcade.View):
         def on_login_button_click(event):
             # 如果正在切换视图，则忽略重复点击
             if self.is_transitioning:
-                print("正在切换视图，忽略重复点击")
+                logger.debug("正在切换视图，忽略重复点击")
                 return
             
             # 标记正在切换视图
             self.is_transitioning = True
-            print("开始登录流程...")
+            logger.info("开始登录流程")
             
             # 获取用户名
             username = self.username_input.text if self.username_input.text else "玩家"
-            print(f"用户名: {username}")
+            logger.info("用户名: %s", username)
             
             try:
                 # 禁用UI管理器，防止再次点击
-                print("禁用UI管理器")
+                logger.debug("禁用UI管理器")
                 self.manager.disable()
                 
                 # 获取当前窗口对象
                 current_window = self.window
-                print(f"当前窗口ID: {id(current_window)}")
+                logger.debug("当前窗口ID: %s", id(current_window))
                 
                 # 使用延迟导入
                 import importlib
                 bedroom_module = importlib.import_module('bedroom_view')
                 
                 # 创建新的卧室视图
-                print("创建卧室视图")
+                logger.debug("创建卧室视图")
                 bedroom_view = bedroom_module.BedroomView(self.use_enhanced_version, username)
-                print(f"卧室视图ID: {id(bedroom_view)}")
+                logger.debug("卧室视图ID: %s", id(bedroom_view))
                 
                 # 跳转到卧室页面，关闭防重复点击标记
-                print("准备切换到卧室视图")
+                logger.debug("准备切换到卧室视图")
                 self.is_transitioning = False
                 current_window.show_view(bedroom_view)
-                print("已切换到卧室视图")
-            except Exception as e:
-                print(f"切换视图时出错: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.info("已切换到卧室视图")
+            except Exception:
+                logger.exception("切换视图时出错")
                 # 如果出错，重新启用UI管理器
                 self.manager.enable()
                 # 取消正在切换的标记
@@ -237,15 +237,16 @@ class LoginView(arcade.View):
         )
     
     def on_update(self, delta_time):
-        """更新动画"""
+        """按固定步长推进动画，星星位置在两步之间插值"""
+        self.clock.advance(delta_time, self.fixed_update)
+        self.stars.interpolate(self.clock.render_alpha)
+    
+    def fixed_update(self, delta_time):
+        """推进一步动画"""
         self.total_time += delta_time
         
         # 更新星星位置
-        for star in self.stars:
-            star['y'] -= star['speed']
-            if star['y'] < 0:
-                star['y'] = SCREEN_HEIGHT
-                star['x'] = random.randint(0, SCREEN_WIDTH)
+        self.stars.update(delta_time)
     
     def on_draw(self):
         """渲染登录页面"""
@@ -262,11 +263,7 @@ class LoginView(arcade.View):
         )
         
         # 绘制星星
-        for star in self.stars:
-            arcade.draw_circle_filled(
-                star['x'], star['y'], star['size'],
-                arcade.color.WHITE
-            )
+        self.stars.draw()
         
         # 绘制底部装饰
         # 绘制草地
@@ -275,17 +272,19 @@ class LoginView(arcade.View):
             arcade.color.APPLE_GREEN
         )
         
-        # 绘制云朵
-        self.draw_cloud(100, SCREEN_HEIGHT - 100, 40)
-        self.draw_cloud(300, SCREEN_HEIGHT - 150, 50)
-        self.draw_cloud(600, SCREEN_HEIGHT - 120, 45)
-        self.draw_cloud(800, SCREEN_HEIGHT - 180, 55)
+        # 绘制云朵(所有云朵的圆一次画完)
+        with circle_batch.circle_layer():
+            self.draw_cloud(100, SCREEN_HEIGHT - 100, 40)
+            self.draw_cloud(300, SCREEN_HEIGHT - 150, 50)
+            self.draw_cloud(600, SCREEN_HEIGHT - 120, 45)
+            self.draw_cloud(800, SCREEN_HEIGHT - 180, 55)
         
-        # 绘制彩色气球
-        for i in range(10):
-            x = 50 + i * 100
-            y = SCREEN_HEIGHT - 50
-            self.draw_balloon(x, y, NINETIES_COLORS[i])
+        # 绘制彩色气球(气球之间互不遮挡，气球线先画，气球和反光在图层结束时一次画完)
+        with circle_batch.circle_layer():
+            for i in range(10):
+                x = 50 + i * 100
+                y = SCREEN_HEIGHT - 50
+                self.draw_balloon(x, y, NINETIES_COLORS[i])
         
         # 绘制UI元素
         self.manager.draw()
@@ -312,21 +311,21 @@ class LoginView(arcade.View):
         )
         
         # 气球本身
-        arcade.draw_circle_filled(
+        circle_batch.draw_circle_filled(
             x, y, 25, color
         )
         # 气球反光
-        arcade.draw_circle_filled(
+        circle_batch.draw_circle_filled(
             x - 8, y + 8, 5, (255, 255, 255, 120)
         )
     
     def draw_cloud(self, x, y, size):
         """绘制云朵"""
-        arcade.draw_circle_filled(x, y, size, arcade.color.WHITE)
-        arcade.draw_circle_filled(x + size*0.8, y, size*0.7, arcade.color.WHITE)
-        arcade.draw_circle_filled(x - size*0.8, y, size*0.7, arcade.color.WHITE)
-        arcade.draw_circle_filled(x + size*0.4, y + size*0.4, size*0.7, arcade.color.WHITE)
-        arcade.draw_circle_filled(x - size*0.4, y + size*0.4, size*0.7, arcade.color.WHITE)
+        circle_batch.draw_circle_filled(x, y, size, arcade.color.WHITE)
+        circle_batch.draw_circle_filled(x + size*0.8, y, size*0.7, arcade.color.WHITE)
+        circle_batch.draw_circle_filled(x - size*0.8, y, size*0.7, arcade.color.WHITE)
+        circle_batch.draw_circle_filled(x + size*0.4, y + size*0.4, size*0.7, arcade.color.WHITE)
+        circle_batch.draw_circle_filled(x - size*0.4, y + size*0.4, size*0.7, arcade.color.WHITE)
     
     def on_show_view(self):
         """显示视图时的处理"""
@@ -1,7 +1,9 @@
 import arcade
 import os
-from interactive_room_game import ChildhoodRoom
-from living_room_scene import LivingRoom
+import scene_registry
+from redraw import RedrawScheduler
+from log_utils import setup_logging
+from glyph_warmup import start_glyph_warmup
 
 # 常量定义
 SCREEN_WIDTH = 1024
@@ -52,41 +54,78 @@ class Button:
         self.hover = (self.x - self.width/2 <= x <= self.x + self.width/2 and
                      self.y - self.height/2 <= y <= self.y + self.height/2)
 
-class SceneSelector(arcade.Window):
-    """场景选择器类"""
-    def __init__(self, width, height, title):
-        super().__init__(width, height, title)
-        arcade.set_background_color(arcade.color.SKY_BLUE)
+class SceneSelector(arcade.View):
+    """场景选择视图，所有场景都在同一个窗口中以视图切换"""
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        super().__init__()
         
         # 创建按钮
         self.buttons = []
         
         # 童年房间按钮
         self.childhood_room_button = Button(
-            width // 2, height // 2 + 100, 300, 60, 
-            "童年房间", arcade.color.ORANGE
+            width // 2, height // 2 + 150, 300, 60, 
+            scene_registry.scene_title("childhood_room"), arcade.color.ORANGE
+        )
+        
+        # 增强版房间按钮
+        self.enhanced_room_button = Button(
+            width // 2, height // 2 + 50, 300, 60, 
+            scene_registry.scene_title("enhanced_room"), arcade.color.PURPLE
         )
         
         # 客厅场景按钮
         self.living_room_button = Button(
-            width // 2, height // 2, 300, 60, 
-            "客厅场景", arcade.color.GREEN
+            width // 2, height // 2 - 50, 300, 60, 
+            scene_registry.scene_title("living_room"), arcade.color.GREEN
         )
         
         # 退出按钮
         self.exit_button = Button(
-            width // 2, height // 2 - 100, 300, 60, 
+            width // 2, height // 2 - 150, 300, 60, 
             "退出游戏", arcade.color.RED
         )
         
         self.buttons.extend([
             self.childhood_room_button,
+            self.enhanced_room_button,
             self.living_room_button,
             self.exit_button
         ])
+        
+        # 已创建的场景视图，再次进入时直接复用(保留状态和GPU资源)
+        # 场景模块在第一次进入时才导入
+        self.scenes = {}
+        
+        # 画面没有变化时复用上一帧
+        self.redraw = RedrawScheduler(self.window)
+    
+    def on_show_view(self):
+        """显示视图时调用"""
+        arcade.set_background_color(arcade.color.SKY_BLUE)
+        self.window.set_caption(SCREEN_TITLE)
+        self.redraw.mark_dirty()
+    
+    def show_scene(self, key):
+        """
+        切换到场景视图，首次进入时导入模块并创建
+        
+        参数:
+            key (str): scene_registry中的场景键
+        """
+        scene = self.scenes.get(key)
+        if scene is None:
+            scene = scene_registry.create_scene(key)
+            scene.back_view = self
+            self.scenes[key] = scene
+        self.window.show_view(scene)
     
     def on_draw(self):
         """渲染游戏画面"""
+        self.redraw.draw(self.draw_scene)
+    
+    def draw_scene(self):
+        """绘制完整场景"""
         arcade.start_render()
         
         # 绘制背景
@@ -98,14 +137,14 @@ class SceneSelector(arcade.Window):
         # 绘制标题
         arcade.draw_text(
             "90后童年互动房间",
-            SCREEN_WIDTH // 2 - 300, SCREEN_HEIGHT - 150,
+            SCREEN_WIDTH // 2 - 300, SCREEN_HEIGHT - 130,
             arcade.color.DARK_BLUE, 50, width=600,
             align="center", bold=True
         )
         
         arcade.draw_text(
             "请选择场景:",
-            SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT - 250,
+            SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT - 190,
             arcade.color.BLACK, 24, width=300,
             align="center"
         )
@@ -118,28 +157,35 @@ class SceneSelector(arcade.Window):
         """鼠标点击事件处理"""
         if self.childhood_room_button.is_clicked(x, y):
             # 打开童年房间场景
-            self.close()
-            room = ChildhoodRoom(SCREEN_WIDTH, SCREEN_HEIGHT, "90后童年互动房间")
-            arcade.run()
+            self.show_scene("childhood_room")
+        
+        elif self.enhanced_room_button.is_clicked(x, y):
+            # 打开增强版房间场景
+            self.show_scene("enhanced_room")
         
         elif self.living_room_button.is_clicked(x, y):
             # 打开客厅场景
-            self.close()
-            room = LivingRoom(SCREEN_WIDTH, SCREEN_HEIGHT, "客厅场景")
-            arcade.run()
+            self.show_scene("living_room")
         
         elif self.exit_button.is_clicked(x, y):
             # 退出游戏
-            self.close()
+            self.window.close()
     
     def on_mouse_motion(self, x, y, dx, dy):
         """鼠标移动事件处理"""
         for button in self.buttons:
+            was_hovered = button.hover
             button.check_hover(x, y)
+            if button.hover != was_hovered:
+                self.redraw.mark_dirty()
 
 def main():
-    """主函数 - 启动场景选择器"""
-    selector = SceneSelector(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    """主函数 - 创建唯一的窗口并显示场景选择"""
+    setup_logging()
+    window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    window.show_view(SceneSelector())
+    # 字形在空闲时间片中预热，避免第一次显示新文字时卡顿
+    start_glyph_warmup()
     arcade.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,264 @@
+"""
+向量化粒子场
+
+星星、云朵之类的大量小粒子用NumPy数组保存位置、速度、大小、透明度和闪烁相位，
+更新和边界环绕都是整批的数组运算；绘制时把所有粒子写进一个顶点缓冲，
+用一次点精灵绘制调用画完，粒子数量可以到十万级。
+"""
+import numpy as np
+
+import arcade
+from arcade.gl import BufferDescription
+
+_VERTEX_SHADER = """
+#version 330
+
+// 当前投影: left, right, bottom, top
+uniform vec4 projection;
+
+in vec2 in_pos;
+in float in_size;
+in float in_alpha;
+
+out float v_alpha;
+
+void main() {
+    vec2 ndc = (in_pos - projection.xz) / (projection.yw - projection.xz) * 2.0 - 1.0;
+    gl_Position = vec4(ndc, 0.0, 1.0);
+    // in_size是半径，点精灵尺寸是直径
+    gl_PointSize = in_size * 2.0;
+    v_alpha = in_alpha;
+}
+"""
+
+_FRAGMENT_SHADER = """
+#version 330
+
+uniform vec3 color;
+// 整体透明度，用于整批淡入淡出
+uniform float opacity;
+
+in float v_alpha;
+
+out vec4 fragColor;
+
+void main() {
+    // 把方形点精灵裁成圆形
+    vec2 d = gl_PointCoord * 2.0 - 1.0;
+    if (dot(d, d) > 1.0) {
+        discard;
+    }
+    fragColor = vec4(color, v_alpha * opacity);
+}
+"""
+
+# 云朵由五个圆组成: (x偏移, y偏移, 半径比例)，偏移以粒子大小为单位
+CLOUD_TEMPLATE = (
+    (0.0, 0.0, 1.0),
+    (0.6, 0.0, 0.7),
+    (-0.6, 0.0, 0.7),
+    (0.3, 0.3, 0.7),
+    (-0.3, 0.3, 0.7),
+)
+
+# 每个顶点: x, y, 半径, 透明度
+_VERTEX_FORMAT = "2f 1f 1f"
+_FLOATS_PER_VERTEX = 4
+
+
+class ParticleField:
+    """用NumPy数组保存的粒子场"""
+
+    def __init__(self, count, bounds, color=arcade.color.WHITE,
+                 size_range=(1, 3), alpha_range=(255, 255), seed=None):
+        """
+        参数:
+            count (int): 粒子数量
+            bounds (tuple): 粒子活动范围(left, bottom, right, top)
+            color (tuple): 粒子颜色
+            size_range (tuple): 粒子半径范围
+            alpha_range (tuple): 初始透明度范围(0~255)
+            seed (int): 随机种子
+        """
+        self.count = count
+        self.bounds = bounds
+        self.color = color
+        self.rng = np.random.default_rng(seed)
+
+        left, bottom, right, top = bounds
+        self.positions = np.column_stack((
+            self.rng.uniform(left, right, count),
+            self.rng.uniform(bottom, top, count),
+        )).astype(np.float32)
+        self.velocities = np.zeros((count, 2), dtype=np.float32)  # 像素/秒
+        self.sizes = self.rng.uniform(size_range[0], size_range[1], count).astype(np.float32)
+        self.alphas = self.rng.uniform(alpha_range[0], alpha_range[1], count).astype(np.float32)
+
+        # 闪烁: alpha = 128 + 127 * sin(time * speed + phase)，速度为0时不闪烁
+        self.twinkle_speeds = np.zeros(count, dtype=np.float32)
+        self.twinkle_phases = np.zeros(count, dtype=np.float32)
+        self.time = 0.0
+
+        # 边界环绕方式
+        self.wrap_x = False
+        self.wrap_y = False
+        self.wrap_margin = 0.0       # 越过边界多少个粒子半径后才环绕
+        self.respawn_x_on_wrap_y = False  # 纵向环绕时重新随机横坐标
+
+        # 每个粒子绘制成的形状，None表示一个圆
+        self.template = None
+
+        # 渲染插值: 绘制位置在上一步和当前步之间，alpha由模拟时钟给出
+        self.previous_positions = self.positions.copy()
+        self.render_alpha = 1.0
+
+        # GPU资源，首次绘制时创建
+        self._ctx = None
+        self._program = None
+        self._buffer = None
+        self._geometry = None
+        self._capacity = 0
+
+    @classmethod
+    def falling_stars(cls, count, width, height, seed=None):
+        """登录页上缓缓下落的星星"""
+        field = cls(count, (0, 0, width, height), size_range=(1, 3), seed=seed)
+        # 原先每帧下落0.5~2像素(60帧)
+        field.velocities[:, 1] = -field.rng.uniform(0.5, 2, count) * 60
+        field.wrap_y = True
+        field.respawn_x_on_wrap_y = True
+        return field
+
+    @classmethod
+    def twinkling_stars(cls, count, bounds, seed=None):
+        """原地闪烁的星星"""
+        field = cls(count, bounds, size_range=(1, 3), alpha_range=(100, 255), seed=seed)
+        field.twinkle_speeds[:] = field.rng.uniform(1, 3, count)
+        return field
+
+    @classmethod
+    def drifting_clouds(cls, count, bounds, seed=None):
+        """横向漂移的云朵"""
+        field = cls(count, bounds, size_range=(20, 40), seed=seed)
+        # 原先每帧漂移0.2~0.5像素(60帧)，方向随机
+        directions = field.rng.choice(np.array([-1.0, 1.0]), count)
+        field.velocities[:, 0] = field.rng.uniform(0.2, 0.5, count) * directions * 60
+        field.wrap_x = True
+        field.wrap_margin = 1.0
+        field.template = CLOUD_TEMPLATE
+        return field
+
+    def update(self, delta_time):
+        """
+        推进粒子状态
+
+        参数:
+            delta_time (float): 经过的时间，以秒为单位
+        """
+        self.time += delta_time
+        self.previous_positions[:] = self.positions
+        self.positions += self.velocities * delta_time
+
+        left, bottom, right, top = self.bounds
+        margin = self.sizes * self.wrap_margin
+
+        if self.wrap_x:
+            x = self.positions[:, 0]
+            over = x > right + margin
+            under = x < left - margin
+            x[over] = (left - margin)[over]
+            x[under] = (right + margin)[under]
+
+        if self.wrap_y:
+            y = self.positions[:, 1]
+            over = y > top + margin
+            under = y < bottom - margin
+            y[over] = (bottom - margin)[over]
+            y[under] = (top + margin)[under]
+            if self.respawn_x_on_wrap_y:
+                wrapped = over | under
+                count = int(wrapped.sum())
+                if count:
+                    self.positions[wrapped, 0] = self.rng.uniform(left, right, count)
+
+        twinkling = self.twinkle_speeds > 0
+        if twinkling.any():
+            self.alphas[twinkling] = 128 + 127 * np.sin(
+                self.time * self.twinkle_speeds[twinkling] + self.twinkle_phases[twinkling]
+            )
+
+    def interpolate(self, alpha):
+        """
+        设置渲染插值系数
+
+        参数:
+            alpha (float): 0为上一步的位置，1为当前位置
+        """
+        self.render_alpha = alpha
+
+    def _render_positions(self):
+        """绘制用的位置，在上一步和当前步之间插值"""
+        if self.render_alpha >= 1.0:
+            return self.positions
+        delta = self.positions - self.previous_positions
+        positions = self.previous_positions + delta * self.render_alpha
+        # 本步绕回另一边的粒子直接画在新位置，不从一边滑到另一边
+        left, bottom, right, top = self.bounds
+        half_extent = np.array([(right - left) / 2, (top - bottom) / 2], dtype=np.float32)
+        wrapped = (np.abs(delta) > half_extent).any(axis=1)
+        positions[wrapped] = self.positions[wrapped]
+        return positions
+
+    def _vertex_data(self):
+        """生成顶点数据，形状模板会把每个粒子展开成多个圆"""
+        positions = self._render_positions()
+        if self.template is None:
+            data = np.empty((self.count, _FLOATS_PER_VERTEX), dtype=np.float32)
+            data[:, 0:2] = positions
+            data[:, 2] = self.sizes
+            data[:, 3] = self.alphas / 255.0
+            return data
+
+        template = np.asarray(self.template, dtype=np.float32)
+        parts = len(template)
+        data = np.empty((self.count, parts, _FLOATS_PER_VERTEX), dtype=np.float32)
+        data[:, :, 0:2] = positions[:, None, :] + template[None, :, 0:2] * self.sizes[:, None, None]
+        data[:, :, 2] = self.sizes[:, None] * template[None, :, 2]
+        data[:, :, 3] = (self.alphas / 255.0)[:, None]
+        return data.reshape(-1, _FLOATS_PER_VERTEX)
+
+    def _ensure_gpu_resources(self, vertex_count):
+        """创建(或扩容)着色器、顶点缓冲和几何体"""
+        if self._ctx is None:
+            self._ctx = arcade.get_window().ctx
+            self._program = self._ctx.program(
+                vertex_shader=_VERTEX_SHADER, fragment_shader=_FRAGMENT_SHADER
+            )
+        if vertex_count > self._capacity:
+            self._capacity = vertex_count
+            self._buffer = self._ctx.buffer(reserve=vertex_count * _FLOATS_PER_VERTEX * 4)
+            self._geometry = self._ctx.geometry(
+                [BufferDescription(self._buffer, _VERTEX_FORMAT, ["in_pos", "in_size", "in_alpha"])],
+                mode=self._ctx.POINTS,
+            )
+
+    def draw(self, opacity=1.0):
+        """
+        用一次绘制调用画出所有粒子
+
+        参数:
+            opacity (float): 整体透明度(0~1)，与每个粒子的透明度相乘
+        """
+        if self.count == 0 or opacity <= 0:
+            return
+        data = self._vertex_data()
+        vertex_count = len(data)
+        self._ensure_gpu_resources(vertex_count)
+        self._buffer.write(data.tobytes())
+
+        ctx = self._ctx
+        self._program["projection"] = ctx.projection_2d
+        self._program["color"] = tuple(c / 255.0 for c in self.color[:3])
+        self._program["opacity"] = opacity
+        ctx.enable(ctx.BLEND, ctx.PROGRAM_POINT_SIZE)
+        self._geometry.render(self._program, vertices=vertex_count)
@@ -0,0 +1,139 @@
+"""
+自适应画质调节
+
+原来唯一的画质控制是R键切换分层渲染。集成显卡和软件渲染的机器上客厅经常掉帧。
+调节器记录实际重绘帧的绘制耗时，滚动平均超过时间预算时降一档画质，
+依次关闭: 次级阴影、灯光闪烁、灯罩内光晕、光照缓冲分辨率减半、全部阴影；
+耗时远低于预算时再升回一档。升档和降档的阈值之间留有余量，
+刚升档就被迫降回的档位要等更久才会再次尝试(等待时间逐次加倍)，避免在两档之间来回切换。
+"""
+from collections import deque, namedtuple
+
+# 默认的帧时间预算(毫秒)
+DEFAULT_BUDGET_MS = 1000.0 / 60
+
+# 一个画质档位
+#   secondary_shadows: 绘制阴影的次级(半影)多边形
+#   flicker: 吊灯随机闪烁
+#   glow_layers: 灯具内部的光晕层
+#   light_buffer_scale: 光照缓冲的分辨率缩放
+#   shadows: 绘制阴影
+QualityLevel = namedtuple(
+    "QualityLevel",
+    ["name", "secondary_shadows", "flicker", "glow_layers", "light_buffer_scale", "shadows"]
+)
+
+QUALITY_LEVELS = (
+    QualityLevel("完整", True, True, True, 1.0, True),
+    QualityLevel("无次级阴影", False, True, True, 1.0, True),
+    QualityLevel("无闪烁", False, False, True, 1.0, True),
+    QualityLevel("无光晕层", False, False, False, 1.0, True),
+    QualityLevel("半分辨率光照", False, False, False, 0.5, True),
+    QualityLevel("无阴影", False, False, False, 0.5, False),
+)
+
+
+class QualityGovernor:
+    """按滚动帧耗时调节画质档位"""
+
+    def __init__(self, budget_ms=DEFAULT_BUDGET_MS, window=60,
+                 downgrade_ratio=1.0, upgrade_ratio=0.6, upgrade_delay=120,
+                 on_change=None):
+        """
+        参数:
+            budget_ms (float): 帧时间预算(毫秒)
+            window (int): 滚动平均使用的帧数，换档后重新累积
+            downgrade_ratio (float): 平均耗时超过预算的这个倍数时降档
+            upgrade_ratio (float): 平均耗时低于预算的这个倍数时升档
+            upgrade_delay (int): 换档后至少再记录多少帧才允许升档
+            on_change (callable): 换档后调用on_change(level)
+        """
+        self.enabled = True
+        self.budget_ms = budget_ms
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.upgrade_delay = upgrade_delay
+        self.on_change = on_change
+
+        self.level_index = 0
+        self.samples = deque(maxlen=window)
+        self._frames_at_level = 0
+        # 每个档位升档前需要等待的帧数，升档后很快又降回来时加倍
+        self._hold = [upgrade_delay] * len(QUALITY_LEVELS)
+        self._upgraded_from = None
+        # 统计: 降档和升档次数
+        self.downgrades = 0
+        self.upgrades = 0
+
+    @property
+    def level(self):
+        """当前画质档位"""
+        return QUALITY_LEVELS[self.level_index]
+
+    def average_ms(self):
+        """滚动平均帧耗时(毫秒)，没有数据时为0"""
+        if not self.samples:
+            return 0.0
+        return sum(self.samples) / len(self.samples)
+
+    def set_enabled(self, enabled):
+        """开启或关闭自动调节，关闭时恢复完整画质"""
+        self.enabled = enabled
+        if not enabled:
+            self.set_level(0)
+
+    def set_level(self, index):
+        """
+        直接切换到某个档位
+
+        参数:
+            index (int): 档位序号，0为完整画质
+        """
+        index = min(max(index, 0), len(QUALITY_LEVELS) - 1)
+        self.samples.clear()
+        self._frames_at_level = 0
+        if index == self.level_index:
+            return
+        self.level_index = index
+        if self.on_change is not None:
+            self.on_change(self.level)
+
+    def record(self, frame_ms):
+        """
+        记录一帧的绘制耗时，需要时换档
+
+        参数:
+            frame_ms (float): 实际重绘一帧的耗时(毫秒)
+
+        返回:
+            bool: 是否换档
+        """
+        if not self.enabled:
+            return False
+        self.samples.append(frame_ms)
+        self._frames_at_level += 1
+        # 升档后稳定运行了一段时间，不再视为试探
+        if self._upgraded_from is not None and self._frames_at_level >= self.upgrade_delay:
+            self._upgraded_from = None
+        if len(self.samples) < self.samples.maxlen:
+            return False
+
+        average = self.average_ms()
+        if average > self.budget_ms * self.downgrade_ratio:
+            if self.level_index >= len(QUALITY_LEVELS) - 1:
+                return False
+            # 刚从下一档升上来又撑不住，下次在下一档多等一倍时间
+            if self._upgraded_from == self.level_index + 1:
+                self._hold[self.level_index + 1] *= 2
+            self._upgraded_from = None
+            self.downgrades += 1
+            self.set_level(self.level_index + 1)
+            return True
+
+        if (average < self.budget_ms * self.upgrade_ratio and self.level_index > 0
+                and self._frames_at_level >= self._hold[self.level_index]):
+            self._upgraded_from = self.level_index
+            self.upgrades += 1
+            self.set_level(self.level_index - 1)
+            return True
+        return False
@@ -0,0 +1,83 @@
+"""
+脏标记重绘调度
+
+场景没有任何变化时(灯光稳定、电视关闭、没有动画)不必每帧重新绘制整个场景。
+调度器把上一次绘制的结果保存在离屏渲染目标中：只有被标记为脏时才重新绘制场景，
+否则直接把上一帧贴回屏幕。物体通过mark_dirty()在点击、亮度过渡、动画等变化时通知调度器。
+"""
+import arcade
+
+from render_target import RenderTarget, window_samples
+
+
+class RedrawScheduler:
+    """脏标记重绘调度器"""
+
+    def __init__(self, window=None):
+        """
+        参数:
+            window: 所属窗口，默认使用当前窗口
+        """
+        self.window = window or arcade.get_window()
+        # 关闭后每帧都直接绘制场景，不经过帧缓存
+        self.enabled = True
+        self.frame = None
+        self._dirty = True
+        # 统计: 实际重绘的帧数和直接复用上一帧的帧数
+        self.frames_drawn = 0
+        self.frames_reused = 0
+
+    @property
+    def is_dirty(self):
+        return self._dirty
+
+    def mark_dirty(self):
+        """标记需要重绘"""
+        self._dirty = True
+
+    def track(self, obj):
+        """让物体的mark_dirty()通知这个调度器"""
+        obj.redraw_scheduler = self
+
+    def set_enabled(self, enabled):
+        """开启或关闭帧缓存，关闭时释放离屏目标"""
+        self.enabled = enabled
+        if not enabled:
+            self.frame = None
+        self._dirty = True
+
+    def _ensure_frame(self):
+        """创建(或按窗口尺寸重建)保存上一帧的渲染目标"""
+        width, height = self.window.get_size()
+        if self.frame is None or (self.frame.width, self.frame.height) != (width, height):
+            # 按实际帧缓冲分辨率保存，高分屏上不损失清晰度
+            scale = self.window.get_framebuffer_size()[0] / max(1, width)
+            # 与窗口相同的多重采样，缓存的帧不丢失抗锯齿
+            self.frame = RenderTarget(width, height, scale=scale, ctx=self.window.ctx,
+                                      samples=window_samples(self.window))
+            self._dirty = True
+
+    def draw(self, render):
+        """
+        绘制一帧
+
+        参数:
+            render (callable): 绘制完整场景的函数，只在需要重绘时调用
+        """
+        if not self.enabled:
+            render()
+            self.frames_drawn += 1
+            return
+
+        self._ensure_frame()
+        if self._dirty:
+            # 先清掉标记，绘制过程中产生的新变化留到下一帧处理
+            self._dirty = False
+            with self.frame.activate():
+                self.frame.clear(self.window.background_color)
+                render()
+            self.frames_drawn += 1
+        else:
+            self.frames_reused += 1
+
+        self.frame.draw(blend=RenderTarget.BLEND_REPLACE)
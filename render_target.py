@@ -0,0 +1,205 @@
+"""
+离屏渲染目标
+
+封装一个帧缓冲及其颜色纹理：可以把任意arcade绘制调用渲染进去，
+再用一个带纹理的四边形把结果合成回屏幕(或另一个渲染目标)。
+"""
+from contextlib import contextmanager
+
+import arcade
+from arcade.gl import geometry
+
+from draw_stats import get_draw_stats
+
+_VERTEX_SHADER = """
+#version 330
+
+// 目标矩形的标准化设备坐标: x0, y0, x1, y1
+uniform vec4 rect;
+
+in vec2 in_vert;
+in vec2 in_uv;
+
+out vec2 uv;
+
+void main() {
+    gl_Position = vec4(mix(rect.xy, rect.zw, in_uv), 0.0, 1.0);
+    uv = in_uv;
+}
+"""
+
+_FRAGMENT_SHADER = """
+#version 330
+
+uniform sampler2D source;
+uniform float alpha;
+
+in vec2 uv;
+
+out vec4 fragColor;
+
+void main() {
+    vec4 color = texture(source, uv);
+    fragColor = vec4(color.rgb, color.a * alpha);
+}
+"""
+
+# 每个OpenGL上下文共享一份着色器和四边形
+_shared_resources = {}
+
+
+def _get_shared_resources(ctx):
+    """返回(program, quad)，按上下文懒加载"""
+    resources = _shared_resources.get(id(ctx))
+    if resources is None:
+        program = ctx.program(vertex_shader=_VERTEX_SHADER, fragment_shader=_FRAGMENT_SHADER)
+        quad = geometry.quad_2d_fs()
+        resources = (program, quad)
+        _shared_resources[id(ctx)] = resources
+    return resources
+
+
+class RenderTarget:
+    """离屏渲染目标"""
+
+    # 混合模式名称
+    BLEND_ALPHA = "alpha"            # 普通透明度混合
+    BLEND_ADDITIVE = "additive"      # 按透明度加亮: dst + src.rgb * src.a
+    BLEND_ADD = "add"                # 直接相加: dst + src.rgb
+    BLEND_REPLACE = "replace"        # 不混合，直接覆盖
+    BLEND_PREMULTIPLIED = "premultiplied"  # 源为预乘透明度: src.rgb + dst * (1 - src.a)
+    BLEND_TRANSMIT = "transmit"      # 记录透过率: dst * (1 - src.a)
+    BLEND_MULTIPLY = "multiply"      # 相乘: dst * src.rgb
+
+    def __init__(self, width, height, scale=1.0, ctx=None, samples=0):
+        """
+        参数:
+            width (int): 逻辑宽度(屏幕坐标)
+            height (int): 逻辑高度(屏幕坐标)
+            scale (float): 分辨率缩放，小于1时以更低分辨率渲染
+            ctx: OpenGL上下文，默认使用当前窗口的上下文
+            samples (int): 多重采样数，大于0时先画进多重采样缓冲，activate结束时解析到纹理，
+                图元边缘与开了抗锯齿的窗口一致(见window_samples)
+        """
+        self.ctx = ctx or arcade.get_window().ctx
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.samples = samples
+        self.texture = None
+        self.fbo = None
+        # 多重采样时实际绘制的帧缓冲
+        self._msaa_fbo = None
+        self._create()
+
+    def _create(self):
+        size = (max(1, int(self.width * self.scale)), max(1, int(self.height * self.scale)))
+        self.texture = self.ctx.texture(size, components=4)
+        self.fbo = self.ctx.framebuffer(color_attachments=[self.texture])
+        if self.samples:
+            msaa_texture = self.ctx.texture(size, components=4, samples=self.samples)
+            self._msaa_fbo = self.ctx.framebuffer(color_attachments=[msaa_texture])
+
+    def set_scale(self, scale):
+        """修改分辨率缩放，需要时重建帧缓冲"""
+        if scale != self.scale:
+            self.scale = scale
+            self._create()
+
+    def blend_function(self, blend):
+        """把混合模式名称转换为OpenGL混合函数"""
+        ctx = self.ctx
+        if blend == self.BLEND_ADDITIVE:
+            return ctx.SRC_ALPHA, ctx.ONE
+        if blend == self.BLEND_ADD:
+            return ctx.ONE, ctx.ONE
+        if blend == self.BLEND_PREMULTIPLIED:
+            return ctx.ONE, ctx.ONE_MINUS_SRC_ALPHA
+        if blend == self.BLEND_TRANSMIT:
+            return ctx.ZERO, ctx.ONE_MINUS_SRC_ALPHA
+        if blend == self.BLEND_MULTIPLY:
+            return ctx.ZERO, ctx.SRC_COLOR
+        return ctx.BLEND_DEFAULT
+
+    @contextmanager
+    def activate(self, blend=None, projection=None):
+        """
+        把后续的绘制调用渲染到这个目标中
+
+        参数:
+            blend (str): 渲染期间使用的混合模式，默认保持当前模式
+            projection (tuple): 渲染期间使用的投影(left, right, bottom, top)，
+                默认保持当前投影；目标小于屏幕时用它把屏幕上的一块区域映射到整个目标
+        """
+        previous_blend = self.ctx.blend_func
+        previous_projection = self.ctx.projection_2d
+        with (self._msaa_fbo or self.fbo).activate():
+            if blend is not None:
+                # pyglet的文字绘制结束时会直接关闭混合，这里重新打开
+                self.ctx.enable(self.ctx.BLEND)
+                self.ctx.blend_func = self.blend_function(blend)
+            if projection is not None:
+                self.ctx.projection_2d = projection
+            try:
+                yield self
+            finally:
+                self.ctx.blend_func = previous_blend
+                if projection is not None:
+                    self.ctx.projection_2d = previous_projection
+        if self._msaa_fbo is not None:
+            self.ctx.copy_framebuffer(self._msaa_fbo, self.fbo)
+
+    def clear(self, color=(0, 0, 0, 0)):
+        """清空目标"""
+        self.fbo.clear(color)
+        if self._msaa_fbo is not None:
+            self._msaa_fbo.clear(color)
+
+    def draw(self, left=0, bottom=0, width=None, height=None, blend=BLEND_ALPHA, alpha=1.0):
+        """
+        把目标内容绘制到当前帧缓冲
+
+        参数:
+            left, bottom (float): 目标矩形左下角(屏幕坐标)
+            width, height (float): 目标矩形尺寸，默认为逻辑尺寸
+            blend (str): 合成时使用的混合模式
+            alpha (float): 整体透明度
+        """
+        width = self.width if width is None else width
+        height = self.height if height is None else height
+
+        # 屏幕坐标转换为标准化设备坐标
+        proj_left, proj_right, proj_bottom, proj_top = self.ctx.projection_2d
+        sx = 2.0 / (proj_right - proj_left)
+        sy = 2.0 / (proj_top - proj_bottom)
+        x0 = (left - proj_left) * sx - 1.0
+        y0 = (bottom - proj_bottom) * sy - 1.0
+        x1 = (left + width - proj_left) * sx - 1.0
+        y1 = (bottom + height - proj_bottom) * sy - 1.0
+
+        program, quad = _get_shared_resources(self.ctx)
+        program["rect"] = x0, y0, x1, y1
+        program["alpha"] = alpha
+        self.texture.use(0)
+
+        previous_blend = self.ctx.blend_func
+        if blend == self.BLEND_REPLACE:
+            self.ctx.disable(self.ctx.BLEND)
+        else:
+            self.ctx.enable(self.ctx.BLEND)
+            self.ctx.blend_func = self.blend_function(blend)
+        quad.render(program)
+        self.ctx.enable(self.ctx.BLEND)
+        self.ctx.blend_func = previous_blend
+        get_draw_stats().record("RenderTarget.draw", 4)
+
+
+def window_samples(window=None):
+    """
+    窗口帧缓冲的多重采样数(没有抗锯齿时为0)
+
+    烘焙进离屏目标再贴回屏幕的内容用同样的采样数渲染，边缘才与直接画在屏幕上一致。
+    """
+    window = window or arcade.get_window()
+    config = getattr(window, "config", None)
+    return getattr(config, "samples", 0) or 0
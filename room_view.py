@@ -2,6 +2,10 @@ import arcade
 # 从interactive_room_game导入需要的类和常量，而不是整个模块
 from interactive_room_game import Television, RemoteControl, SCREEN_WIDTH, SCREEN_HEIGHT
 from extensions import GameConsole, Radio, Bookshelf
+from spatial_index import SpatialIndex
+from log_utils import get_logger
+
+logger = get_logger(__name__)
 
 class RoomGameView(arcade.View):
     """90后童年房间游戏视图，继承自arcade.View而非arcade.Window"""
@@ -46,20 +50,25 @@ class RoomGameView(arcade.View):
                 self.radio: self._handle_radio,
                 self.bookshelf: self._handle_bookshelf
             }
+        
+        # 点击检测使用空间索引
+        self.spatial_index = SpatialIndex()
+        for obj in self.interactive_objects:
+            self.spatial_index.insert(obj)
     
     def on_draw(self):
         """渲染游戏画面"""
         arcade.start_render()
         
         # 绘制背景墙壁
-        arcade.draw_rect_filled(
-            arcade.rect.XYWH(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, SCREEN_WIDTH, SCREEN_HEIGHT),
+        arcade.draw_rectangle_filled(
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, SCREEN_WIDTH, SCREEN_HEIGHT,
             color=arcade.color.LIGHT_BLUE
         )
         
         # 绘制地板
-        arcade.draw_rect_filled(
-            arcade.rect.XYWH(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4, SCREEN_WIDTH, SCREEN_HEIGHT // 2),
+        arcade.draw_rectangle_filled(
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4, SCREEN_WIDTH, SCREEN_HEIGHT // 2,
             color=arcade.color.LIGHT_BROWN
         )
         
@@ -99,29 +108,28 @@ class RoomGameView(arcade.View):
     
     def on_mouse_press(self, x, y, button, modifiers):
         """鼠标点击事件处理"""
+        hits = self.spatial_index.query_point(x, y)
+        
         # 基础版直接处理点击
         if not self.enhanced:
             # 检查点击的是否为遥控器
-            if self.remote.is_clicked(x, y):
+            if self.remote in hits:
                 self.tv.change_channel()
             
             # 检查其他交互对象
-            for obj in self.interactive_objects:
-                if obj.is_clicked(x, y):
-                    obj.on_click()
+            for obj in hits:
+                obj.on_click()
             return
         
         # 增强版处理特殊交互
         for obj, handler in self.special_interactions.items():
-            if obj.is_clicked(x, y):
+            if obj in hits:
                 handler(x, y)
                 return
         
         # 处理普通交互对象
-        for obj in self.interactive_objects:
-            if obj.is_clicked(x, y):
-                obj.on_click()
-                break
+        if hits:
+            hits[0].on_click()
     
     def _handle_remote(self, x, y):
         """处理遥控器交互"""
@@ -182,8 +190,8 @@ class RoomGameView(arcade.View):
     def on_show_view(self):
         """显示视图时调用"""
         arcade.set_background_color(arcade.color.BEIGE)
-        print("RoomGameView已显示")
+        logger.debug("RoomGameView已显示")
     
     def on_hide_view(self):
         """隐藏视图时调用"""
-        print("RoomGameView已隐藏") 
\ No newline at end of file
+        logger.debug("RoomGameView已隐藏") 
\ No newline at end of file
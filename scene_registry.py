@@ -0,0 +1,50 @@
+"""
+场景注册表
+
+场景选择只需要知道有哪些场景，不必在启动时就导入所有场景模块。
+这里登记每个场景所在的模块和类名，第一次进入场景时才导入对应模块。
+"""
+import importlib
+
+# 场景键 -> (模块名, 类名, 显示名称)，按在场景选择中的顺序排列
+SCENES = {
+    "childhood_room": ("interactive_room_game", "ChildhoodRoom", "童年房间"),
+    "enhanced_room": ("enhanced_game", "EnhancedChildhoodRoom", "增强版房间"),
+    "living_room": ("living_room_scene", "LivingRoom", "客厅场景"),
+}
+
+_loaded_classes = {}
+
+
+def scene_title(key):
+    """场景的显示名称"""
+    return SCENES[key][2]
+
+
+def is_loaded(key):
+    """场景模块是否已经导入"""
+    return key in _loaded_classes
+
+
+def get_scene_class(key):
+    """
+    取得场景类，第一次调用时导入所在模块
+
+    参数:
+        key (str): 场景键
+
+    返回:
+        type: 场景视图类
+    """
+    scene_class = _loaded_classes.get(key)
+    if scene_class is None:
+        module_name, class_name, _ = SCENES[key]
+        module = importlib.import_module(module_name)
+        scene_class = getattr(module, class_name)
+        _loaded_classes[key] = scene_class
+    return scene_class
+
+
+def create_scene(key, *args, **kwargs):
+    """创建场景视图，参数原样传给场景类"""
+    return get_scene_class(key)(*args, **kwargs)
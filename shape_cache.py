@@ -0,0 +1,42 @@
+"""
+静态几何缓存
+
+物体中不会变化的图元(矩形、圆、线)只在第一次绘制时构建进一个
+arcade.ShapeElementList，之后每帧只需要一次draw调用。
+只有缓存键(位置、尺寸、颜色等)变化时才会重建。
+"""
+import arcade
+
+
+class ShapeCache:
+    """单个物体的静态图元缓存"""
+
+    def __init__(self):
+        self.shape_list = None
+        self.key = None
+        self.build_count = 0  # 重建次数，便于调试
+
+    def draw(self, key, build):
+        """
+        绘制缓存的图元，缓存键变化时先重建
+
+        参数:
+            key (tuple): 缓存键，所有影响静态图元的属性都应包含在内
+            build (callable): 构建函数，接收一个ShapeElementList并向其中添加图元
+        """
+        if self.shape_list is None or key != self.key:
+            self.shape_list = arcade.ShapeElementList()
+            build(self.shape_list)
+            self.key = key
+            self.build_count += 1
+        self.shape_list.draw()
+
+    def invalidate(self):
+        """强制下次绘制时重建"""
+        self.shape_list = None
+        self.key = None
+
+
+def create_circle_filled(center_x, center_y, radius, color):
+    """创建实心圆图元，参数与arcade.draw_circle_filled一致"""
+    return arcade.create_ellipse_filled(center_x, center_y, radius * 2, radius * 2, color)
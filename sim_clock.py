@@ -0,0 +1,69 @@
+"""
+固定步长模拟时钟
+
+动画原来按帧推进(每帧亮度+0.05、透明度+2)，30帧时慢一半，144Hz时快一倍。
+场景把真实经过的时间交给时钟，时钟按固定步长(默认1/60秒)调用模拟函数，
+不足一步的时间累积到下一帧；render_alpha是剩余时间占一步的比例，
+绘制时在上一步和当前步的状态之间按它插值，刷新率高于模拟频率时动画依然平滑。
+某一帧耗时很长时下一帧会连续模拟多步追上真实时间，世界不会因为少画几帧而变慢。
+"""
+
+# 模拟步长(秒)
+SIM_STEP = 1 / 60
+
+# 每帧最多模拟的步数，卡顿太久时丢弃多出的时间，避免越追越慢
+MAX_STEPS_PER_FRAME = 8
+
+
+class SimulationClock:
+    """固定步长累加器"""
+
+    def __init__(self, step=SIM_STEP, max_steps=MAX_STEPS_PER_FRAME):
+        """
+        参数:
+            step (float): 模拟步长(秒)
+            max_steps (int): 每帧最多模拟的步数
+        """
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        # 剩余时间占一步的比例，用于渲染插值
+        self.render_alpha = 0.0
+        # 模拟世界经过的总时间
+        self.time = 0.0
+        # 统计: 总步数和因卡顿丢弃的时间(秒)
+        self.steps = 0
+        self.dropped_time = 0.0
+
+    def advance(self, delta_time, simulate):
+        """
+        累加真实经过的时间，按固定步长调用simulate(step)
+
+        参数:
+            delta_time (float): 自上一帧以来的真实时间(秒)
+            simulate (callable): 推进一步模拟的函数，参数是步长
+
+        返回:
+            int: 本帧模拟的步数(可能为0)
+        """
+        self.accumulator += delta_time
+        steps = 0
+        while self.accumulator >= self.step:
+            if steps >= self.max_steps:
+                dropped = self.accumulator - self.accumulator % self.step
+                self.dropped_time += dropped
+                self.accumulator -= dropped
+                break
+            simulate(self.step)
+            self.accumulator -= self.step
+            self.time += self.step
+            steps += 1
+        self.steps += steps
+        self.render_alpha = self.accumulator / self.step
+        return steps
+
+    def reset(self):
+        """清空累积的时间(例如切换回场景时，不补算隐藏期间的时间)"""
+        self.accumulator = 0.0
+        self.render_alpha = 0.0
+
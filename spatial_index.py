@@ -0,0 +1,104 @@
+"""
+空间索引
+
+把可交互物体的包围盒登记到均匀网格中，点击和悬停检测只需要检查
+鼠标所在格子里的少数物体，而不是逐个遍历整个场景。
+"""
+import math
+from collections import defaultdict
+
+
+class SpatialIndex:
+    """均匀网格空间索引，物体需要有x、y、width、height属性和is_clicked方法"""
+
+    def __init__(self, cell_size=64):
+        """
+        参数:
+            cell_size (float): 网格边长
+        """
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+        # 物体 -> (z序, 所在格子列表)
+        self._entries = {}
+        self._next_z = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, obj):
+        return obj in self._entries
+
+    def _cell_range(self, obj):
+        """物体包围盒覆盖的所有格子"""
+        size = self.cell_size
+        min_cx = math.floor((obj.x - obj.width / 2) / size)
+        max_cx = math.floor((obj.x + obj.width / 2) / size)
+        min_cy = math.floor((obj.y - obj.height / 2) / size)
+        max_cy = math.floor((obj.y + obj.height / 2) / size)
+        return [(cx, cy)
+                for cx in range(min_cx, max_cx + 1)
+                for cy in range(min_cy, max_cy + 1)]
+
+    def insert(self, obj, z=None):
+        """
+        登记物体
+
+        参数:
+            obj: 要登记的物体
+            z (int): 物体的z序，默认按登记顺序递增(与绘制顺序一致)
+        """
+        if obj in self._entries:
+            self.remove(obj)
+        if z is None:
+            z = self._next_z
+        self._next_z = max(self._next_z, z + 1)
+
+        cells = self._cell_range(obj)
+        for cell in cells:
+            self._cells[cell].append(obj)
+        self._entries[obj] = (z, cells)
+        obj.spatial_index = self
+
+    def remove(self, obj):
+        """移除物体"""
+        entry = self._entries.pop(obj, None)
+        if entry is None:
+            return
+        for cell in entry[1]:
+            bucket = self._cells[cell]
+            bucket.remove(obj)
+            if not bucket:
+                del self._cells[cell]
+        obj.spatial_index = None
+
+    def update(self, obj):
+        """物体移动或改变尺寸后重新登记，保持原有z序"""
+        entry = self._entries.get(obj)
+        if entry is None:
+            return
+        self.insert(obj, entry[0])
+
+    def query_point(self, x, y):
+        """
+        查询包含某点的所有物体
+
+        返回:
+            list: 按z序从小到大排列的物体(与绘制顺序一致)
+        """
+        size = self.cell_size
+        bucket = self._cells.get((math.floor(x / size), math.floor(y / size)))
+        if not bucket:
+            return []
+        hits = [obj for obj in bucket if obj.is_clicked(x, y)]
+        hits.sort(key=lambda obj: self._entries[obj][0])
+        return hits
+
+    def first_at(self, x, y):
+        """返回包含某点、z序最小的物体，没有则返回None"""
+        hits = self.query_point(x, y)
+        return hits[0] if hits else None
+
+    def topmost_at(self, x, y):
+        """返回包含某点、z序最大(最上层)的物体，没有则返回None"""
+        hits = self.query_point(x, y)
+        return hits[-1] if hits else None
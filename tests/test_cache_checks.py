@@ -0,0 +1,44 @@
+"""
+缓存路径与直接绘制的画面一致性
+
+在子进程中以无窗口模式运行benchmark.py --check-caches(需要EGL)，
+每项检查都不能有超出允许差值的像素。
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def cache_checks():
+    """检查名 -> debug_tools.compare_renders的结果"""
+    proc = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "benchmark.py"), "--check-caches", "--headless"],
+        capture_output=True, text=True, cwd=ROOT, timeout=600,
+    )
+    lines = proc.stdout.strip().splitlines()
+    assert lines, proc.stderr
+    return {result["check"]: result for result in json.loads(lines[-1])}
+
+
+@pytest.mark.parametrize("check", ["lightmap", "lightmap_light_buffer"])
+def test_lightmap_matches_live_lighting(cache_checks, check):
+    result = cache_checks[check]
+    assert result["over_tolerance"] == 0, result
+
+
+def test_computer_desktop_matches_direct_draw(cache_checks):
+    result = cache_checks["computer_desktop"]
+    # 离屏目标与窗口的采样数相同、按帧缓冲分辨率一比一贴回，应当逐像素一致
+    assert result["over_tolerance"] == 0, result
+    assert result["max_diff"] <= 2, result
+
+
+def test_redraw_frame_keeps_antialiasing(cache_checks):
+    result = cache_checks["redraw_frame"]
+    assert result["over_tolerance"] == 0, result
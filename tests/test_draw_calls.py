@@ -0,0 +1,48 @@
+"""
+圆形批次的绘制调用次数
+
+在子进程中以无窗口模式运行benchmark.py(关闭帧缓存，每帧都完整绘制，需要EGL)，
+用DrawStats统计的每帧调用次数确认圆形都经过共享批次、同一物体的圆合并成一次绘制。
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 每帧CircleBatch.flush次数的上限(灯光闪烁时个别帧的圆多一些，取平均值)
+MAX_CIRCLE_FLUSHES = {
+    "living_room_deferred": 6.5,
+    "living_room_simple": 4.0,
+    "game_manager_login": 2.0,
+    "game_manager_bedroom": 3.5,
+    "game_manager_game": 3.0,
+    "bedroom_view": 3.0,
+    "login_view": 2.0,
+    "room_view": 3.0,
+    "enhanced_room": 3.0,
+}
+
+
+@pytest.fixture(scope="module")
+def draw_calls():
+    """场景名 -> 每帧按函数统计的平均调用次数"""
+    proc = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "benchmark.py"), "--headless",
+         "--frames", "20", "--warmup", "2", "--no-redraw-cache"],
+        capture_output=True, text=True, cwd=ROOT, timeout=600,
+    )
+    lines = proc.stdout.strip().splitlines()
+    assert proc.returncode == 0 and lines, proc.stderr
+    return {result["scene"]: result["draw_calls"]["by_function"] for result in json.loads(lines[-1])}
+
+
+@pytest.mark.parametrize("scene", sorted(MAX_CIRCLE_FLUSHES))
+def test_circles_go_through_batch(draw_calls, scene):
+    by_function = draw_calls[scene]
+    assert "draw_circle_filled" not in by_function, by_function
+    assert "draw_ellipse_filled" not in by_function, by_function
+    assert by_function.get("CircleBatch.flush", 0) <= MAX_CIRCLE_FLUSHES[scene], by_function
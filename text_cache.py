@@ -0,0 +1,107 @@
+"""
+文字对象缓存
+
+arcade.draw_text每次调用都会重新排版字形，中文文本尤其昂贵。
+这里把排好版的arcade.Text对象按(文字, 字体, 字号, 颜色, 锚点, 宽度, 对齐)缓存起来，
+跨帧复用，按LRU淘汰。位置和透明度变化时只更新对应属性，不重新排版。
+"""
+from collections import OrderedDict
+
+import arcade
+
+# 与arcade.draw_text一致的默认字体
+DEFAULT_FONT_NAME = ("calibri", "arial")
+
+
+class TextCache:
+    """按LRU淘汰的arcade.Text缓存"""
+
+    def __init__(self, max_size=256):
+        """
+        参数:
+            max_size (int): 最多保留的文字对象数量
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # 可选的帧分析器，设置后文字绘制耗时计入其"text"阶段
+        self.profiler = None
+        # 可选的回调，创建新文字对象时以(文字, 字体, 字号, 粗体, 斜体)调用，供字形预热统计未命中
+        self.on_miss = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, text, color, font_size, width, align, font_name,
+            bold, italic, anchor_x, anchor_y, multiline, rotation):
+        """
+        取出(必要时创建)一个文字对象
+
+        返回:
+            arcade.Text: 已排版的文字对象，位置和透明度由调用方更新
+        """
+        # 透明度不参与缓存键，淡入淡出时只需要修改颜色
+        key = (text, font_name, font_size, bold, italic, tuple(color[:3]),
+               anchor_x, anchor_y, width, align, multiline, rotation)
+        text_obj = self._entries.get(key)
+        if text_obj is None:
+            self.misses += 1
+            if self.on_miss is not None:
+                self.on_miss(text, font_name, font_size, bold, italic)
+            text_obj = arcade.Text(
+                text, 0, 0, color, font_size,
+                width=width, align=align, font_name=font_name,
+                bold=bold, italic=italic,
+                anchor_x=anchor_x, anchor_y=anchor_y,
+                multiline=multiline, rotation=rotation
+            )
+            self._entries[key] = text_obj
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return text_obj
+
+    def draw_text(self, text, start_x, start_y, color=arcade.color.WHITE, font_size=12,
+                  width=0, align="left", font_name=DEFAULT_FONT_NAME,
+                  bold=False, italic=False, anchor_x="left", anchor_y="baseline",
+                  multiline=False, rotation=0):
+        """绘制文字，参数与arcade.draw_text一致"""
+        text_obj = self.get(text, color, font_size, width, align, font_name,
+                            bold, italic, anchor_x, anchor_y, multiline, rotation)
+
+        # 只在位置变化时更新位置
+        if text_obj.x != start_x or text_obj.y != start_y:
+            text_obj.position = (start_x, start_y)
+
+        # 只在透明度变化时更新颜色
+        alpha = color[3] if len(color) == 4 else 255
+        if text_obj.color[3] != alpha:
+            text_obj.color = (color[0], color[1], color[2], alpha)
+
+        text_obj.draw()
+
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
+
+
+# 全局共享的文字缓存
+_default_cache = TextCache()
+
+
+def get_text_cache():
+    """返回全局共享的文字缓存"""
+    return _default_cache
+
+
+def draw_cached_text(*args, **kwargs):
+    """使用全局缓存绘制文字，可直接替换arcade.draw_text"""
+    profiler = _default_cache.profiler
+    if profiler is None:
+        _default_cache.draw_text(*args, **kwargs)
+        return
+    with profiler.phase("text"):
+        _default_cache.draw_text(*args, **kwargs)
@@ -0,0 +1,207 @@
+"""
+纹理内存预算管理
+
+通过asset_loader加载的纹理默认一直驻留到进程结束。房间背景越来越多之后不能全部常驻，
+这里在加载器之上按场景(或视图、物体)记录引用，超出内存预算时按最近最少使用的顺序淘汰纹理:
+先淘汰没有任何引用的，仍然超出时再淘汰有引用的。被淘汰的纹理在下一次使用时自动重新加载，
+重新加载完成前调用方照常使用颜色绘制。
+"""
+import os
+from collections import OrderedDict
+
+from asset_loader import get_asset_loader
+
+# 默认预算: 128MB，约等于40张1024x768的RGBA纹理
+DEFAULT_BUDGET_BYTES = 128 * 1024 * 1024
+
+
+class ManagedTexture:
+    """受预算管理的纹理，接口与TextureHandle一致，被淘汰后下次使用时自动重新加载"""
+
+    def __init__(self, manager, path, size=None):
+        self.manager = manager
+        self.path = path
+        self.size = size
+        self.owners = set()
+        self.nbytes = 0
+        self._handle = None
+        self._callbacks = []
+
+    @property
+    def resident(self):
+        """纹理当前是否驻留在内存中"""
+        return self._handle is not None and self._handle.ready
+
+    @property
+    def ready(self):
+        if self._handle is None:
+            # 已被淘汰，使用时重新加载
+            self.manager._load(self)
+        return self._handle.ready
+
+    @property
+    def failed(self):
+        return self._handle is not None and self._handle.failed
+
+    @property
+    def texture(self):
+        """取得纹理并记为最近使用，未就绪时为None"""
+        if not self.ready:
+            return None
+        self.manager._touch(self)
+        return self._handle.texture
+
+    def add_ready_callback(self, callback):
+        """
+        纹理就绪后调用callback(texture)，已就绪时立即调用
+
+        被淘汰后重新加载完成时会再次调用
+        """
+        self._callbacks.append(callback)
+        if self.resident:
+            callback(self)
+
+    def _on_ready(self, handle):
+        if handle is not self._handle:
+            # 淘汰前发出的旧请求
+            return
+        self.nbytes = handle.texture.width * handle.texture.height * 4
+        self.manager._on_loaded(self)
+        for callback in list(self._callbacks):
+            callback(self)
+
+
+class TextureManager:
+    """按引用计数和LRU顺序管理纹理内存"""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, loader=None):
+        """
+        参数:
+            budget_bytes (int): 驻留纹理的字节预算
+            loader (AssetLoader): 纹理加载器，默认使用全局加载器
+        """
+        self.budget_bytes = budget_bytes
+        self.loader = loader or get_asset_loader()
+        # (路径, 尺寸) -> ManagedTexture，按最近使用排序(末尾最新)
+        self._textures = OrderedDict()
+        self.resident_bytes = 0
+        # 统计: 淘汰次数和重新加载次数
+        self.evictions = 0
+        self.reloads = 0
+
+    def acquire(self, path, owner, size=None):
+        """
+        取得纹理并记录owner的引用
+
+        参数:
+            path (str): 图片路径
+            owner: 引用者，通常是场景、视图或物体
+            size (tuple): 显示尺寸(宽, 高)，默认使用asset_cache中的配置
+
+        返回:
+            ManagedTexture: 同一路径、同一尺寸返回同一个对象
+        """
+        path = os.path.abspath(path)
+        key = (path, tuple(size) if size else None)
+        texture = self._textures.get(key)
+        if texture is None:
+            texture = ManagedTexture(self, path, key[1])
+            self._textures[key] = texture
+            self._load(texture)
+        texture.owners.add(owner)
+        return texture
+
+    def retain(self, texture, owner):
+        """重新记录owner对已取得的纹理的引用"""
+        texture.owners.add(owner)
+
+    def release(self, owner, texture=None):
+        """
+        释放owner的引用，纹理仍然可用，只是超出预算时优先被淘汰
+
+        参数:
+            owner: 引用者
+            texture (ManagedTexture): 只释放这一张，默认释放owner引用的全部纹理
+        """
+        textures = [texture] if texture is not None else self._textures.values()
+        for item in textures:
+            item.owners.discard(owner)
+        self._enforce_budget()
+
+    def set_budget(self, budget_bytes):
+        """修改预算，立即淘汰超出的部分"""
+        self.budget_bytes = budget_bytes
+        self._enforce_budget()
+
+    def report(self):
+        """
+        当前驻留情况
+
+        返回:
+            dict: resident_bytes/budget_bytes/evictions/reloads，以及textures中每张纹理的
+                  路径、字节数、引用数和是否驻留(按最近使用排序，最新的在最后)
+        """
+        return {
+            "resident_bytes": self.resident_bytes,
+            "budget_bytes": self.budget_bytes,
+            "evictions": self.evictions,
+            "reloads": self.reloads,
+            "textures": [
+                {
+                    "path": texture.path,
+                    "size": texture.size,
+                    "bytes": texture.nbytes,
+                    "owners": len(texture.owners),
+                    "resident": texture.resident,
+                }
+                for texture in self._textures.values()
+            ],
+        }
+
+    def _load(self, texture):
+        """请求加载(或重新加载)纹理"""
+        if texture.nbytes:
+            self.reloads += 1
+        texture._handle = self.loader.load(texture.path, texture.size)
+        texture._handle.add_ready_callback(texture._on_ready)
+
+    def _touch(self, texture):
+        self._textures.move_to_end((texture.path, texture.size))
+
+    def _on_loaded(self, texture):
+        self.resident_bytes += texture.nbytes
+        self._touch(texture)
+        self._enforce_budget(keep=texture)
+
+    def _evict(self, texture):
+        if not self.loader.unload(texture.path, texture.size):
+            return False
+        texture._handle = None
+        self.resident_bytes -= texture.nbytes
+        self.evictions += 1
+        return True
+
+    def _enforce_budget(self, keep=None):
+        """超出预算时淘汰纹理: 先淘汰没有引用的，再淘汰有引用的，都按最近最少使用的顺序"""
+        if self.resident_bytes <= self.budget_bytes:
+            return
+        for referenced in (False, True):
+            for texture in list(self._textures.values()):
+                if self.resident_bytes <= self.budget_bytes:
+                    return
+                if texture is keep or not texture.resident:
+                    continue
+                if bool(texture.owners) == referenced:
+                    self._evict(texture)
+
+
+# 全局共享的纹理管理器
+_default_manager = None
+
+
+def get_texture_manager():
+    """返回全局共享的纹理管理器"""
+    global _default_manager
+    if _default_manager is None:
+        _default_manager = TextureManager()
+    return _default_manager
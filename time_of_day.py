@@ -0,0 +1,91 @@
+"""
+昼夜光照
+
+卧室背景、窗外天空和环境色调原来按6:00/19:00硬切换。这里预先把24小时的关键帧
+插值成每分钟一项的查找表(1440项)，每帧按game_time的分钟数直接取表，O(1)且没有插值计算。
+表中的day_weight是白天背景的权重，绘制时先画夜晚背景，再按这个权重半透明地叠加白天背景，
+由GPU混合完成交叉淡入淡出，CPU不做任何图片合成。
+"""
+from collections import namedtuple
+
+MINUTES_PER_DAY = 24 * 60
+
+# 一分钟的光照状态
+#   sky: 窗外天空颜色
+#   ambient: 叠加在整个房间上的环境色调(RGBA，透明度为0时不叠加)
+#   window: 窗框颜色(随环境光变暗)
+#   day_weight: 白天背景的权重(0为夜晚，1为白天)
+TimeSample = namedtuple("TimeSample", ["minute", "sky", "ambient", "window", "day_weight"])
+
+# 关键帧: (小时, 天空, 环境色调, 窗框, 白天权重)，相邻关键帧之间线性插值
+DEFAULT_KEYFRAMES = (
+    (0.0, (15, 20, 70), (20, 30, 90, 30), (90, 50, 20), 0.0),
+    (5.0, (15, 20, 70), (20, 30, 90, 30), (90, 50, 20), 0.0),
+    (5.5, (70, 60, 120), (120, 80, 120, 50), (110, 60, 25), 0.0),
+    (6.0, (250, 160, 110), (255, 150, 90, 45), (140, 75, 30), 0.5),
+    (6.5, (170, 200, 235), (255, 220, 180, 15), (160, 85, 35), 1.0),
+    (7.0, (135, 206, 235), (255, 255, 255, 0), (165, 42, 42), 1.0),
+    (17.5, (135, 206, 235), (255, 255, 255, 0), (165, 42, 42), 1.0),
+    (18.5, (250, 120, 80), (255, 130, 60, 50), (140, 70, 30), 1.0),
+    (19.0, (150, 70, 110), (160, 70, 110, 55), (110, 60, 25), 0.5),
+    (19.5, (40, 35, 95), (40, 40, 110, 40), (95, 52, 22), 0.0),
+    (20.0, (15, 20, 70), (20, 30, 90, 30), (90, 50, 20), 0.0),
+    (24.0, (15, 20, 70), (20, 30, 90, 30), (90, 50, 20), 0.0),
+)
+
+
+def _lerp(a, b, t):
+    return a + (b - a) * t
+
+
+def _lerp_color(a, b, t):
+    return tuple(int(round(_lerp(x, y, t))) for x, y in zip(a, b))
+
+
+def build_lut(keyframes=DEFAULT_KEYFRAMES):
+    """
+    把关键帧插值成每分钟一项的查找表
+
+    参数:
+        keyframes (tuple): 按小时升序排列的关键帧，首尾应覆盖0和24点
+
+    返回:
+        list: MINUTES_PER_DAY个TimeSample
+    """
+    lut = []
+    index = 0
+    for minute in range(MINUTES_PER_DAY):
+        hour = minute / 60
+        while index < len(keyframes) - 2 and keyframes[index + 1][0] <= hour:
+            index += 1
+        start, end = keyframes[index], keyframes[index + 1]
+        span = end[0] - start[0]
+        t = (hour - start[0]) / span if span > 0 else 0.0
+        t = min(max(t, 0.0), 1.0)
+        lut.append(TimeSample(
+            minute=minute,
+            sky=_lerp_color(start[1], end[1], t),
+            ambient=_lerp_color(start[2], end[2], t),
+            window=_lerp_color(start[3], end[3], t),
+            day_weight=_lerp(start[4], end[4], t),
+        ))
+    return lut
+
+
+class TimeOfDay:
+    """按游戏时间查表的昼夜光照"""
+
+    def __init__(self, keyframes=DEFAULT_KEYFRAMES):
+        self.lut = build_lut(keyframes)
+
+    def sample(self, game_time):
+        """
+        取得游戏时间所在分钟的光照状态
+
+        参数:
+            game_time (datetime.datetime): 游戏时间
+
+        返回:
+            TimeSample: 同一分钟内返回同一个对象，可以用is判断是否变化
+        """
+        return self.lut[game_time.hour * 60 + game_time.minute]
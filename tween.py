@@ -0,0 +1,232 @@
+"""
+补间动画调度
+
+灯光亮度渐变、电视背光换色、开场白淡入淡出、窗外云朵漂移原来都由场景每帧轮询:
+亮度早已到达目标的灯仍然每帧比较一次，背光仍然每帧重算插值颜色。
+这里把它们登记为活动动画，调度器每步只推进活动集合里的动画，完成的动画立即离开集合，
+每帧的更新开销只和真正在动的东西有关。
+
+两种动画:
+    Tween: 在给定时间内把对象的一个属性按缓动曲线变到目标值，完成时调用回调
+    Animation: 每步调用一个函数，直到函数返回False或被取消(用于持续的效果)
+
+补间只在属性值真正改变时通知on_change(重绘调度器)；持续动画的函数自己决定是否需要重绘，
+例如闪烁只在闪烁系数变化时标记，永不结束的动画不会让每一帧都变脏。
+"""
+import math
+
+
+# ---------------------------------------------------------------------------
+# 缓动曲线: 输入0~1的进度，输出0~1的插值比例
+# ---------------------------------------------------------------------------
+
+def linear(t):
+    return t
+
+
+def ease_in_quad(t):
+    return t * t
+
+
+def ease_out_quad(t):
+    return 1 - (1 - t) * (1 - t)
+
+
+def ease_in_out_quad(t):
+    return 2 * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 2 / 2
+
+
+def ease_out_cubic(t):
+    return 1 - (1 - t) ** 3
+
+
+def ease_in_out_sine(t):
+    return -(math.cos(math.pi * t) - 1) / 2
+
+
+def _lerp(start, end, t):
+    """数值或颜色元组的线性插值"""
+    if isinstance(start, tuple):
+        return tuple(int(round(a + (b - a) * t)) for a, b in zip(start, end))
+    return start + (end - start) * t
+
+
+class Tween:
+    """属性补间"""
+
+    def __init__(self, target, attr, end, duration, easing=ease_out_quad,
+                 on_update=None, on_complete=None):
+        """
+        参数:
+            target: 目标对象
+            attr (str): 属性名，起始值取当前值
+            end: 目标值(数值或颜色元组)
+            duration (float): 时长(秒)
+            easing (callable): 缓动曲线
+            on_update (callable): 每次属性变化后调用on_update(target)
+            on_complete (callable): 完成时调用(被取消或替换时不调用)
+        """
+        self.target = target
+        self.attr = attr
+        self.start = getattr(target, attr)
+        self.end = end
+        self.duration = duration
+        self.easing = easing
+        self.on_update = on_update
+        self.on_complete = on_complete
+        self.elapsed = 0.0
+        # 最近一步的步长，渲染插值时从这一步的起点往后推
+        self.last_step = 0.0
+        # 最近一次step或interpolate是否改变了属性值
+        self.changed = False
+
+    def value_at(self, elapsed):
+        """经过elapsed秒时的属性值"""
+        if self.duration <= 0:
+            t = 1.0
+        else:
+            t = min(max(elapsed / self.duration, 0.0), 1.0)
+        return _lerp(self.start, self.end, self.easing(t))
+
+    def apply(self, elapsed):
+        """
+        设置elapsed秒时的属性值
+
+        返回:
+            bool: 属性值是否改变
+        """
+        value = self.value_at(elapsed)
+        if value == getattr(self.target, self.attr):
+            return False
+        setattr(self.target, self.attr, value)
+        if self.on_update is not None:
+            self.on_update(self.target)
+        return True
+
+    def step(self, delta_time):
+        """
+        推进一步
+
+        返回:
+            bool: 是否还要继续
+        """
+        self.elapsed += delta_time
+        self.last_step = delta_time
+        self.changed = self.apply(self.elapsed)
+        return self.elapsed < self.duration
+
+    def interpolate(self, alpha):
+        """按渲染插值系数设置属性(0为上一步，1为当前步)"""
+        self.changed = self.apply(self.elapsed - (1 - alpha) * self.last_step)
+
+
+class Animation:
+    """持续动画，每步调用update(delta_time)，返回False时结束"""
+
+    # 需要重绘时由update自己标记，调度器不替它通知
+    changed = False
+
+    def __init__(self, update, on_complete=None):
+        self.update = update
+        self.on_complete = on_complete
+
+    def step(self, delta_time):
+        return self.update(delta_time) is not False
+
+    def interpolate(self, alpha):
+        pass
+
+
+class TweenScheduler:
+    """活动动画集合"""
+
+    def __init__(self, on_change=None):
+        """
+        参数:
+            on_change (callable): 有补间改变了属性值时调用(通常是重绘调度器的mark_dirty)
+        """
+        self.on_change = on_change
+        # 键 -> 动画，补间的键是(对象, 属性名)；同一个键同时只有一个动画
+        self._active = {}
+
+    def track(self, obj):
+        """让物体通过tween_scheduler属性使用这个调度器"""
+        obj.tween_scheduler = self
+
+    @property
+    def active_count(self):
+        """活动动画数量"""
+        return len(self._active)
+
+    def is_active(self, key):
+        return key in self._active
+
+    def tween(self, target, attr, end, duration, easing=ease_out_quad,
+              on_update=None, on_complete=None):
+        """
+        开始一个属性补间，替换同一属性上正在进行的补间
+
+        返回:
+            Tween: 新的补间
+        """
+        tween = Tween(target, attr, end, duration, easing, on_update, on_complete)
+        self._active[(target, attr)] = tween
+        return tween
+
+    def animate(self, key, update, on_complete=None):
+        """
+        开始一个持续动画，替换同一个键上正在进行的动画
+
+        参数:
+            key: 动画的键，用于取消
+            update (callable): 每步调用update(delta_time)，返回False时结束
+            on_complete (callable): 结束时调用(被取消或替换时不调用)
+
+        返回:
+            Animation: 新的动画
+        """
+        animation = Animation(update, on_complete)
+        self._active[key] = animation
+        return animation
+
+    def cancel(self, key):
+        """取消动画，不调用完成回调"""
+        self._active.pop(key, None)
+
+    def update(self, delta_time):
+        """
+        推进一步所有活动动画，完成的动画离开活动集合
+
+        返回:
+            bool: 这一步是否有补间改变了属性值
+        """
+        if not self._active:
+            return False
+        changed = False
+        finished = []
+        for key, animation in list(self._active.items()):
+            # 回调中可能取消或替换了这个动画
+            if self._active.get(key) is not animation:
+                continue
+            if not animation.step(delta_time):
+                finished.append((key, animation))
+            changed = changed or animation.changed
+        for key, animation in finished:
+            if self._active.get(key) is animation:
+                del self._active[key]
+            if animation.on_complete is not None:
+                animation.on_complete()
+        if changed and self.on_change is not None:
+            self.on_change()
+        return changed
+
+    def interpolate(self, alpha):
+        """按渲染插值系数设置活动补间的属性"""
+        if not self._active:
+            return
+        changed = False
+        for animation in list(self._active.values()):
+            animation.interpolate(alpha)
+            changed = changed or animation.changed
+        if changed and self.on_change is not None:
+            self.on_change()